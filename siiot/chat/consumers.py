@@ -0,0 +1,111 @@
+import uuid
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.db.models import Q
+from django.utils import timezone
+
+from chat.message_buffer import chat_message_buffer
+from chat.models import ChatRoom, ChatMessage
+
+CHAT_ROOM_GROUP_NAME = 'chat_room_{}'
+
+# websocket close code
+CLOSE_UNAUTHORIZED = 4001
+CLOSE_FORBIDDEN = 4003
+
+MESSAGE_MAX_LENGTH = 2000
+
+
+class ChatConsumer(AsyncJsonWebsocketConsumer):
+    """
+    채팅방 websocket 입니다. ws/chat/<room_id>/?token=<drf token>
+
+    client -> server
+    * {"type": "message", "message_type": 1, "text": "...", "client_id": "..."(optional)}
+    * {"type": "read"} : 상대방 메시지를 모두 읽음 처리합니다.
+
+    server -> client
+    * {"type": "message", "room", "owner", "message_type", "text", "client_id", "created_at"}
+    * {"type": "read", "room", "reader"}
+    * {"type": "error", "detail"}
+
+    메시지는 channel layer 로 바로 전달하고, 저장은 chat_message_buffer 가 모아서 합니다.
+    """
+
+    async def connect(self):
+        self.user = self.scope['user']
+        if self.user.is_anonymous:
+            await self.close(code=CLOSE_UNAUTHORIZED)
+            return
+
+        self.room_id = int(self.scope['url_route']['kwargs']['room_id'])
+        if not await self.get_room():
+            await self.close(code=CLOSE_FORBIDDEN)
+            return
+
+        self.group_name = CHAT_ROOM_GROUP_NAME.format(self.room_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        chat_message_buffer.ensure_flusher()
+        await self.read()
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    @database_sync_to_async
+    def get_room(self):
+        """
+        seller, buyer 이고 websocket 채팅이 가능한(*_active) 채팅방만 연결합니다.
+        """
+        return ChatRoom.objects.filter(Q(seller=self.user, seller_active=True) | Q(buyer=self.user, buyer_active=True),
+                                       id=self.room_id).exists()
+
+    async def receive_json(self, content, **kwargs):
+        event_type = content.get('type')
+        if event_type == 'message':
+            await self.send_message(content)
+        elif event_type == 'read':
+            await self.read()
+        else:
+            await self.send_json({'type': 'error', 'detail': 'unknown type'})
+
+    async def send_message(self, content):
+        message_type = content.get('message_type', 1)
+        text = content.get('text')
+        if message_type not in dict(ChatMessage.MESSAGE_TYPES) or not isinstance(text, str) or not text \
+                or len(text) > MESSAGE_MAX_LENGTH:
+            await self.send_json({'type': 'error', 'detail': 'invalid message'})
+            return
+
+        if chat_message_buffer.record(self.room_id, self.user.id, message_type, text):
+            await chat_message_buffer.aflush()
+
+        await self.channel_layer.group_send(self.group_name, {
+            'type': 'chat.message',
+            'room': self.room_id,
+            'owner': self.user.id,
+            'message_type': message_type,
+            'text': text,
+            'client_id': str(content.get('client_id') or uuid.uuid4().hex),
+            'created_at': timezone.now().isoformat(),
+        })
+
+    async def read(self):
+        chat_message_buffer.mark_read(self.room_id, self.user.id)
+        await self.channel_layer.group_send(self.group_name, {
+            'type': 'chat.read',
+            'room': self.room_id,
+            'reader': self.user.id,
+        })
+
+    async def chat_message(self, event):
+        await self.send_json(dict(event, type='message'))
+        if event['owner'] != self.user.id:
+            # 연결되어 있는 상대방에게 전달되었으므로 읽음 처리합니다.
+            chat_message_buffer.mark_read(self.room_id, self.user.id)
+
+    async def chat_read(self, event):
+        if event['reader'] != self.user.id:
+            await self.send_json(dict(event, type='read'))
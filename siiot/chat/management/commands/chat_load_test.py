@@ -0,0 +1,131 @@
+import asyncio
+import time
+
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from rest_framework.authtoken.models import Token
+
+from chat.message_buffer import chat_message_buffer
+from chat.models import ChatRoom, ChatMessage
+from siiot.routing import application
+
+
+class Command(BaseCommand):
+    """
+    websocket 채팅 부하 테스트입니다. 채팅방의 seller, buyer 로 --sockets 개의 websocket 을 한 process 에서 연결하고
+    각 socket 이 --messages 개의 메시지를 보내 상대방에게 전달되기까지의 지연과 저장된 메시지 수를 측정합니다.
+    in-memory channel layer 로 실행하며, 측정 후 보낸 메시지를 삭제합니다.
+    (연결시 채팅방의 메시지가 읽음 처리되므로 테스트 DB 에서 실행하세요.)
+    ex) SIIOT_CHANNEL_LAYER=memory python manage.py chat_load_test --sockets 4000 --messages 5
+    """
+    help = 'in-memory channel layer 로 websocket 채팅 동시 접속 부하 테스트를 합니다.'
+
+    MARKER = 'chat_load_test'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sockets', type=int, default=2000)
+        parser.add_argument('--messages', type=int, default=5, help='socket 별로 보낼 메시지 수')
+        parser.add_argument('--interval', type=float, default=0.1, help='메시지 전송 간격 (초)')
+        parser.add_argument('--connect-concurrency', type=int, default=200, help='동시에 handshake 할 socket 수')
+
+    def handle(self, *args, **options):
+        if settings.CHANNEL_LAYERS['default']['BACKEND'] != 'channels.layers.InMemoryChannelLayer':
+            raise CommandError('SIIOT_CHANNEL_LAYER=memory 로 실행하세요.')
+
+        rooms = list(ChatRoom.objects.filter(seller__isnull=False, buyer__isnull=False,
+                                             seller_active=True, buyer_active=True)
+                     .exclude(seller=F('buyer')).order_by('id')
+                     .values_list('id', 'seller_id', 'buyer_id')[:options['sockets'] // 2])
+        if not rooms:
+            raise CommandError('seller, buyer 가 있는 채팅방이 없습니다.')
+        tokens = self.get_tokens(set(user_id for _, seller_id, buyer_id in rooms for user_id in (seller_id, buyer_id)))
+
+        try:
+            stats = asyncio.get_event_loop().run_until_complete(self.run(rooms, tokens, options))
+        finally:
+            ChatMessage.objects.filter(text=self.MARKER).delete()
+
+        self.stdout.write('sockets    : {connected} / {requested} connected ({connect_seconds:.1f}s)'.format(**stats))
+        self.stdout.write('messages   : {sent} sent, {delivered} delivered, {persisted} persisted'.format(**stats))
+        self.stdout.write('latency(ms): p50 {p50:.1f}, p95 {p95:.1f}, max {max:.1f}'.format(**stats))
+
+    @staticmethod
+    def get_tokens(user_ids):
+        tokens = dict(Token.objects.filter(user_id__in=user_ids).values_list('user_id', 'key'))
+        for user_id in user_ids - set(tokens.keys()):
+            tokens[user_id] = Token.objects.create(user_id=user_id).key
+        return tokens
+
+    async def run(self, rooms, tokens, options):
+        semaphore = asyncio.Semaphore(options['connect_concurrency'])
+        sent_at = {}
+        latencies = []
+
+        async def connect(room_id, user_id):
+            communicator = WebsocketCommunicator(
+                application, '/ws/chat/{}/'.format(room_id),
+                headers=[(b'authorization', 'Token {}'.format(tokens[user_id]).encode('utf-8'))])
+            async with semaphore:
+                connected, _ = await communicator.connect(timeout=30)
+            return communicator if connected else None
+
+        async def talk(communicator, user_id):
+            for i in range(options['messages']):
+                client_id = '{}-{}-{}'.format(communicator.scope['path'], user_id, i)
+                sent_at[client_id] = time.perf_counter()
+                await communicator.send_json_to({'type': 'message', 'text': self.MARKER, 'client_id': client_id})
+                await asyncio.sleep(options['interval'])
+
+        async def listen(communicator, user_id, expected):
+            received = 0
+            while received < expected:
+                try:
+                    event = await communicator.receive_json_from(timeout=30)
+                except asyncio.TimeoutError:
+                    break
+                if event['type'] == 'message' and event['owner'] != user_id:
+                    latencies.append((time.perf_counter() - sent_at[event['client_id']]) * 1000)
+                    received += 1
+
+        sockets = [(room_id, user_id) for room_id, seller_id, buyer_id in rooms for user_id in (seller_id, buyer_id)]
+        start = time.perf_counter()
+        communicators = await asyncio.gather(*[connect(room_id, user_id) for room_id, user_id in sockets])
+        connect_seconds = time.perf_counter() - start
+
+        connected = [(communicator, room_id, user_id)
+                     for communicator, (room_id, user_id) in zip(communicators, sockets) if communicator]
+        connected_per_room = {}
+        for _, room_id, _ in connected:
+            connected_per_room[room_id] = connected_per_room.get(room_id, 0) + 1
+
+        tasks = []
+        for communicator, room_id, user_id in connected:
+            # 상대방도 연결된 경우에만 상대방 메시지를 기다립니다.
+            expected = options['messages'] if connected_per_room[room_id] == 2 else 0
+            tasks.append(talk(communicator, user_id))
+            tasks.append(listen(communicator, user_id, expected))
+        await asyncio.gather(*tasks)
+
+        for communicator, _, _ in connected:
+            try:
+                await communicator.disconnect()
+            except Exception:
+                pass
+        await chat_message_buffer.aflush()
+        persisted = await database_sync_to_async(ChatMessage.objects.filter(text=self.MARKER).count)()
+
+        latencies.sort()
+        return {
+            'requested': len(sockets),
+            'connected': len(connected),
+            'connect_seconds': connect_seconds,
+            'sent': len(sent_at),
+            'delivered': len(latencies),
+            'persisted': persisted,
+            'p50': latencies[len(latencies) // 2] if latencies else 0,
+            'p95': latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] if latencies else 0,
+            'max': latencies[-1] if latencies else 0,
+        }
@@ -0,0 +1,84 @@
+import asyncio
+import atexit
+import threading
+from collections import defaultdict
+
+from channels.db import database_sync_to_async
+from django.db import transaction
+from django.utils import timezone
+
+from chat.models import ChatRoom, ChatMessage
+
+
+class ChatMessageBuffer(object):
+    """
+    websocket 으로 받은 채팅 메시지를 process 안에 모아두었다가 bulk_create 로 한번에 저장하는 buffer 입니다.
+    메시지마다 INSERT + ChatRoom UPDATE 를 하면 대화가 몰릴 때 db 연결 thread 가 부족해지므로
+    전달(channel layer)은 바로 하고 저장만 FLUSH_INTERVAL 마다 모아서 합니다.
+
+    * 채팅방의 updated_at(채팅 목록 정렬)은 flush 마다 채팅방별로 한번만 갱신합니다.
+    * 읽음 처리(mark_read)도 모아두었다가 메시지를 저장한 뒤 채팅방별로 한번 UPDATE 합니다.
+    * created_at 은 auto_now_add 이므로 받은 시각이 아닌 저장 시각(최대 FLUSH_INTERVAL 차이)이며, 순서는 id 로 보장됩니다.
+    * process 종료시에도 flush 하지만, 비정상 종료되면 아직 저장하지 않은 메시지는 유실될 수 있습니다.
+    """
+    FLUSH_INTERVAL = 0.5
+    MAX_PENDING = 500
+    BULK_SIZE = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._messages = []
+        self._read_marks = defaultdict(set)
+        self._flusher = None
+
+    def record(self, room_id, owner_id, message_type, text):
+        with self._lock:
+            self._messages.append(ChatMessage(room_id=room_id, owner_id=owner_id, message_type=message_type,
+                                              text=text))
+            return len(self._messages) >= self.MAX_PENDING
+
+    def mark_read(self, room_id, reader_id):
+        """
+        reader 가 채팅방의 상대방 메시지를 모두 읽었음을 기록합니다.
+        """
+        with self._lock:
+            self._read_marks[room_id].add(reader_id)
+
+    def _drain(self):
+        with self._lock:
+            messages, self._messages = self._messages, []
+            read_marks, self._read_marks = self._read_marks, defaultdict(set)
+        return messages, read_marks
+
+    def flush(self):
+        messages, read_marks = self._drain()
+        if not messages and not read_marks:
+            return
+        with transaction.atomic():
+            if messages:
+                ChatMessage.objects.bulk_create(messages, batch_size=self.BULK_SIZE)
+                room_ids = set(message.room_id for message in messages)
+                ChatRoom.objects.filter(id__in=room_ids).update(updated_at=timezone.now())
+            for room_id, reader_ids in read_marks.items():
+                for reader_id in reader_ids:
+                    ChatMessage.objects.filter(room_id=room_id, is_read=False).exclude(owner_id=reader_id) \
+                        .update(is_read=True)
+
+    async def aflush(self):
+        await database_sync_to_async(self.flush)()
+
+    def ensure_flusher(self):
+        """
+        event loop 에서 FLUSH_INTERVAL 마다 flush 하는 task 를 (없으면) 시작합니다. consumer 연결시 호출합니다.
+        """
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.FLUSH_INTERVAL)
+            await self.aflush()
+
+
+chat_message_buffer = ChatMessageBuffer()
+atexit.register(chat_message_buffer.flush)
@@ -0,0 +1,55 @@
+from urllib import parse as urlparse
+
+from channels.db import database_sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.authtoken.models import Token
+
+
+@database_sync_to_async
+def get_token_user(key):
+    token = Token.objects.select_related('user').filter(key=key).first()
+    if token is None or not token.user.is_active:
+        return AnonymousUser()
+    return token.user
+
+
+def get_token_key(scope):
+    """
+    websocket 은 browser 에서 header 를 지정할 수 없으므로 query string(?token=) 을 우선 사용하고,
+    app 에서는 http api 와 같은 Authorization: Token <key> header 도 사용할 수 있습니다.
+    """
+    query = urlparse.parse_qs(scope.get('query_string', b'').decode('utf-8'))
+    if query.get('token'):
+        return query['token'][0]
+    for name, value in scope.get('headers', []):
+        if name == b'authorization':
+            keyword, _, key = value.decode('utf-8').partition(' ')
+            if keyword == 'Token' and key:
+                return key
+    return None
+
+
+class TokenAuthMiddleware(object):
+    """
+    drf TokenAuthentication 과 같은 token 으로 websocket 연결의 scope['user'] 를 설정합니다.
+    token 이 없거나 잘못된 경우 AnonymousUser 이며, consumer 에서 연결을 거절합니다.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def __call__(self, scope):
+        return TokenAuthMiddlewareInstance(scope, self)
+
+
+class TokenAuthMiddlewareInstance(object):
+
+    def __init__(self, scope, middleware):
+        self.scope = dict(scope)
+        self.inner = middleware.inner
+
+    async def __call__(self, receive, send):
+        key = get_token_key(self.scope)
+        self.scope['user'] = await get_token_user(key) if key else AnonymousUser()
+        inner = self.inner(self.scope)
+        return await inner(receive, send)
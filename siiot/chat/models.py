@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Q, OuterRef, Subquery, Count
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from core.fields import S3ImageKeyField
 
@@ -10,6 +12,29 @@ def img_directory_path_message(instance, filename):
     return 'chatroom/{}/message/{}'.format(instance.room.id, filename)
 
 
+class ChatRoomManager(models.Manager):
+
+    def inbox(self, user):
+        """
+        user 의 채팅 목록입니다. 채팅방마다 필요한 값을 subquery 로 annotate 하여 한번의 query 로 조회합니다.
+        * unread_count : 상대방이 보낸 메시지 중 읽지 않았고 user 에게 보이는 메시지 수
+        * last_message_* : user 에게 보이는 마지막 메시지
+        * 상대방 정보는 seller, buyer 의 profile 을 select_related 하여 serializer 에서 고릅니다.
+        """
+        visible = Q(room__seller_id=user.id, seller_visible=True) | Q(room__buyer_id=user.id, buyer_visible=True)
+        messages = ChatMessage.objects.filter(visible, room=OuterRef('pk'))
+        unread = messages.filter(is_read=False).exclude(owner_id=user.id).order_by() \
+            .values('room').annotate(count=Count('id')).values('count')
+        last_message = messages.order_by('-created_at', '-id')
+
+        return self.filter(Q(seller=user) | Q(buyer=user)) \
+            .select_related('seller', 'seller__profile', 'buyer', 'buyer__profile') \
+            .annotate(unread_count=Coalesce(Subquery(unread, output_field=models.IntegerField()), 0),
+                      last_message_text=Subquery(last_message.values('text')[:1]),
+                      last_message_type=Subquery(last_message.values('message_type')[:1]),
+                      last_message_at=Subquery(last_message.values('created_at')[:1]))
+
+
 class ChatRoom(models.Model):
     seller = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, related_name='seller_chat_rooms',
                                on_delete=models.SET_NULL)
@@ -22,9 +47,34 @@ class ChatRoom(models.Model):
     product = models.OneToOneField(Product, help_text='채팅방에 연관된 product_id', null=True,
                                    related_name='chat_room', on_delete=models.SET_NULL)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now_add=True, help_text='마지막 메시지 시각입니다. ChatMessage 생성시 갱신됩니다.')
     # is_active = models.BooleanField(default=True, null=True)
 
+    objects = ChatRoomManager()
+
+    def get_visible_messages(self, user):
+        """
+        user(seller 또는 buyer) 에게 보이는 메시지입니다.
+        """
+        if self.seller_id == user.id:
+            return self.messages.filter(seller_visible=True)
+        return self.messages.filter(buyer_visible=True)
+
+    def read_messages(self, user, until):
+        """
+        until 메시지까지 (created_at, id 순서) 상대방이 보낸 메시지를 한번의 UPDATE 로 읽음 처리합니다.
+        :return: 읽음 처리한 메시지 수
+        """
+        until_q = Q(created_at__lt=until.created_at) | Q(created_at=until.created_at, id__lte=until.id)
+        return self.messages.filter(until_q, is_read=False).exclude(owner_id=user.id).update(is_read=True)
+
+    class Meta:
+        indexes = [
+            # 채팅 목록 (updated_at cursor)
+            models.Index(fields=['seller', 'updated_at']),
+            models.Index(fields=['buyer', 'updated_at']),
+        ]
+
 
 class ChatMessage(models.Model):
     MESSAGE_TYPES = (
@@ -44,7 +94,20 @@ class ChatMessage(models.Model):
     buyer_visible = models.BooleanField(default=True, help_text='바이어에게 보여지지 않는 경우 false')
 
     class Meta:
-        ordering = ['created_at']
+        # 기본 ordering 은 두지 않습니다. 대화 내용은 (created_at, id) keyset 으로 조회합니다.
+        indexes = [
+            # 채팅방별 읽지 않은 메시지
+            models.Index(fields=['room', 'is_read']),
+            # 마지막 메시지, 대화 내용 keyset pagination, "X 까지 읽음" 범위 update
+            models.Index(fields=['room', 'created_at', 'id']),
+        ]
+
+    def save(self, *args, **kwargs):
+        created = self.pk is None
+        super(ChatMessage, self).save(*args, **kwargs)
+        if created:
+            # 채팅 목록이 마지막 메시지 순으로 정렬되도록 채팅방의 updated_at 을 갱신합니다.
+            ChatRoom.objects.filter(id=self.room_id).update(updated_at=self.created_at)
 
 
 class ChatMessageImages(models.Model):
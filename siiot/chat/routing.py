@@ -0,0 +1,7 @@
+from django.urls import re_path
+
+from chat.consumers import ChatConsumer
+
+websocket_urlpatterns = [
+    re_path(r'^ws/chat/(?P<room_id>\d+)/$', ChatConsumer),
+]
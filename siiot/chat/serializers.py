@@ -1,30 +1,64 @@
 from rest_framework import serializers
-from chat.models import ChatRoom
+from chat.models import ChatRoom, ChatMessage
+
 
 class ChatRoomSerializer(serializers.ModelSerializer):
+    """
+    채팅 목록 serializer 입니다. ChatRoom.objects.inbox(user) 의 annotate 값을 사용하므로 추가 query 가 없습니다.
+    """
     is_buyer = serializers.SerializerMethodField()
     is_seller = serializers.SerializerMethodField()
-    unread_count = serializers.SerializerMethodField()
+    unread_count = serializers.IntegerField(read_only=True)
+    last_message = serializers.SerializerMethodField()
+    counterpart = serializers.SerializerMethodField()
 
     class Meta:
         model = ChatRoom
-        fields = ['id', 'deal', 'is_buyer', 'is_seller', 'unread_count', 'created_at']
+        fields = ['id', 'deal', 'product', 'is_buyer', 'is_seller', 'unread_count', 'last_message', 'counterpart',
+                  'created_at', 'updated_at']
 
     def get_is_buyer(self, obj):
         user = self.context['request'].user
-        deal = obj.deal
-        if deal.buyer == user:
-            return True
-        return False
+        return obj.buyer_id == user.id
 
     def get_is_seller(self, obj):
         user = self.context['request'].user
-        deal = obj.deal
-        if deal.seller == user:
-            return True
-        return False
-
-    def get_unread_count(self, obj):
-        room = obj
-        messages = room.messages.filter(is_read=False)
-        return messages.count()
\ No newline at end of file
+        return obj.seller_id == user.id
+
+    def get_last_message(self, obj):
+        if obj.last_message_at is None:
+            return None
+        return {
+            'message_type': obj.last_message_type,
+            'text': obj.last_message_text,
+            'created_at': obj.last_message_at,
+        }
+
+    def get_counterpart(self, obj):
+        user = self.context['request'].user
+        counterpart = obj.buyer if obj.seller_id == user.id else obj.seller
+        if counterpart is None:
+            return None
+        profile_img = None
+        if hasattr(counterpart, 'profile') and counterpart.profile.profile_img:
+            profile_img = counterpart.profile.profile_img.url
+        return {
+            'id': counterpart.id,
+            'nickname': counterpart.nickname,
+            'profile_img': profile_img,
+        }
+
+
+class ChatMessageSerializer(serializers.ModelSerializer):
+    is_mine = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ChatMessage
+        fields = ['id', 'room', 'owner', 'message_type', 'text', 'is_read', 'is_mine', 'created_at']
+
+    def get_is_mine(self, obj):
+        return obj.owner_id == self.context['request'].user.id
+
+
+class ChatMessageReadSerializer(serializers.Serializer):
+    message_id = serializers.IntegerField()
@@ -7,23 +7,86 @@ from rest_framework.decorators import authentication_classes, action
 from rest_framework import status, viewsets
 from rest_framework import exceptions
 
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db.models import Q
+from django.shortcuts import get_object_or_404
+
+from chat.consumers import CHAT_ROOM_GROUP_NAME
 from chat.models import ChatRoom
-from chat.serializers import ChatRoomSerializer
+from chat.serializers import ChatRoomSerializer, ChatMessageSerializer, ChatMessageReadSerializer
+from core.pagination import paginate, SiiotKeysetCursorPagination
+
+
+class ChatMessagePagination(SiiotKeysetCursorPagination):
+    page_size = 30
+    ordering = ('-created_at', '-id')
 
 
+@paginate(page_size=20, ordering=('-updated_at', '-id'))
 class ChatRoomViewSet(viewsets.GenericViewSet, mixins.ListModelMixin):
     queryset = ChatRoom.objects.all()
     permission_classes = [AllowAny, ]
     serializer_class = ChatRoomSerializer
 
     def list(self, request, *args, **kwargs):
+        """
+        채팅 목록 api 입니다. 마지막 메시지 순(updated_at)으로 cursor pagination 합니다.
+        api: GET api/v1/chat_room/
+        * 다음 페이지는 response header 의 cursor-next 로 요청합니다.
+
+        :return: [{"id", "deal", "product", "is_buyer", "is_seller", "unread_count",
+                   "last_message": {"message_type", "text", "created_at"} or null,
+                   "counterpart": {"id", "nickname", "profile_img"}, "created_at", "updated_at"}]
+        """
         user = request.user
         if user.is_anonymous:
             return Response(status=status.HTTP_204_NO_CONTENT)
 
-        seller_chat_rooms = user.seller_chat_rooms.all()
-        buyer_chat_rooms = user.buyer_chat_rooms.all()
+        queryset = ChatRoom.objects.inbox(user)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def get_room(self):
+        user = self.request.user
+        return get_object_or_404(ChatRoom, Q(seller=user) | Q(buyer=user), pk=self.kwargs['pk'])
+
+    @action(methods=['get'], detail=True, permission_classes=[IsAuthenticated])
+    def messages(self, request, *args, **kwargs):
+        """
+        대화 내용 api 입니다. 최신 메시지부터 (created_at, id) keyset 으로 조회하며, 내게 보이는 메시지만 조회합니다.
+        api: GET api/v1/chat_room/{id}/messages/
+        * 이전(오래된) 메시지는 response header 의 cursor-next, 이후(새) 메시지는 cursor-prev 로 요청합니다.
+
+        :return: [{"id", "room", "owner", "message_type", "text", "is_read", "is_mine", "created_at"}]
+        """
+        room = self.get_room()
+        paginator = ChatMessagePagination()
+        page = paginator.paginate_queryset(room.get_visible_messages(request.user), request, view=self)
+        serializer = ChatMessageSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(methods=['post'], detail=True, permission_classes=[IsAuthenticated])
+    def read(self, request, *args, **kwargs):
+        """
+        message_id 메시지까지 상대방이 보낸 메시지를 한번에 읽음 처리합니다.
+        api: POST api/v1/chat_room/{id}/read/
+        data: {"message_id": int}
+        * 연결되어 있는 websocket 에 read 이벤트를 보냅니다.
+
+        :return: {"read_count": int}
+        """
+        room = self.get_room()
+        serializer = ChatMessageReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        until = get_object_or_404(room.messages.only('id', 'created_at'), pk=serializer.validated_data['message_id'])
 
-        total_rooms = seller_chat_rooms|buyer_chat_rooms
-        serializer = self.get_serializer(total_rooms, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        read_count = room.read_messages(request.user, until)
+        if read_count:
+            async_to_sync(get_channel_layer().group_send)(CHAT_ROOM_GROUP_NAME.format(room.id), {
+                'type': 'chat.read',
+                'room': room.id,
+                'reader': request.user.id,
+            })
+        return Response({'read_count': read_count}, status=status.HTTP_200_OK)
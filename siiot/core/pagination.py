@@ -1,4 +1,7 @@
-from rest_framework.pagination import CursorPagination, PageNumberPagination
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.pagination import CursorPagination, PageNumberPagination, Cursor
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from urllib import parse as urlparse
 from base64 import b64decode, b64encode
@@ -51,10 +54,7 @@ class SiiotCursorPagination(CursorPagination):
         response['cursor-next'] = self.get_next_link()
         return response
 
-    def encode_cursor(self, cursor):
-        """
-        Given a Cursor instance, return an url with encoded cursor.
-        """
+    def get_cursor_tokens(self, cursor):
         tokens = {}
         if cursor.offset != 0:
             tokens['o'] = str(cursor.offset)
@@ -62,15 +62,151 @@ class SiiotCursorPagination(CursorPagination):
             tokens['r'] = '1'
         if cursor.position is not None:
             tokens['p'] = cursor.position
+        return tokens
 
+    def encode_cursor(self, cursor):
+        """
+        Given a Cursor instance, return an url with encoded cursor.
+        """
+        tokens = self.get_cursor_tokens(cursor)
         querystring = urlparse.urlencode(tokens, doseq=True)
         encoded = b64encode(querystring.encode('ascii')).decode('ascii')
         return encoded
 
 
-def paginate(page_size=None, ordering=None):
+class SiiotFeedCursorPagination(SiiotCursorPagination):
+    """
+    상단 고정(pinned) 상품 + 나머지 상품을 ordering 순서로 보여주는 feed 용 cursor pagination 입니다.
+    첫 페이지에만 pinned 상품이 앞에 붙고, 이후 페이지는 pinned 를 제외한 queryset 에서 keyset 으로 조회합니다.
+    * 첫 페이지의 pinned id 를 cursor 에 담아 이후 페이지에서도 같은 상품을 제외합니다.
+      (스크롤 중에 pinned 상품이 바뀌어도 중복되거나 빠지는 상품이 없습니다.)
+    * 무한스크롤 전용이므로 이전 페이지 cursor 는 제공하지 않습니다.
+    """
+    page_size = 20
+    ordering = ('-created_at', '-id')
+    pinned_cursor_key = 'x'
+
+    def paginate_feed(self, pinned_queryset, queryset, request, view=None):
+        """
+        :param pinned_queryset: 첫 페이지 상단에 고정할 queryset (이미 slice 되어 있어야 합니다.)
+        :param queryset: 전체 queryset. pinned 는 이 안에서 제외됩니다.
+        """
+        if self.cursor_query_param in request.query_params:
+            self.pinned_ids = self.decode_pinned_ids(request)
+            if self.pinned_ids is None:
+                # pinned id 가 없는 이전 cursor
+                self.pinned_ids = list(pinned_queryset.values_list('pk', flat=True))
+            queryset = queryset.exclude(pk__in=self.pinned_ids)
+            return self.paginate_queryset(queryset, request, view=view)
+
+        # 첫 페이지 : pinned + 나머지 (page_size - pinned 개수)
+        pinned = list(pinned_queryset)
+        self.pinned_ids = [obj.pk for obj in pinned]
+        queryset = queryset.exclude(pk__in=self.pinned_ids)
+        page_size = self.page_size
+        self.page_size = max(page_size - len(pinned), 1)
+        try:
+            page = self.paginate_queryset(queryset, request, view=view)
+        finally:
+            self.page_size = page_size
+        return pinned + page
+
+    def decode_pinned_ids(self, request):
+        """
+        :return: cursor 에 담긴 pinned id 목록, 없으면 None
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        try:
+            querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = urlparse.parse_qs(querystring, keep_blank_values=True)
+            if self.pinned_cursor_key not in tokens:
+                return None
+            return [int(pk) for pk in tokens[self.pinned_cursor_key][0].split(',') if pk]
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_cursor_tokens(self, cursor):
+        tokens = super(SiiotFeedCursorPagination, self).get_cursor_tokens(cursor)
+        tokens[self.pinned_cursor_key] = ','.join(str(pk) for pk in self.pinned_ids)
+        return tokens
+
+    def get_previous_link(self):
+        return None
+
+
+class SiiotKeysetCursorPagination(SiiotCursorPagination):
+    """
+    (ordering 첫 field, pk) 두 값으로 조회하는 keyset cursor pagination 입니다.
+    CursorPagination 은 첫 field 값이 같은 row 를 offset 으로 건너뛰지만, 이 class 는
+    WHERE (field, pk) < (value, pk) 로 조회하므로 같은 값이 많아도 index 범위 조회만 합니다.
+    * ordering 은 ('-created_at', '-id') 처럼 두 field 의 방향이 같아야 합니다.
+    * cursor-next 는 ordering 방향, cursor-prev 는 반대 방향의 다음 페이지입니다.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor.reverse if self.cursor else False
+
+        self.field, self.pk_field = [field.lstrip('-') for field in self.ordering]
+        descending = self.ordering[0].startswith('-') != reverse
+        if descending:
+            queryset = queryset.order_by('-' + self.field, '-' + self.pk_field)
+        else:
+            queryset = queryset.order_by(self.field, self.pk_field)
+
+        if self.cursor and self.cursor.position:
+            if '|' not in self.cursor.position:
+                raise NotFound(self.invalid_cursor_message)
+            value, pk = self.cursor.position.rsplit('|', 1)
+            # 잘못된 cursor 값이 query 에서 500 이 되지 않도록 field type 으로 먼저 변환합니다.
+            opts = queryset.model._meta
+            try:
+                value = opts.get_field(self.field).to_python(value)
+                pk = opts.get_field(self.pk_field).to_python(pk)
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            if value is None or pk is None:
+                raise NotFound(self.invalid_cursor_message)
+            lookup = 'lt' if descending else 'gt'
+            queryset = queryset.filter(Q(**{'{}__{}'.format(self.field, lookup): value}) |
+                                       Q(**{self.field: value, '{}__{}'.format(self.pk_field, lookup): pk}))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = self.cursor.position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def get_position(self, obj):
+        value = getattr(obj, self.field)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        return '{}|{}'.format(value, getattr(obj, self.pk_field))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.get_position(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.get_position(self.page[0])))
+
+
+def paginate(page_size=None, ordering=None, pagination_class=SiiotCursorPagination):
 
-    class _Pagination(SiiotCursorPagination):
+    class _Pagination(pagination_class):
         def __init__(self):
             self.page_size = page_size
             self.ordering = ordering
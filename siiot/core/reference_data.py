@@ -0,0 +1,100 @@
+import hashlib
+import threading
+import uuid
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+"""
+거의 바뀌지 않는 기준 데이터(카테고리, 사이즈, 색상, 은행, 택배사, 배너 등)를 serialize 된 JSON 으로 cache 하는 util
+"""
+
+
+class ReferenceData(object):
+    """
+    기준 데이터 한 종류를 나타냅니다.
+    * build(*args) 결과를 JSON 으로 render 하여 (version, args) 단위로 process 안에 저장합니다.
+    * version 은 공유 cache(settings.CACHES['reference']) 에 저장되므로, 한 worker 에서 모델이 저장/삭제되면
+      모든 worker 가 다음 요청에서 다시 만듭니다.
+    * 응답에 ETag 를 붙이고, If-None-Match 가 같으면 304 를 반환합니다.
+    """
+    VERSION_CACHE_KEY = 'reference_data:{}:version'
+    CACHE_ALIAS = 'reference'
+
+    def __init__(self, name, build, models):
+        """
+        :param name: cache key 에 사용할 이름
+        :param build: 데이터를 만드는 함수 (serializer.data 등 JSON 으로 render 가능한 값)
+        :param models: 저장/삭제시 version 을 올릴 model 목록
+        """
+        self.name = name
+        self.build = build
+        self._lock = threading.Lock()
+        self._version = None
+        self._payloads = {}
+
+        for model in models:
+            post_save.connect(self._model_changed, sender=model, weak=False,
+                              dispatch_uid='reference_data_save_{}_{}'.format(name, model.__name__))
+            post_delete.connect(self._model_changed, sender=model, weak=False,
+                                dispatch_uid='reference_data_delete_{}_{}'.format(name, model.__name__))
+
+    def _model_changed(self, sender, **kwargs):
+        self.invalidate()
+
+    def invalidate(self):
+        # commit 전에 version 을 바꾸면 다른 worker 가 이전 데이터로 다시 만들어 새 version 에 저장하므로 commit 후에 바꿉니다.
+        transaction.on_commit(self._bump_version)
+
+    def _bump_version(self):
+        caches[self.CACHE_ALIAS].set(self.VERSION_CACHE_KEY.format(self.name), uuid.uuid4().hex, None)
+
+    def _current_version(self):
+        cache = caches[self.CACHE_ALIAS]
+        key = self.VERSION_CACHE_KEY.format(self.name)
+        version = cache.get(key)
+        if version is None:
+            version = uuid.uuid4().hex
+            if not cache.add(key, version, None):
+                version = cache.get(key)
+        return version
+
+    def _payload(self, *args):
+        """
+        :return: (data, content, etag)
+        """
+        version = self._current_version()
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._payloads = {}
+            payload = self._payloads.get(args)
+        if payload is not None:
+            return payload
+
+        data = self.build(*args)
+        content = JSONRenderer().render(data)
+        etag = '"{}"'.format(hashlib.md5(content).hexdigest())
+        payload = (data, content, etag)
+        with self._lock:
+            if version == self._version:
+                self._payloads[args] = payload
+        return payload
+
+    def data(self, *args):
+        return self._payload(*args)[0]
+
+    def response(self, request, *args):
+        """
+        미리 render 된 JSON 응답을 반환합니다. 클라이언트가 같은 ETag 를 보내면 304 를 반환합니다.
+        """
+        _, content, etag = self._payload(*args)
+        if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+            response = HttpResponse(status=304)
+        else:
+            response = HttpResponse(content, content_type='application/json')
+        response['ETag'] = etag
+        return response
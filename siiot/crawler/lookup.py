@@ -0,0 +1,97 @@
+import hashlib
+import re
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from django.core.cache import cache
+
+from crawler.models import CrawlProduct
+
+# 쇼핑몰 상품 페이지와 무관한 광고/유입 추적용 query parameter
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'igshid', 'yclid',
+    'nt_source', 'nt_medium', 'nt_detail', 'nt_keyword',
+    'n_media', 'n_query', 'n_rank', 'n_ad_group', 'n_ad', 'n_keyword_id', 'n_keyword', 'n_campaign_type',
+    'napm', 'ref', 'referrer', 'source',
+}
+TRACKING_PARAM_PREFIXES = ('utm_',)
+
+
+def is_tracking_param(key):
+    key = key.lower()
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PARAM_PREFIXES)
+
+
+def normalize_product_url(product_url):
+    """
+    같은 상품 페이지가 같은 값이 되도록 url 을 정규화합니다.
+    * scheme 이 없으면 http 를 붙이고, scheme/host 는 소문자로 바꿉니다. (http, https 는 같은 상품으로 봅니다.)
+    * fragment, 추적용 query parameter 를 제거하고 나머지 parameter 는 정렬합니다.
+    * path 끝의 '/' 를 제거합니다.
+    """
+    product_url = product_url.strip()
+    if not re.match(r'^https?://', product_url, re.IGNORECASE):
+        product_url = 'http://' + product_url
+
+    parts = urlsplit(product_url)
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if not is_tracking_param(key))
+    path = parts.path.rstrip('/')
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ''))
+
+
+def url_candidates(normalized_url):
+    """
+    bengal DB 에는 요청했던 url 이 그대로 저장되어 있으므로 http/https, 끝 '/' 차이를 모두 조회합니다.
+    """
+    parts = urlsplit(normalized_url)
+    candidates = []
+    for scheme in ('http', 'https'):
+        for path in (parts.path, parts.path + '/'):
+            candidates.append(urlunsplit((scheme, parts.netloc, path, parts.query, '')))
+    return candidates
+
+
+class CrawlLookup(object):
+    """
+    정규화한 product_url 기준의 크롤링 결과 cache 입니다. api(ProductViewSet.create) 와 staff 업로드에서 함께 사용합니다.
+    * 성공 : detail image 까지 크롤링된 crawl product id 를 POSITIVE_TTL 동안 저장하여 인기 상품 재등록시 DB/크롤링 서버를 거치지 않습니다.
+      크롤링 요청 직후(201)에는 detail image 가 아직 없으므로 저장하지 않고, get 에서 detail image 를 확인한 경우에만 저장합니다.
+    * 실패 : 크롤링할 수 없는 url(204)을 NEGATIVE_TTL(cool-down) 동안 저장하여 매번 다시 크롤링하지 않습니다.
+    """
+    CACHE_KEY = 'crawl_lookup:{}'
+    POSITIVE_TTL = 60 * 60 * 24
+    NEGATIVE_TTL = 60 * 30
+
+    HIT = 'hit'
+    FAILED = 'failed'
+
+    @classmethod
+    def _key(cls, normalized_url):
+        # http, https 는 같은 상품이므로 scheme 을 제외하고 key 를 만듭니다.
+        url = normalized_url.split('://', 1)[-1]
+        return cls.CACHE_KEY.format(hashlib.md5(url.encode('utf-8')).hexdigest())
+
+    def get(self, product_url):
+        """
+        :return: (상태, crawl product id) 상태는 HIT, FAILED, None(크롤링 필요) 입니다.
+        """
+        normalized_url = normalize_product_url(product_url)
+        cached = cache.get(self._key(normalized_url))
+        if cached is not None:
+            return cached
+
+        # 크롤링 서버에는 입력한 url 을 그대로 보내므로 입력한 url 도 함께 조회합니다.
+        candidates = url_candidates(normalized_url) + [product_url.strip()]
+        crawled = CrawlProduct.objects.filter(product_url__in=candidates) \
+            .order_by('-id').first()
+        if crawled and crawled.detail_images.exists():
+            cache.set(self._key(normalized_url), (self.HIT, crawled.id), self.POSITIVE_TTL)
+            return self.HIT, crawled.id
+        return None, None
+
+    def record_failure(self, product_url):
+        key = self._key(normalize_product_url(product_url))
+        cache.set(key, (self.FAILED, None), self.NEGATIVE_TTL)
+
+
+crawl_lookup = CrawlLookup()
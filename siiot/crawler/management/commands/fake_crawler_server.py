@@ -0,0 +1,63 @@
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """
+    로컬 개발/테스트용 가짜 크롤링 서버입니다. credential 의 CRAWLER_SERVER 를 이 서버 주소로 설정하여 사용합니다.
+    ex) python manage.py fake_crawler_server --port 8001 --product-id 1 --delay 2 --error-rate 0.3
+
+    product_url 에 따라 응답합니다.
+    * 'fail' 포함 : 204 (크롤링 실패)
+    * 'error' 포함 : 500 (크롤링 서버 오류 -> task 재시도)
+    * 그 외 : 201 {'product_id': --product-id}, --error-rate 확률로 500
+    """
+    help = '크롤링 서버를 흉내내는 로컬 http 서버를 실행합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8001)
+        parser.add_argument('--product-id', type=int, default=1, help='성공시 반환할 crawl product id')
+        parser.add_argument('--delay', type=float, default=0, help='응답 지연 (초)')
+        parser.add_argument('--error-rate', type=float, default=0, help='일시적인 500 응답 확률 (0~1)')
+
+    def handle(self, *args, **options):
+        stdout = self.stdout
+
+        class FakeCrawlerHandler(BaseHTTPRequestHandler):
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = parse_qs(self.rfile.read(length).decode('utf-8'))
+                product_url = body.get('product_url', [''])[0]
+
+                if options['delay']:
+                    time.sleep(options['delay'])
+
+                if 'fail' in product_url:
+                    self.send_response(204)
+                    self.end_headers()
+                elif 'error' in product_url or random.random() < options['error_rate']:
+                    self.send_response(500)
+                    self.end_headers()
+                else:
+                    content = json.dumps({'product_id': options['product_id']}).encode('utf-8')
+                    self.send_response(201)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(content)))
+                    self.end_headers()
+                    self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                stdout.write('[fake crawler] ' + format % args)
+
+        server = HTTPServer(('0.0.0.0', options['port']), FakeCrawlerHandler)
+        self.stdout.write('fake crawler server : http://0.0.0.0:{}/'.format(options['port']))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
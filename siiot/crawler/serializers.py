@@ -0,0 +1,46 @@
+from django.db import models
+from rest_framework import serializers
+
+from crawler.utils import CrawlDataLoader
+
+
+class CrawlDataListSerializer(serializers.ListSerializer):
+    """
+    many=True 로 사용할 때 페이지 전체의 crawl_product_id 를 모아 한번에 조회한 뒤 child serializer 에 넘겨줍니다.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        iterable = list(iterable)
+        self.child.prepare_crawl_data(iterable)
+        return super(CrawlDataListSerializer, self).to_representation(iterable)
+
+
+class CrawlDataSerializerMixin(object):
+    """
+    크롤링 데이터(원가, 썸네일)를 사용하는 serializer 에서 사용하는 mixin 입니다.
+    context['crawl_data'] 에 CrawlDataLoader 가 있으면 그대로 사용하고, 없으면 만들어서 저장합니다.
+    * Meta.list_serializer_class = CrawlDataListSerializer 로 설정해야 페이지 단위로 한번에 조회합니다.
+    """
+    crawl_data_context_key = 'crawl_data'
+
+    @staticmethod
+    def get_crawl_product_ids(obj):
+        """
+        obj 에서 사용하는 crawl_product_id 목록입니다. 상품을 직접 가지지 않는 serializer 는 override 해야 합니다.
+        """
+        return [obj.crawl_product_id]
+
+    @property
+    def crawl_data(self):
+        loader = self.context.get(self.crawl_data_context_key, None)
+        if loader is None:
+            loader = CrawlDataLoader()
+            self.context[self.crawl_data_context_key] = loader
+        return loader
+
+    def prepare_crawl_data(self, instances):
+        crawl_product_ids = []
+        for obj in instances:
+            crawl_product_ids.extend(self.get_crawl_product_ids(obj))
+        self.crawl_data.load(crawl_product_ids)
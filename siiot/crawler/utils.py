@@ -0,0 +1,82 @@
+from crawler.models import CrawlProduct, CrawlDetailImage
+
+
+class CrawlData(object):
+    """
+    serializer 에서 사용하는 크롤링 데이터(가격, 썸네일)만 담는 객체입니다.
+    """
+    __slots__ = ('id', 'int_price', 'thumbnail_image_url')
+
+    def __init__(self, crawl_product):
+        self.id = crawl_product.id
+        self.thumbnail_image_url = crawl_product.thumbnail_image_url
+        try:
+            self.int_price = crawl_product.int_price
+        except ValueError:
+            # price 에 숫자가 없는 경우
+            self.int_price = None
+
+
+class CrawlDataLoader(object):
+    """
+    페이지 단위로 crawl_product_id 를 모아 bengal(crawler) DB 에 한번에 조회하는 loader 입니다.
+    상품마다 CrawlProduct 를 조회하던 N+1 을 없애기 위해 만들었습니다.
+    조회한 결과는 loader 안에 cache 되며, 존재하지 않는 id 도 기억하여 다시 조회하지 않습니다.
+    """
+
+    def __init__(self, crawl_product_ids=None):
+        self._cache = {}
+        self._detail_images = {}
+        if crawl_product_ids:
+            self.load(crawl_product_ids)
+
+    def load(self, crawl_product_ids):
+        ids = set(crawl_id for crawl_id in crawl_product_ids if crawl_id) - set(self._cache.keys())
+        if not ids:
+            return
+        queryset = CrawlProduct.objects.filter(id__in=ids).only('id', 'price', 'thumbnail_image')
+        for crawl_product in queryset:
+            self._cache[crawl_product.id] = CrawlData(crawl_product)
+        # 크롤링 DB 에 없는 id 는 None 으로 저장 (negative cache)
+        for crawl_id in ids:
+            self._cache.setdefault(crawl_id, None)
+
+    def get(self, crawl_product_id):
+        if not crawl_product_id:
+            return None
+        if crawl_product_id not in self._cache:
+            self.load([crawl_product_id])
+        return self._cache[crawl_product_id]
+
+    def int_price(self, crawl_product_id):
+        crawl_data = self.get(crawl_product_id)
+        if crawl_data:
+            return crawl_data.int_price
+        return None
+
+    def thumbnail_image_url(self, crawl_product_id):
+        crawl_data = self.get(crawl_product_id)
+        if crawl_data:
+            return crawl_data.thumbnail_image_url
+        return None
+
+    def load_detail_images(self, crawl_product_ids):
+        """
+        상세 이미지(CrawlDetailImage)를 crawl product 단위로 한번에 조회합니다. 상세페이지에서 사용합니다.
+        """
+        ids = set(crawl_id for crawl_id in crawl_product_ids if crawl_id) - set(self._detail_images.keys())
+        if not ids:
+            return
+        for crawl_id in ids:
+            self._detail_images[crawl_id] = []
+        queryset = CrawlDetailImage.objects.filter(product_id__in=ids) \
+            .only('id', 'product_id', 'detail_image', 'detail_image_crop').order_by('id')
+        for detail_image in queryset:
+            self._detail_images[detail_image.product_id].append(detail_image)
+
+    def detail_images(self, crawl_product_id):
+        if not crawl_product_id:
+            return []
+        if crawl_product_id not in self._detail_images:
+            self.load_detail_images([crawl_product_id])
+        return self._detail_images[crawl_product_id]
@@ -3,16 +3,15 @@ from django.db import transaction
 from django.http import HttpResponseRedirect
 from django.shortcuts import redirect
 from django.views.generic import TemplateView, DetailView
-import time
 from core.permissions import StaffPermission
 from crawler.models import CrawlProduct
 from custom_manage.forms import UploadRequestForm, InitialProductUploadForm, ProductImagesUploadForm, \
     ProductInfoUploadForm
 from custom_manage.utils import upload_s3
 from products.models import ProductUploadRequest, Product, ProductImages, ProductStatus, ProdThumbnail
-from products.slack import slack_message
 from products.supplymentary.models import PurchasedTime
-from products.utils import crawl_request, image_key_list
+from products.tasks import start_crawl
+from products.utils import image_key_list
 
 
 class StaffManageTemplateView(TemplateView):
@@ -103,33 +102,9 @@ class ProductInitialUploadTemplateView(TemplateView):
             product = form.save(commit=False)
             product.save()
             pk = product.id
-            product_url = product.product_url
-
-            if CrawlProduct.objects.filter(product_url=product_url).exists() and \
-                    CrawlProduct.objects.filter(product_url=product_url).last().detail_images.exists():
-                crawl_product_id = CrawlProduct.objects.filter(product_url=product_url).last().id
-            else:
-                start = time.time()
-                sucess, id = crawl_request(product_url)
-                end = time.time() - start
-                if end > 5:  # 5초 이상 걸린 경우 slack noti
-                    slack_message("[최소정보 크롤링 5초이상 지연] \n 걸린시간 {}s, 요청 url: {}".
-                                  format(end, product_url), 'crawl_error_upload')
-                elif not id:
-                    slack_message("[최소정보 크롤링 실패ㅠ] \n 걸린시간 {}s, 요청 url: {}".
-                                  format(end, product_url), 'crawl_error_upload')
-                else:
-                    slack_message("[최소정보 크롤링 성공] \n 걸린시간 {}s, 요청 url: {}".
-                                  format(end, product_url), 'crawl_error_upload')
-                if sucess:
-                    crawl_product_id = id
-                else:
-                    # crawling 실패했을 경우 또는 서버 에러
-                    crawl_product_id = None
-                print(time.time() - start)
-            # product crawl id save
-            product.crawl_product_id = crawl_product_id
-            product.save()
+
+            # crawling 은 celery task 로 처리합니다.
+            start_crawl(product)
 
             return redirect('product_images_upload', pk)
 
@@ -201,6 +176,9 @@ class ProductInfoUploadTemplateView(DetailView):
             crawl_obj = CrawlProduct.objects.get(id=product.crawl_product_id)
             crawl_price = crawl_obj.int_price
             crawl_name = crawl_obj.product_name
+        elif product.crawl_status == Product.CRAWL_PENDING:
+            crawl_name = '크롤링 중 (새로고침 해주세요)'
+            crawl_price = '크롤링 중'
         else:
             crawl_name = '실패'
             crawl_price = '실패'
@@ -6,11 +6,12 @@ from django.contrib.auth import get_user_model
 
 from accounts.models import User
 from core.utils import test_thumbnail_image_url, get_age_fun
-from crawler.models import CrawlProduct
+from crawler.serializers import CrawlDataSerializerMixin, CrawlDataListSerializer
 from products.category.models import Bank
 from transaction.models import Transaction
 from mypage.models import DeliveryPolicy, Accounts
 from payment.models import Wallet
+from products.likes import get_like_count
 from products.models import Product
 
 
@@ -85,7 +86,7 @@ class DeliveryPolicyInfoSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class TransactionHistorySerializer(serializers.ModelSerializer):
+class TransactionHistorySerializer(CrawlDataSerializerMixin, serializers.ModelSerializer):
     thumbnail_image_url = serializers.SerializerMethodField()
     price = serializers.SerializerMethodField()
     name = serializers.SerializerMethodField()
@@ -95,9 +96,13 @@ class TransactionHistorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Transaction
         fields = ['id', 'thumbnail_image_url', 'price', 'name', 'status', 'created_at']
+        list_serializer_class = CrawlDataListSerializer
+
+    @staticmethod
+    def get_crawl_product_ids(obj):
+        return [trade.product.crawl_product_id for trade in obj.deal.trades.all()]
 
     def get_thumbnail_image_url(self, obj):
-        print(obj.deal.trades.first().product)
         self.product = obj.deal.trades.first().product
         if not self.product.crawl_product_id:
             if hasattr(self.product, 'prodthumbnail'):
@@ -107,7 +112,7 @@ class TransactionHistorySerializer(serializers.ModelSerializer):
                 return self.product.images.first().image_url
             except:
                 return test_thumbnail_image_url
-        return CrawlProduct.objects.get(id=self.product.crawl_product_id).thumbnail_image_url
+        return self.crawl_data.thumbnail_image_url(self.product.crawl_product_id)
 
     def get_status(self, obj):
         status = obj.status
@@ -165,7 +170,7 @@ class PurchasedHistorySerializer(TransactionHistorySerializer):
         return seller.nickname
 
 
-class WalletHistorySerializer(serializers.ModelSerializer):
+class WalletHistorySerializer(CrawlDataSerializerMixin, serializers.ModelSerializer):
     thumbnail_image_url = serializers.SerializerMethodField()
     name = serializers.SerializerMethodField()
     age = serializers.SerializerMethodField()
@@ -175,9 +180,14 @@ class WalletHistorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Wallet
         fields = ['id', 'status', 'thumbnail_image_url', 'amount', 'name', 'age', 'buyer_nickname', 'scheduled_date', 'settled_date']
+        list_serializer_class = CrawlDataListSerializer
+
+    @staticmethod
+    def get_crawl_product_ids(obj):
+        return [trade.product.crawl_product_id for trade in obj.deal.trades.all()]
 
     def get_thumbnail_image_url(self, obj):
-        product = obj.deal.trades.first()
+        product = obj.deal.trades.first().product
         if not product.crawl_product_id:
             if hasattr(product, 'prodthumbnail'):
                 return product.prodthumbnail.image_url
@@ -186,7 +196,7 @@ class WalletHistorySerializer(serializers.ModelSerializer):
                 return product.images.first().image_url
             except:
                 return test_thumbnail_image_url
-        return CrawlProduct.objects.get(id=product.crawl_product_id).thumbnail_image_url
+        return self.crawl_data.thumbnail_image_url(product.crawl_product_id)
 
     def get_name(self, obj):
         trades = obj.deal.trades.all()
@@ -208,7 +218,7 @@ class WalletHistorySerializer(serializers.ModelSerializer):
         return seller.nickname
 
 
-class OnSaleProductSerializer(serializers.ModelSerializer):
+class OnSaleProductSerializer(CrawlDataSerializerMixin, serializers.ModelSerializer):
     thumbnail_image_url = serializers.SerializerMethodField()
     view_count = serializers.SerializerMethodField()
     like_count = serializers.SerializerMethodField()
@@ -219,9 +229,9 @@ class OnSaleProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = ['id', 'name', 'price', 'thumbnail_image_url', 'view_count', 'like_count', 'sold', 'is_owner', 'uploaded_at']
+        list_serializer_class = CrawlDataListSerializer
 
-    @staticmethod
-    def get_thumbnail_image_url(obj):
+    def get_thumbnail_image_url(self, obj):
         if not obj.crawl_product_id:
             if hasattr(obj, 'prodthumbnail'):
                 return obj.prodthumbnail.image_url
@@ -230,7 +240,7 @@ class OnSaleProductSerializer(serializers.ModelSerializer):
                 return obj.images.first().image_url
             except:
                 return test_thumbnail_image_url
-        return CrawlProduct.objects.get(id=obj.crawl_product_id).thumbnail_image_url
+        return self.crawl_data.thumbnail_image_url(obj.crawl_product_id)
 
     @staticmethod
     def get_view_count(obj):
@@ -240,9 +250,7 @@ class OnSaleProductSerializer(serializers.ModelSerializer):
 
     @staticmethod
     def get_like_count(obj):
-        if obj.liked.exists():
-            return obj.liked.all().count()
-        return 0
+        return get_like_count(obj)
 
     @staticmethod
     def get_uploaded_at(obj):
@@ -12,10 +12,10 @@ from transaction.models import Transaction
 from mypage.models import Accounts, Address
 from mypage.serializers import SoldHistorySerializer, PurchasedHistorySerializer, \
     OnSaleProductSerializer, SimpleUserInfoSerializer, \
-    WalletHistorySerializer, AccountsSerializer, BankListSerializer, SimpleAccountsSerializer
+    WalletHistorySerializer, AccountsSerializer, SimpleAccountsSerializer
 from payment.models import Wallet
 from payment.serializers import AddressSerializer
-from products.category.models import Bank
+from products.category.reference import bank_data
 from transaction.serializers import SellerTransactionDetailSerializer, BuyerTransactionDetailSerializer
 
 
@@ -65,9 +65,7 @@ class AccountsViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin, mixins.U
 
     @action(methods=['get'], detail=False)
     def bank_list(self, request, *args, **kwargs):
-        qs = Bank.objects.filter(is_active=True)
-        serializer = BankListSerializer(qs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return bank_data.response(request)
 
     @action(methods=['get'], detail=False)
     def simple_accounts(self, request, *args, **kwargs):
@@ -112,10 +110,14 @@ class StoreViewSet(viewsets.GenericViewSet):
 
         sales_products = list(retrieve_user.products.filter(status__sold=False,
                                                             temp_save=False,
-                                                            is_active=True).order_by('-created_at'))
+                                                            is_active=True)
+                              .select_related('status', 'views', 'like_counter', 'prodthumbnail')
+                              .order_by('-created_at'))
         sold_products = list(retrieve_user.products.filter(status__sold=True,
                                                            temp_save=False,
-                                                           is_active=True).order_by('-created_at'))
+                                                           is_active=True)
+                             .select_related('status', 'views', 'like_counter', 'prodthumbnail')
+                             .order_by('-created_at'))
 
         products = sales_products + sold_products
 
@@ -238,7 +240,8 @@ class TransactionHistoryViewSet(viewsets.GenericViewSet, mixins.RetrieveModelMix
 
 
 class WalletViewSet(viewsets.GenericViewSet, mixins.ListModelMixin):
-    queryset = Wallet.objects.all()
+    queryset = Wallet.objects.all().select_related('deal', 'deal__seller')\
+                                   .prefetch_related('deal__trades', 'deal__trades__product',)
     permission_classes = [IsAuthenticated, ]
     serializer_class = WalletHistorySerializer
 
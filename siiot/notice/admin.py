@@ -1,10 +1,21 @@
 from django.contrib import admin
 from custom_manage.sites import staff_panel
 from notice.models import Notice
+from notification.types import NewNoticeNotice
 
 
 class NoticeStaffAdmin(admin.ModelAdmin):
     list_display = ['id', 'title', 'hidden', 'created_at', 'updated_at']
+    actions = ['send_notice_push']
+
+    def send_notice_push(self, request, queryset):
+        # 전체 유저 fan-out 은 celery worker 에서 처리합니다.
+        rows_sent = 0
+        for notice in queryset.filter(hidden=False):
+            NewNoticeNotice(notice=notice).send()
+            rows_sent += 1
+        self.message_user(request, '%d개의 공지사항을 전체 유저에게 알림으로 보냈습니다.' % rows_sent)
+    send_notice_push.short_description = '전체 유저에게 알림 보내기'
 
 
 staff_panel.register(Notice, NoticeStaffAdmin)
@@ -0,0 +1,75 @@
+import requests
+from django.conf import settings
+
+"""
+FCM legacy HTTP api(https://fcm.googleapis.com/fcm/send) 로 multicast push 를 보내는 client 입니다.
+로컬 개발/테스트시 PUSH_NOTIFICATIONS_SETTINGS['FCM_POST_URL'] 을 fake_fcm_server 주소로 설정합니다.
+"""
+
+FCM_POST_URL = 'https://fcm.googleapis.com/fcm/send'
+FCM_BATCH_SIZE = 500
+FCM_REQUEST_TIMEOUT = (3, 10)
+
+# 다시 보내면 성공할 수 있는 token 별 오류
+FCM_RETRYABLE_ERRORS = ('Unavailable', 'InternalServerError')
+# 더 이상 사용할 수 없는 token (GCMDevice 를 비활성화 합니다.)
+FCM_INVALID_TOKEN_ERRORS = ('NotRegistered', 'InvalidRegistration', 'MismatchSenderId')
+
+
+class FCMServerError(Exception):
+    """
+    FCM 서버 오류(5xx, timeout 등)로 batch 전체를 다시 보내야 하는 경우입니다.
+    """
+    def __init__(self, message, retry_after=None):
+        super(FCMServerError, self).__init__(message)
+        self.retry_after = retry_after
+
+
+def get_fcm_settings():
+    push_settings = getattr(settings, 'PUSH_NOTIFICATIONS_SETTINGS', {})
+    return push_settings.get('FCM_POST_URL', FCM_POST_URL), push_settings.get('FCM_API_KEY')
+
+
+def build_payload(notification):
+    """
+    GCMDevice.send_message(content, extra={"title", "icon"}) 와 같은 형태의 notification payload 입니다.
+    """
+    return {
+        'notification': {
+            'title': notification.title,
+            'body': notification.content,
+            'icon': 'ic_notification_icon',
+        },
+        'priority': 'high',
+    }
+
+
+def send_multicast(tokens, payload):
+    """
+    최대 FCM_BATCH_SIZE 개의 token 에 한번에 보냅니다.
+    :return: (다시 보내야 하는 token 목록, 비활성화 해야 하는 token 목록)
+    :raise FCMServerError: batch 전체를 다시 보내야 하는 경우
+    """
+    post_url, api_key = get_fcm_settings()
+    data = dict(payload, registration_ids=list(tokens))
+    headers = {'Authorization': 'key={}'.format(api_key), 'Content-Type': 'application/json'}
+    try:
+        response = requests.post(post_url, json=data, headers=headers, timeout=FCM_REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        raise FCMServerError(str(e))
+
+    if response.status_code >= 500:
+        retry_after = response.headers.get('Retry-After')
+        raise FCMServerError('fcm status {}'.format(response.status_code),
+                             retry_after=int(retry_after) if retry_after and retry_after.isdigit() else None)
+    response.raise_for_status()
+
+    retry_tokens = []
+    invalid_tokens = []
+    for token, result in zip(tokens, response.json().get('results', [])):
+        error = result.get('error')
+        if error in FCM_RETRYABLE_ERRORS:
+            retry_tokens.append(token)
+        elif error in FCM_INVALID_TOKEN_ERRORS:
+            invalid_tokens.append(token)
+    return retry_tokens, invalid_tokens
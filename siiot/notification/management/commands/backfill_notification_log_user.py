@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery
+
+from notification.models import Notification, NotificationUserLog
+
+
+class Command(BaseCommand):
+    """
+    user 가 없는 이전 NotificationUserLog 에 notification.target 을 채웁니다. (user column 추가 후 1회 실행)
+    ex) python manage.py backfill_notification_log_user --chunk-size 5000
+    """
+    help = 'NotificationUserLog.user 를 notification.target 으로 채웁니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        target = Notification.objects.filter(id=OuterRef('notification_id')).values('target_id')[:1]
+        updated = 0
+        last_id = 0
+        while True:
+            log_ids = list(NotificationUserLog.objects.filter(user__isnull=True, id__gt=last_id).order_by('id')
+                           .values_list('id', flat=True)[:options['chunk_size']])
+            if not log_ids:
+                break
+            updated += NotificationUserLog.objects.filter(id__in=log_ids).update(user_id=Subquery(target))
+            last_id = log_ids[-1]
+        self.stdout.write(self.style.SUCCESS('{} logs updated'.format(updated)))
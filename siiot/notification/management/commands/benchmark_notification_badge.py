@@ -0,0 +1,77 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from notification.models import Notification, NotificationUserLog, NotificationUnreadCount
+
+
+class Command(BaseCommand):
+    """
+    알림 빨간 점(MainViewSet.noti) 조회 방식의 응답 시간을 비교합니다.
+    기존 : NotificationUserLog join Notification.target + read_at IS NULL exists()
+    변경 : NotificationUnreadCount 한 row 조회
+    --logs 개의 읽은 알림을 만들어 측정한 뒤 rollback 합니다. (테스트 DB 에서 실행하세요.)
+    ex) python manage.py benchmark_notification_badge --logs 1000000 --users 1000 --repeat 50
+    """
+    help = '알림 badge 조회(기존 exists 방식 / unread counter)의 응답 시간을 비교합니다.'
+
+    BULK_SIZE = 10000
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logs', type=int, default=1000000)
+        parser.add_argument('--users', type=int, default=1000, help='알림을 나누어 받을 기존 유저 수')
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        user_ids = list(get_user_model().objects.order_by('id').values_list('id', flat=True)[:options['users']])
+        if not user_ids:
+            raise CommandError('유저가 없습니다.')
+
+        with transaction.atomic():
+            self.seed(user_ids, options['logs'])
+            # 가장 많은 알림을 받은 유저 (모두 읽음) 기준으로 측정합니다.
+            user_id = user_ids[0]
+            NotificationUnreadCount.objects.filter(user_id=user_id).delete()
+            NotificationUnreadCount.objects.create(user_id=user_id, count=0)
+
+            exists_ms, exists_queries = self.measure(options['repeat'], lambda: NotificationUserLog.objects.filter(
+                notification__target_id=user_id, read_at__isnull=True).exists())
+            counter_ms, counter_queries = self.measure(options['repeat'], lambda: NotificationUnreadCount.objects
+                                                       .get_count(user_id) > 0)
+            transaction.set_rollback(True)
+
+        self.stdout.write('{:<10}{:>14}{:>10}'.format('method', 'latency(ms)', 'queries'))
+        self.stdout.write('{:<10}{:>14.3f}{:>10}'.format('exists', exists_ms, exists_queries))
+        self.stdout.write('{:<10}{:>14.3f}{:>10}'.format('counter', counter_ms, counter_queries))
+
+    def seed(self, user_ids, count):
+        start = time.perf_counter()
+        created = 0
+        while created < count:
+            size = min(self.BULK_SIZE, count - created)
+            notifications = Notification.objects.bulk_create(
+                [Notification(action=101, target_id=user_ids[(created + i) % len(user_ids)], title='benchmark')
+                 for i in range(size)])
+            if notifications[0].pk is None:
+                # bulk_create 로 pk 를 받을 수 없는 DB 인 경우 다시 조회합니다.
+                notifications = list(Notification.objects.filter(title='benchmark', user_logs__isnull=True))
+            NotificationUserLog.objects.bulk_create(
+                [NotificationUserLog(notification=notification, user_id=notification.target_id,
+                                     read_at=notification.created_at)
+                 for notification in notifications])
+            created += size
+        self.stdout.write('seeded {} logs ({:.1f}s)'.format(count, time.perf_counter() - start))
+
+    @staticmethod
+    def measure(repeat, func):
+        queries = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as context:
+                func()
+            queries = len(context.captured_queries)
+        elapsed = (time.perf_counter() - start) * 1000 / repeat
+        return elapsed, queries
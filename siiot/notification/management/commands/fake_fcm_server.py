@@ -0,0 +1,80 @@
+import json
+import random
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """
+    로컬 개발/테스트용 가짜 FCM(legacy http) 서버입니다. 환경변수 SIIOT_FCM_POST_URL 을 이 서버 주소로 설정하여 사용합니다.
+    ex) SIIOT_FCM_POST_URL=http://localhost:8002/fcm/send
+        python manage.py fake_fcm_server --port 8002 --delay 0.2 --error-rate 0.1
+
+    registration id 에 따라 응답합니다.
+    * 'invalid' 포함 : NotRegistered (GCMDevice 비활성화)
+    * 'unavailable' 포함 : Unavailable (해당 token 만 재시도)
+    * 그 외 : 성공, --error-rate 확률로 batch 전체 503 (batch 재시도)
+    """
+    help = 'FCM 서버를 흉내내는 로컬 http 서버를 실행합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8002)
+        parser.add_argument('--delay', type=float, default=0, help='응답 지연 (초)')
+        parser.add_argument('--error-rate', type=float, default=0, help='일시적인 503 응답 확률 (0~1)')
+
+    def handle(self, *args, **options):
+        stdout = self.stdout
+
+        class FakeFCMHandler(BaseHTTPRequestHandler):
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length).decode('utf-8'))
+                tokens = body.get('registration_ids', [])
+
+                if options['delay']:
+                    time.sleep(options['delay'])
+
+                if random.random() < options['error_rate']:
+                    self.send_response(503)
+                    self.send_header('Retry-After', '1')
+                    self.end_headers()
+                    return
+
+                results = []
+                for token in tokens:
+                    if 'invalid' in token:
+                        results.append({'error': 'NotRegistered'})
+                    elif 'unavailable' in token:
+                        results.append({'error': 'Unavailable'})
+                    else:
+                        results.append({'message_id': '0:{}'.format(uuid.uuid4().hex)})
+                failure = len([result for result in results if 'error' in result])
+                content = json.dumps({
+                    'multicast_id': random.randint(1, 10 ** 15),
+                    'success': len(results) - failure,
+                    'failure': failure,
+                    'canonical_ids': 0,
+                    'results': results,
+                }).encode('utf-8')
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+                stdout.write('[fake fcm] {} tokens, {} failed : {}'.format(
+                    len(tokens), failure, body.get('notification', {}).get('title')))
+
+            def log_message(self, format, *args):
+                pass
+
+        server = HTTPServer(('0.0.0.0', options['port']), FakeFCMHandler)
+        self.stdout.write('fake fcm server : http://0.0.0.0:{}/fcm/send'.format(options['port']))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from notification.models import NotificationUserLog, NotificationUnreadCount
+
+
+class Command(BaseCommand):
+    """
+    NotificationUserLog 와 읽음 watermark 로부터 유저별 읽지 않은 알림 수(NotificationUnreadCount)를 다시 계산합니다.
+    배포 직후 최초 생성 및 보정시 사용합니다.
+    ex) python manage.py recount_notification_unread
+    """
+    help = '유저별 읽지 않은 알림 수를 다시 계산합니다.'
+
+    def handle(self, *args, **options):
+        # 읽음 watermark(read_until) 이후에 만들어진 log 만 읽지 않은 알림입니다.
+        read_until = 'user__notification_unread_count__read_until'
+        unread = dict(NotificationUserLog.objects.filter(read_at__isnull=True, user__isnull=False)
+                      .filter(Q(**{read_until + '__isnull': True}) | Q(created_at__gt=F(read_until)))
+                      .values('user').annotate(unread=Count('id'))
+                      .values_list('user', 'unread'))
+
+        with transaction.atomic():
+            NotificationUnreadCount.objects.exclude(user_id__in=unread.keys()).update(count=0)
+            NotificationUnreadCount.objects.bulk_create(
+                [NotificationUnreadCount(user_id=user_id) for user_id in unread.keys()], ignore_conflicts=True)
+            counters = list(NotificationUnreadCount.objects.filter(user_id__in=unread.keys()))
+            for counter in counters:
+                counter.count = unread[counter.user_id]
+            NotificationUnreadCount.objects.bulk_update(counters, ['count', 'updated_at'], batch_size=1000)
+
+        self.stdout.write(self.style.SUCCESS('{} users recounted'.format(len(unread))))
@@ -1,5 +1,9 @@
+from collections import Counter, defaultdict
+
 from django.conf import settings
 from django.db import models
+from django.db.models import F
+from django.utils import timezone
 from accounts.models import User
 # import jsonfield
 
@@ -45,10 +49,81 @@ class Notification(models.Model):
 
 
 class NotificationUserLog(models.Model):
+    """
+    유저별 알림 기록입니다. 한 notification 을 여러 유저에게 보내면(공지 등) 유저마다 한 row 씩 만듭니다.
+    * user 가 null 인 이전 row 는 backfill_notification_log_user 로 notification.target 을 채웁니다.
+    """
     notification = models.ForeignKey(Notification, on_delete=models.CASCADE, related_name='user_logs')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, related_name='notification_logs',
+                             on_delete=models.CASCADE)
     read_at = models.DateTimeField(blank=True, null=True, help_text="유저가 해당 메시지를 읽었다면 null이 아니게 됩니다.")
     deleted_at = models.DateTimeField(blank=True, null=True,
                                       help_text="해당 푸쉬가 보여서는 안될 종류의 것이라면 생성과 동시에 auto_now_add 유저가 해당 메시지를 지웠다면 null이 아니게 됩니다.")
     # extras = jsonfield.JSONField(null=True, blank=True, help_text="json형식으로 추가 정보를 전달할 때 사용합니다.")
     created_at = models.DateTimeField(auto_now_add=True, db_index=True, null=True)
     updated_at = models.DateTimeField(auto_now=True, db_index=True, null=True)
+
+    class Meta:
+        unique_together = ['notification', 'user']
+        indexes = [
+            # 알림 목록 (user, created_at 순), 읽지 않은 알림 (user, read_at IS NULL)
+            models.Index(fields=['user', 'read_at', 'created_at']),
+            models.Index(fields=['user', 'created_at']),
+        ]
+
+
+class NotificationUnreadCountManager(models.Manager):
+
+    def increment(self, user_ids):
+        """
+        user_ids 의 유저마다 읽지 않은 알림 수를 1 (중복된 id 는 등장한 횟수만큼) 증가시킵니다.
+        """
+        increments = defaultdict(list)
+        for user_id, count in Counter(user_id for user_id in user_ids if user_id).items():
+            increments[count].append(user_id)
+        if not increments:
+            return
+        user_ids = [user_id for users in increments.values() for user_id in users]
+        self.bulk_create([self.model(user_id=user_id) for user_id in user_ids], ignore_conflicts=True)
+        for count, users in increments.items():
+            self.filter(user_id__in=users).update(count=F('count') + count, updated_at=timezone.now())
+
+    def mark_read(self, user_id):
+        """
+        유저의 알림을 모두 읽음 처리합니다. log 를 update 하지 않고 read_until(watermark) 만 옮깁니다.
+        :return: 이전 read_until
+        """
+        now = timezone.now()
+        read_until = self.filter(user_id=user_id).values_list('read_until', flat=True).first()
+        if not self.filter(user_id=user_id).update(count=0, previous_read_until=read_until, read_until=now,
+                                                   updated_at=now):
+            self.bulk_create([self.model(user_id=user_id, read_until=now)], ignore_conflicts=True)
+        return read_until
+
+    def get_previous_read_until(self, user_id):
+        """
+        마지막 mark_read 이전의 read_until 입니다. 알림 목록의 다음 페이지에서 첫 페이지와 같은 기준으로 is_read 를 표시합니다.
+        """
+        return self.filter(user_id=user_id).values_list('previous_read_until', flat=True).first()
+
+    def get_count(self, user_id):
+        count = self.filter(user_id=user_id).values_list('count', flat=True).first()
+        return max(count or 0, 0)
+
+
+class NotificationUnreadCount(models.Model):
+    """
+    유저별 읽지 않은 알림 수와 읽음 watermark(read_until) 입니다.
+    MainViewSet.noti(빨간 점)에서 알림 table 을 조회하지 않고 이 row 만 확인합니다.
+    * NotificationUserLog 생성시 증가하고, NotificationViewSet.list 에서 모두 읽음 처리할 때 0 으로 초기화합니다.
+    * created_at 이 read_until 이전인 log 는 read_at 이 null 이어도 읽은 것으로 봅니다.
+    * 관리자 페이지 등에서 직접 만든 log 는 반영되지 않으므로 recount_notification_unread 로 보정합니다.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, related_name='notification_unread_count',
+                                on_delete=models.CASCADE)
+    count = models.IntegerField(default=0)
+    read_until = models.DateTimeField(null=True, blank=True, help_text="이 시각까지 만들어진 알림은 읽은 것으로 봅니다.")
+    previous_read_until = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = NotificationUnreadCountManager()
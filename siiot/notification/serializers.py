@@ -50,10 +50,11 @@ class NotificationListSerializer(serializers.ModelSerializer):
     icon = serializers.SerializerMethodField()
     link = serializers.SerializerMethodField()
     created_at = serializers.SerializerMethodField()
+    is_read = serializers.SerializerMethodField()
 
     class Meta:
         model = NotificationUserLog
-        fields = ['title', 'content', 'icon', 'link', 'created_at']
+        fields = ['title', 'content', 'icon', 'link', 'created_at', 'is_read']
 
     def get_title(self, obj):
         noti = obj.notification
@@ -75,3 +76,10 @@ class NotificationListSerializer(serializers.ModelSerializer):
         created_at = obj.created_at
         created_at = created_at.strftime('%y/%m/%d %H:%M')
         return created_at
+
+    def get_is_read(self, obj):
+        # context['read_until'] : 읽음 watermark (NotificationViewSet.list 참고)
+        if obj.read_at:
+            return True
+        read_until = self.context.get('read_until', None)
+        return bool(read_until and obj.created_at and obj.created_at <= read_until)
@@ -0,0 +1,74 @@
+import random
+
+import requests
+from celery import shared_task
+
+from notification.fcm import FCM_BATCH_SIZE, FCMServerError, build_payload, send_multicast
+from notification.models import Notification
+from notification.tools import FAN_OUT_CHUNK_SIZE, batch, create_user_logs, iter_broadcast_user_ids
+
+PUSH_MAX_RETRIES = 5
+PUSH_RETRY_BACKOFF = 2  # seconds. 2, 4, 8, 16, 32 + jitter
+
+
+def push_retry_countdown(retries, retry_after=None):
+    if retry_after:
+        return retry_after
+    return PUSH_RETRY_BACKOFF * (2 ** retries) + random.randint(0, PUSH_RETRY_BACKOFF)
+
+
+@shared_task(acks_late=True)
+def dispatch_notification(notification_id, user_ids, deleted, broadcast=False):
+    """
+    send_push_async, send_broadcast_async 에서 commit 이후 실행되는 task 입니다.
+    대상 유저를 FAN_OUT_CHUNK_SIZE 개씩 나누어 NotificationUserLog 를 bulk_create 하고,
+    새로 log 를 만든 유저의 FCM token 을 FCM_BATCH_SIZE 개씩 send_push_batch 로 보냅니다.
+    * broadcast 이면 user_ids 대신 전체 유저를 id 순으로 조회하므로 유저 수와 관계없이 메모리가 일정합니다.
+    * 이미 log 가 있는 유저에게는 다시 보내지 않으므로 task 가 재실행되어도 중복 push 가 가지 않습니다.
+    """
+    from push_notifications.models import GCMDevice
+
+    notification = Notification.objects.filter(id=notification_id).first()
+    if notification is None:
+        return
+
+    if broadcast:
+        user_id_chunks = iter_broadcast_user_ids()
+    else:
+        user_id_chunks = batch(list(user_ids), FAN_OUT_CHUNK_SIZE)
+
+    payload = build_payload(notification)
+    for chunk in user_id_chunks:
+        new_user_ids = create_user_logs(notification, chunk, deleted)
+        if not new_user_ids:
+            continue
+        tokens = list(GCMDevice.objects.filter(user_id__in=new_user_ids, active=True)
+                      .values_list('registration_id', flat=True).distinct())
+        for sliced_tokens in batch(tokens, FCM_BATCH_SIZE):
+            send_push_batch.delay(payload, sliced_tokens)
+
+
+@shared_task(bind=True, max_retries=PUSH_MAX_RETRIES, acks_late=True)
+def send_push_batch(self, payload, tokens):
+    """
+    FCM multicast 한번(최대 FCM_BATCH_SIZE 개 token)을 보내는 task 입니다.
+    * FCM 서버 오류시 batch 전체를, token 별 Unavailable 등은 해당 token 만 backoff 로 재시도합니다.
+    * NotRegistered 등 더 이상 사용할 수 없는 token 의 GCMDevice 는 비활성화 합니다.
+    """
+    from push_notifications.models import GCMDevice
+
+    try:
+        retry_tokens, invalid_tokens = send_multicast(tokens, payload)
+    except FCMServerError as e:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=push_retry_countdown(self.request.retries, e.retry_after))
+        return
+    except requests.HTTPError:
+        # 4xx : 잘못된 요청 / api key 이므로 재시도하지 않습니다.
+        return
+
+    if invalid_tokens:
+        GCMDevice.objects.filter(registration_id__in=invalid_tokens).update(active=False)
+
+    if retry_tokens and self.request.retries < self.max_retries:
+        raise self.retry(args=(payload, retry_tokens), countdown=push_retry_countdown(self.request.retries))
@@ -5,9 +5,10 @@ import math
 import operator
 from datetime import datetime
 
+from django.db import transaction
+
 # from core.aws.clients import lambda_client
 from notification.models import Notification, NotificationUserLog
-from notification.serializers import NotificationSerializer
 from notification.types import *
 
 
@@ -17,37 +18,6 @@ def batch(iterable, n=1):
         yield iterable[ndx:min(ndx + n, l)]
 
 
-def _push_android(list_user, notification):
-    serializers = NotificationSerializer(notification)
-    try:
-        serializer_data = serializers.data
-    except Exception as e:
-        serializer_data = None
-
-    if serializer_data:
-        from push_notifications.models import GCMDevice
-        device = GCMDevice.objects.filter(user=list_user[0])
-        device.send_message(notification.content, extra={"title": notification.title, "icon": "ic_notification_icon"})
-    # if serializer_data:
-        # for sliced_endpoints in batch(endpoints, 100):
-        #     data = {
-        #         "action": notification.action,
-        #         "param": serializer_data,
-        #         "is_notifiable": notification.is_notifiable,
-        #     }
-        #     gcm_data = {
-        #         "data": data,
-        #         "priority": "high",
-        #     }
-        #     payload = json.dumps({
-        #         "endpoints": sliced_endpoints,
-        #         "gcm_data": gcm_data,
-        #     })
-        #     lambda_client.invoke(FunctionName="NotificationSender",
-        #                          Payload=payload,
-        #                          InvocationType='Event')
-
-
 # def _push_ios(endpoints, notification, badge=1):
 #     serializers = NotificationSerializer(notification)
 #     try:
@@ -83,44 +53,76 @@ def _push_android(list_user, notification):
 #                                  InvocationType='Event')
 
 
+FAN_OUT_CHUNK_SIZE = 2000
+
+
+def iter_broadcast_user_ids(chunk_size=FAN_OUT_CHUNK_SIZE):
+    """
+    전체(활성) 유저 id 를 chunk_size 개씩 반환합니다. id 기준 keyset 으로 조회하므로 유저 수와 관계없이 메모리가 일정합니다.
+    """
+    from accounts.models import User
+
+    last_id = 0
+    while True:
+        user_ids = list(User.objects.filter(is_active=True, id__gt=last_id).order_by('id')
+                        .values_list('id', flat=True)[:chunk_size])
+        if not user_ids:
+            return
+        yield user_ids
+        last_id = user_ids[-1]
+
+
+def create_user_logs(notification, user_ids, deleted):
+    """
+    user_ids 의 유저마다 notification 의 NotificationUserLog 를 만들고 읽지 않은 알림 수를 증가시킵니다.
+    * 이미 log 가 있는 유저는 건너뛰므로 task 가 다시 실행되어도 중복으로 만들지 않습니다.
+    * 한번에 FAN_OUT_CHUNK_SIZE 개 이하의 user_ids 로 호출합니다.
+    :return: 새로 만든 log 의 user id 목록
+    """
+    from notification.models import NotificationUserLog, NotificationUnreadCount
+
+    deleted_at = datetime.now() if deleted else None
+    existing = set(NotificationUserLog.objects.filter(notification=notification, user_id__in=user_ids)
+                   .values_list('user_id', flat=True))
+    new_user_ids = [user_id for user_id in set(user_ids) if user_id not in existing]
+    if not new_user_ids:
+        return []
+    NotificationUserLog.objects.bulk_create(
+        [NotificationUserLog(notification=notification, user_id=user_id, deleted_at=deleted_at)
+         for user_id in new_user_ids], ignore_conflicts=True)
+    NotificationUnreadCount.objects.increment(new_user_ids)
+    return new_user_ids
+
+
 def send_push_async(list_user, notification, reserved_notification=None):
-    from notification.models import NotificationUserLog
     """
     1. notification model 을 생성합니다. (Notification Type 을 활용합니다.) - on_xxx 방식의 함수에서 요청
     title, content, image, link, is_readable, icon, link, big_image 등등 
 
-    2. 해당 notification 에 해당하는 NotificationUserLog 를 bulkcreate 합니다. - send_push_async 에서 처리 
+    2. 해당 notification 에 해당하는 NotificationUserLog 를 bulkcreate 합니다. - dispatch_notification task 에서 처리
     
-    3. 해당 notification 을 해당 user 들에게 send 합니다. - send_push async 에서 처리
+    3. 해당 notification 을 해당 user 들에게 send 합니다. - dispatch_notification, send_push_batch task 에서 처리
+
+    2, 3 은 요청 중에 FCM 을 기다리지 않도록 commit 이후 celery task 로 실행합니다.
     """
-    # 1. notification model 을 생성합니다.
-    bulk_data = []
-    user_ids = []
-
-    if notification.is_readable:
-        deleted_at = None
-    else:
-        deleted_at = datetime.now()
-
-    # for user in list_user:
-    #     bulk_data.append(
-    #         NotificationUserLog(notification=notification, deleted_at=deleted_at))
-    #     user_ids.append(user.id)
-    #
-    # NotificationUserLog.objects.bulk_create(bulk_data)
-    NotificationUserLog.objects.get_or_create(notification=notification, deleted_at=deleted_at)
-    # device_queryset = SIIOTGCMDevice.objects.filter(user__in=user_ids)
-
-    # badge = 1
-    # if len(list_user) == 1:
-    #     badge = NotificationUserLog.objects.filter(user=list_user[0], read_at=None,
-    #                                                deleted_at=None).distinct().count()
-
-    # android_endpoints = device_queryset.filter(device_type=1).values_list('endpoint_arn', flat=True)
-    _push_android(list_user, notification)
-
-    # ios_endpoints = device_queryset.filter(device_type=2).values_list('endpoint_arn', flat=True)
-    # _push_ios(ios_endpoints, notification, badge=badge)
+    from notification.tasks import dispatch_notification
+
+    notification_id = notification.id
+    user_ids = [user.id if hasattr(user, 'id') else user for user in list_user]
+    deleted = not notification.is_readable
+    transaction.on_commit(lambda: dispatch_notification.delay(notification_id, user_ids, deleted))
+
+
+def send_broadcast_async(notification):
+    """
+    전체 유저에게 notification 을 보냅니다. (공지 등)
+    유저 id 목록을 task 에 넘기지 않고 worker 에서 FAN_OUT_CHUNK_SIZE 개씩 조회하여 log 생성, push 를 처리합니다.
+    """
+    from notification.tasks import dispatch_notification
+
+    notification_id = notification.id
+    deleted = not notification.is_readable
+    transaction.on_commit(lambda: dispatch_notification.delay(notification_id, None, deleted, broadcast=True))
 
 
 # class NotificationHelper(object):
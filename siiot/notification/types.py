@@ -64,8 +64,9 @@ class BaseNotificationType(object):
         return ""
 
     def get_notification(self):
+        # 알림은 매번 새로 발생한 것이므로 9개 column 으로 get_or_create 하지 않고 바로 생성합니다.
         from notification.models import Notification
-        noti, _ = Notification.objects.get_or_create(
+        noti = Notification.objects.create(
             action=self.action,
             target=self.target(),
             title=self.title(),
@@ -408,3 +409,34 @@ class BuyerCancelNotice(BaseNotificationType):
 
     def _from(self):
         return self._from
+
+
+@NotificationType
+class NewNoticeNotice(BaseNotificationType):
+    """
+    새 공지사항을 전체 유저에게 보내는 알림입니다. list_user 대신 send_broadcast_async 로 fan-out 합니다.
+    """
+    action = 301
+    is_readable = True
+    is_notifiable = True
+
+    def __init__(self, notice):
+        self.notice = notice
+        self._from = None
+        super(NewNoticeNotice, self).__init__(list_user=[])
+
+    def title(self):
+        return "공지사항"
+
+    def content(self):
+        return self.notice.title
+
+    def icon(self):
+        return "https://siiot-media-storage.s3.ap-northeast-2.amazonaws.com/%EC%95%8C%EB%A6%BC_2.png"
+
+    def target(self):
+        return None
+
+    def send(self):
+        from notification.tools import send_broadcast_async
+        send_broadcast_async(notification=self.get_notification())
@@ -1,16 +1,14 @@
 # Create your views here.
-from rest_framework import viewsets, mixins, status
+from rest_framework import viewsets, mixins
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.response import Response
 
-from notification.models import NotificationUserLog
+from notification.models import NotificationUserLog, NotificationUnreadCount
 from notification.serializers import NotificationListSerializer
 
-from core.pagination import SiiotPagination
-
-from datetime import datetime
+from core.pagination import paginate
 
 
+@paginate(page_size=20, ordering=('-created_at', '-id'))
 class NotificationViewSet(viewsets.GenericViewSet, mixins.ListModelMixin):
     queryset = NotificationUserLog.objects.all().order_by('-created_at')
     permission_classes = [IsAuthenticated]
@@ -21,13 +19,18 @@ class NotificationViewSet(viewsets.GenericViewSet, mixins.ListModelMixin):
         notification list api
         api : GET api/v1/notification/
         * header token
+        * cursor pagination 입니다. 다음 페이지는 response header 의 cursor-next 로 요청합니다.
+        * 첫 페이지 조회시 읽음 watermark 만 현재 시각으로 옮기고 log 는 update 하지 않습니다.
+          is_read 는 이전 watermark 기준이므로 이번에 새로 본 알림은 (다음 페이지에서도) false 로 내려갑니다.
         """
-        paginator = SiiotPagination()
         user = request.user
-        queryset = self.get_queryset().filter(notification__target=user)
+        queryset = self.get_queryset().filter(user=user).select_related('notification')
         # like_queryset = queryset.filter(notification__action=101)
         # other_queryset = queryset.exclude(notification__action=101)
-        queryset.update(read_at=datetime.now())
-        page = paginator.paginate_queryset(queryset, request)
-        serializer = self.get_serializer(page, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        if self.paginator.cursor_query_param in request.query_params:
+            read_until = NotificationUnreadCount.objects.get_previous_read_until(user.id)
+        else:
+            read_until = NotificationUnreadCount.objects.mark_read(user.id)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True, context={'request': request, 'read_until': read_until})
+        return self.get_paginated_response(serializer.data)
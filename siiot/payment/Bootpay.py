@@ -7,25 +7,33 @@ class BootpayApi:
         'production': 'https://api.bootpay.co.kr'
     }
 
-    def __init__(self, application_id, private_key, mode='production'):
+    def __init__(self, application_id, private_key, mode='production', session=None, timeout=None, url=None):
+        """
+        :param session: 연결을 재사용할 requests.Session (payment.bootpay_client 에서 process 당 하나를 공유합니다.)
+        :param timeout: requests timeout (connect, read)
+        :param url: base_url 대신 사용할 주소 (로컬 stub 서버 등)
+        """
         self.application_id = application_id
         self.pk = private_key
         self.mode = mode
         self.token = None
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.url = url or self.base_url[mode]
 
     def api_url(self, uri=None):
         if uri is None:
             uri = []
-        return '/'.join([self.base_url[self.mode]] + uri)
+        return '/'.join([self.url] + uri)
 
     def get_access_token(self):
         data = {
             'application_id': self.application_id,
             'private_key': self.pk
         }
-        response = requests.post(self.api_url(['request', 'token']), data=data)
+        response = self.session.post(self.api_url(['request', 'token']), data=data, timeout=self.timeout)
         result = response.json()
-        if result['status'] is 200:
+        if result['status'] == 200:
             self.token = result['data']['token']
         return result
 
@@ -35,14 +43,14 @@ class BootpayApi:
                    'name': name,
                    'reason': reason}
 
-        return requests.post(self.api_url(['cancel.json']), data=payload, headers={
+        return self.session.post(self.api_url(['cancel.json']), data=payload, headers={
             'Authorization': self.token
-        }).json()
+        }, timeout=self.timeout).json()
 
     def verify(self, receipt_id):
-        return requests.get(self.api_url(['receipt', receipt_id]), headers={
+        return self.session.get(self.api_url(['receipt', receipt_id]), headers={
             'Authorization': self.token
-        }).json()
+        }, timeout=self.timeout).json()
 
     def subscribe_billing(self, billing_key, item_name, price, order_id, items=None, user_info=None):
         if items is None:
@@ -55,9 +63,9 @@ class BootpayApi:
             'items': items,
             'user_info': user_info
         }
-        return requests.post(self.api_url(['subscribe', 'billing.json']), data=payload, headers={
+        return self.session.post(self.api_url(['subscribe', 'billing.json']), data=payload, headers={
             'Authorization': self.token
-        }).json()
+        }, timeout=self.timeout).json()
 
     def subscribe_billing_reserve(self, billing_key, item_name, price, order_id, execute_at, feedback_url, items=None):
         if items is None:
@@ -72,9 +80,9 @@ class BootpayApi:
             'execute_at': execute_at,
             'feedback_url': feedback_url
         }
-        return requests.post(self.api_url(['subscribe', 'billing', 'reserve.json']), data=payload, headers={
+        return self.session.post(self.api_url(['subscribe', 'billing', 'reserve.json']), data=payload, headers={
             'Authorization': self.token
-        }).json()
+        }, timeout=self.timeout).json()
 
     def get_subscribe_billing_key(self, pg, order_id, item_name, card_no, card_pw, expire_year, expire_month,
                                   identify_number, user_info=None, extra=None):
@@ -92,20 +100,20 @@ class BootpayApi:
             'user_info': user_info,
             'extra': extra
         }
-        return requests.post(self.api_url(['request', 'card_rebill.json']), data=payload, headers={
+        return self.session.post(self.api_url(['request', 'card_rebill.json']), data=payload, headers={
             'Authorization': self.token
-        }).json()
+        }, timeout=self.timeout).json()
 
     def destroy_subscribe_billing_key(self, billing_key):
-        return requests.delete(self.api_url(['subscribe', 'billing', billing_key]), headers={
+        return self.session.delete(self.api_url(['subscribe', 'billing', billing_key]), headers={
             'Authorization': self.token
-        }).json()
+        }, timeout=self.timeout).json()
 
     def remote_link(self, payload={}, sms_payload=None):
         if sms_payload is None:
             sms_payload = {}
         payload['sms_payload'] = sms_payload
-        return requests.post(self.api_url(['app', 'rest', 'remote_link.json']), data=payload).json()
+        return self.session.post(self.api_url(['app', 'rest', 'remote_link.json']), data=payload, timeout=self.timeout).json()
 
     def remote_form(self, remoter_form, sms_payload=None):
         if sms_payload is None:
@@ -115,9 +123,9 @@ class BootpayApi:
             'remote_form': remoter_form,
             'sms_payload': sms_payload
         }
-        return requests.post(self.api_url(['app', 'rest', 'remote_form.json']), data=payload, headers={
+        return self.session.post(self.api_url(['app', 'rest', 'remote_form.json']), data=payload, headers={
             'Authorization': self.token
-        }).json()
+        }, timeout=self.timeout).json()
 
     def send_sms(self, receive_numbers, message, send_number=None, extra={}):
         payload = {
@@ -129,9 +137,9 @@ class BootpayApi:
                 'o_id': extra['o_id']
             }
         }
-        return requests.post(self.api_url(['push', 'sms.json']), data=payload, headers={
+        return self.session.post(self.api_url(['push', 'sms.json']), data=payload, headers={
             'Authorization': self.token
-        }).json()
+        }, timeout=self.timeout).json()
 
     def send_lms(self, receive_numbers, message, subject, send_number=None, extra={}):
         payload = {
@@ -144,11 +152,11 @@ class BootpayApi:
                 'o_id': extra['o_id']
             }
         }
-        return requests.post(self.api_url(['push', 'lms.json']), data=payload, headers={
+        return self.session.post(self.api_url(['push', 'lms.json']), data=payload, headers={
             'Authorization': self.token
-        }).json()
+        }, timeout=self.timeout).json()
 
     def certificate(self, receipt_id):
-        return requests.get(self.api_url(['certificate', receipt_id]), headers={
+        return self.session.get(self.api_url(['certificate', receipt_id]), headers={
             'Authorization': self.token
-        }).json()
\ No newline at end of file
+        }, timeout=self.timeout).json()
\ No newline at end of file
@@ -1,5 +1,5 @@
 from custom_manage.sites import staff_panel
-from payment.models import Commission, Wallet, Trade, Deal, Payment, PaymentErrorLog, TradeErrorLog
+from payment.models import Commission, Wallet, Trade, Deal, Payment, PaymentErrorLog, TradeErrorLog, ProductHold
 from django.contrib import admin
 from django.urls import reverse
 from django.utils.safestring import mark_safe
@@ -73,6 +73,11 @@ class PaymentAdmin(admin.ModelAdmin):
     # user_bank_info.short_description = "판매자 계좌정보"
 
 
+class ProductHoldAdmin(admin.ModelAdmin):
+    list_display = ['pk', 'product', 'payment', 'user', 'expires_at', 'created_at']
+    raw_id_fields = ['product', 'payment', 'user']
+
+
 class DeliveryMemoAdmin(admin.ModelAdmin):
     list_display = ['id', 'memo', 'is_active', 'order']
     list_editable = ['order']
@@ -82,6 +87,7 @@ staff_panel.register(Commission, CommissionAdmin)
 staff_panel.register(Trade, TradeAdmin)
 staff_panel.register(Deal, DealAdmin)
 staff_panel.register(Payment, PaymentAdmin)
+staff_panel.register(ProductHold, ProductHoldAdmin)
 # staff_panel.register(Wallet, WalletLogAdmin)
 staff_panel.register(PaymentErrorLog)
 staff_panel.register(TradeErrorLog)
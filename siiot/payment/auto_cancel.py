@@ -0,0 +1,185 @@
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from payment.bootpay_client import AsyncBootpayClient
+from payment.models import Payment, Trade, Deal, PaymentErrorLog
+from payment.serializers import PaymentCancelSerialzier
+from products.feed.signals import schedule_feed_sync
+from products.models import ProductStatus
+from transaction.models import Transaction
+
+AUTO_CANCEL_REASON = '결제 후 12시간이 지나 판매자 자동거래 취소'
+AUTO_CANCEL_ERROR_DESCRIPTION = '자동거래취소 실패. 부트페이 확인 필요'
+
+
+class AutoCancelWorker(object):
+    """
+    결제 후 due_date(12시간)까지 판매 승인되지 않은 거래(Transaction status=1)를 자동 취소합니다.
+    기존 cron 은 status=1 전체를 조회하여 python 에서 .seconds(일 단위 무시)로 경과 시간을 계산하고,
+    건마다 bootpay token 발급, deal/payment/transaction/trade/status 를 하나씩 save 했습니다.
+
+    bootpay 취소 요청 중에는 DB transaction/row lock 을 잡지 않도록 batch 마다 세 단계로 처리합니다.
+    1. claim : (status, due_date) index 로 기한이 지난 거래를 BATCH_SIZE 개씩 select_for_update(skip_locked) 로 잠그고,
+       payment 를 결제취소진행중(-30)으로 바꾼 뒤 commit 합니다. cron 이 겹쳐 실행되어도 진행중인 거래는 다시 가져가지 않습니다.
+    2. bootpay 취소 : payment(receipt) 당 한번, AsyncBootpayClient 로 connection pool 크기만큼 동시에 요청합니다.
+    3. apply : 취소에 성공한 거래는 model 별 UPDATE 한번(payment 는 bulk_update)으로 취소 처리합니다.
+       실패한 거래는 PaymentErrorLog 를 남기고 결제완료(1)로 되돌려 다음 실행에서 다시 시도하며,
+       MAX_ATTEMPTS 번 실패하면 결제취소실패(-20)로 두어 더 이상 시도하지 않습니다. (admin 에서 확인)
+    * claim 후 process 가 종료되어 CLAIM_TIMEOUT 이 지나도록 결제취소진행중인 거래는 다시 가져갑니다.
+    """
+    BATCH_SIZE = 100
+    MAX_ATTEMPTS = 5
+    CLAIM_TIMEOUT = timedelta(minutes=10)
+
+    def __init__(self, client=None):
+        self.client = client
+
+    def run(self, now=None):
+        """
+        :return: 처리량 metric {"claimed", "cancelled", "failed", "elapsed", "throughput"}
+        """
+        now = now or datetime.now()
+        client = self.client or AsyncBootpayClient()
+        loop = asyncio.new_event_loop()
+        metrics = {'claimed': 0, 'cancelled': 0, 'failed': 0}
+        # 이번 실행에서 실패한 거래는 다시 가져가지 않습니다. (다음 cron 에서 다시 시도)
+        attempted = set()
+        start = time.perf_counter()
+        try:
+            while True:
+                claimed, cancelled = self.run_batch(client, loop, now, attempted)
+                metrics['claimed'] += claimed
+                metrics['cancelled'] += cancelled
+                metrics['failed'] += claimed - cancelled
+                if claimed < self.BATCH_SIZE:
+                    break
+        finally:
+            loop.close()
+            if self.client is None:
+                client.close()
+        metrics['elapsed'] = time.perf_counter() - start
+        metrics['throughput'] = metrics['claimed'] / metrics['elapsed'] if metrics['elapsed'] else 0
+        return metrics
+
+    def run_batch(self, client, loop, now, attempted):
+        """
+        :return: (가져온 거래 수, 취소한 거래 수)
+        """
+        transactions = self.claim(now, attempted)
+        if not transactions:
+            return 0, 0
+        attempted.update(transaction_obj.id for transaction_obj in transactions)
+
+        # 한 payment 에 판매자별 deal 이 여러개일 수 있으므로 receipt 당 한번만 취소 요청합니다.
+        payment_transactions = OrderedDict()
+        for transaction_obj in transactions:
+            payment_transactions.setdefault(transaction_obj.deal.payment_id, []).append(transaction_obj)
+
+        results = loop.run_until_complete(asyncio.gather(*[
+            client.cancel(grouped[0].deal.payment.receipt_id, name=str(grouped[0].deal.buyer),
+                          reason=AUTO_CANCEL_REASON)
+            for grouped in payment_transactions.values()], return_exceptions=True))
+
+        cancelled = []
+        failed = []
+        for grouped, result in zip(payment_transactions.values(), results):
+            payment = grouped[0].deal.payment
+            serializer = None
+            if isinstance(result, dict) and result.get('status') == 200:
+                serializer = PaymentCancelSerialzier(payment, data=result['data'])
+            if serializer is not None and serializer.is_valid():
+                for field, value in serializer.validated_data.items():
+                    setattr(payment, field, value)
+                # 같은 payment 의 deal 들이 취소 결과를 공유하도록 같은 객체를 사용합니다.
+                for transaction_obj in grouped:
+                    transaction_obj.deal.payment = payment
+                cancelled.extend(grouped)
+            else:
+                failed.extend(grouped)
+
+        with transaction.atomic():
+            if cancelled:
+                self.apply(cancelled)
+            if failed:
+                self.fail(failed)
+        return len(transactions), len(cancelled)
+
+    def claim(self, now, attempted=()):
+        """
+        취소할 거래를 가져와 payment 를 결제취소진행중(-30)으로 바꾸고 commit 합니다.
+        결제 취소는 payment 단위이므로 가져온 payment 의 기한이 지난 다른 거래도 함께 가져옵니다.
+        """
+        with transaction.atomic():
+            # 기한이 지나지 않은 결제취소진행중 payment 는 subquery 로 제외하여 transaction row 만 잠급니다.
+            in_progress_deal_ids = Deal.objects.filter(
+                Q(payment__status=-20) |
+                Q(payment__status=-30, transaction__updated_at__gte=now - self.CLAIM_TIMEOUT)).values('id')
+            due_transactions = Transaction.objects.select_for_update(skip_locked=True) \
+                .filter(status=1, due_date__lt=now).exclude(deal_id__in=in_progress_deal_ids)
+            transaction_ids = list(due_transactions.exclude(id__in=attempted)
+                                   .order_by('due_date').values_list('id', flat=True)[:self.BATCH_SIZE])
+            if not transaction_ids:
+                return []
+            payment_ids = set(Deal.objects.filter(transaction__id__in=transaction_ids)
+                              .values_list('payment_id', flat=True))
+            transaction_ids = list(due_transactions.filter(deal__payment_id__in=payment_ids)
+                                   .values_list('id', flat=True))
+            transactions = list(Transaction.objects.filter(id__in=transaction_ids)
+                                .select_related('deal', 'deal__payment', 'deal__buyer').order_by('due_date'))
+            # transaction.updated_at 을 claim 시각으로 사용합니다. (CLAIM_TIMEOUT)
+            Payment.objects.filter(id__in=payment_ids).update(status=-30)
+            Transaction.objects.filter(id__in=transaction_ids).update(updated_at=datetime.now())
+        return transactions
+
+    @staticmethod
+    def apply(transactions):
+        now = datetime.now()
+        deal_ids = [transaction_obj.deal_id for transaction_obj in transactions]
+
+        # payment : 결제 취소 완료 : 한번에 하나 결제이기 떄문에
+        payments = list(OrderedDict((transaction_obj.deal.payment_id, transaction_obj.deal.payment)
+                                    for transaction_obj in transactions).values())
+        for payment in payments:
+            payment.status = 20
+        Payment.objects.bulk_update(payments, ['remain_price', 'remain_tax_free', 'cancelled_price',
+                                               'cancelled_tax_free', 'revoked_at', 'status'])
+        # deal : 결제 취소
+        Deal.objects.filter(id__in=deal_ids).update(status=-2, updated_at=now)
+        # transaction : 결제 취소 시각 저장 및 자동결제취소 status 변경
+        Transaction.objects.filter(id__in=[transaction_obj.id for transaction_obj in transactions]) \
+            .update(status=-3, canceled_at=now, updated_at=now)
+        # trade : 결제 취소
+        Trade.objects.filter(deal_id__in=deal_ids).update(status=2, updated_at=now)
+        # 자동취소 이후 상품 판매 중으로 처리
+        product_ids = list(Trade.objects.filter(deal_id__in=deal_ids).values_list('product_id', flat=True))
+        ProductStatus.objects.filter(product_id__in=product_ids) \
+            .update(sold=False, sold_status=None, purchasing=False, updated_at=now)
+        schedule_feed_sync(product_ids)
+
+    def fail(self, transactions):
+        """
+        취소에 실패한 거래의 PaymentErrorLog 를 남기고, MAX_ATTEMPTS 번 실패한 payment 는 결제취소실패(-20)로 둡니다.
+        나머지는 결제완료(1)로 되돌려 다음 실행에서 다시 시도합니다.
+        """
+        payments = OrderedDict((transaction_obj.deal.payment_id, transaction_obj.deal) for transaction_obj in transactions)
+        payment_ids = list(payments.keys())
+        attempts = dict(PaymentErrorLog.objects.filter(temp_payment_id__in=payment_ids,
+                                                       description=AUTO_CANCEL_ERROR_DESCRIPTION)
+                        .values_list('temp_payment_id').annotate(count=Count('id')).order_by())
+        # 취소 요청은 payment 당 한번이므로 log 도 payment 당 하나 남깁니다.
+        PaymentErrorLog.objects.bulk_create([
+            PaymentErrorLog(user_id=deal.buyer_id, temp_payment_id=payment_id,
+                            description=AUTO_CANCEL_ERROR_DESCRIPTION, bootpay_receipt_id=deal.payment.receipt_id)
+            for payment_id, deal in payments.items()])
+
+        given_up = [payment_id for payment_id in payment_ids if attempts.get(payment_id, 0) + 1 >= self.MAX_ATTEMPTS]
+        Payment.objects.filter(id__in=given_up).update(status=-20)
+        Payment.objects.filter(id__in=set(payment_ids) - set(given_up)).update(status=1)
+
+
+auto_cancel_worker = AutoCancelWorker()
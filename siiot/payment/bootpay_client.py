@@ -0,0 +1,154 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from rest_framework import exceptions
+from urllib3.util.retry import Retry
+
+from .Bootpay import BootpayApi
+from .loader import load_credential
+
+"""
+process 에서 공유하는 bootpay client 입니다.
+기존에는 결제 확인/취소마다 BootpayApi 를 새로 만들어 access token 을 발급받고, session 없이(timeout 없이) 요청했습니다.
+로컬 개발/테스트시 BOOTPAY_SETTINGS['URL'] 을 fake_bootpay_server 주소로 설정합니다.
+"""
+
+BOOTPAY_CONNECT_TIMEOUT = 3
+BOOTPAY_READ_TIMEOUT = 10
+BOOTPAY_POOL_SIZE = 10
+BOOTPAY_VERIFY_RETRIES = 3
+
+# 응답에 만료 시각이 없을 때 사용하는 token 유효 시간 (bootpay token 은 30분간 유효합니다.)
+BOOTPAY_TOKEN_TTL = 60 * 25
+# 만료 직전 token 으로 요청하지 않도록 미리 갱신합니다.
+BOOTPAY_TOKEN_REFRESH_MARGIN = 60
+
+
+def get_bootpay_settings():
+    bootpay_settings = getattr(settings, 'BOOTPAY_SETTINGS', {})
+    return {
+        'url': bootpay_settings.get('URL'),
+        'timeout': (bootpay_settings.get('CONNECT_TIMEOUT', BOOTPAY_CONNECT_TIMEOUT),
+                    bootpay_settings.get('READ_TIMEOUT', BOOTPAY_READ_TIMEOUT)),
+        'pool_size': bootpay_settings.get('POOL_SIZE', BOOTPAY_POOL_SIZE),
+        'verify_retries': bootpay_settings.get('VERIFY_RETRIES', BOOTPAY_VERIFY_RETRIES),
+    }
+
+
+def build_session(pool_size, retries):
+    """
+    keep-alive 연결을 pool_size 개까지 재사용하는 session 입니다.
+    * 연결 실패는 모든 요청을, 502/503/504 와 read 오류는 GET(verify 등 조회)만 backoff 로 재시도합니다.
+      cancel 등 POST 는 서버에서 처리되었을 수 있으므로 응답 이후에는 재시도하지 않습니다.
+    """
+    retry = Retry(total=retries, connect=retries, read=retries, status=retries, backoff_factor=0.3,
+                  status_forcelist=(502, 503, 504), method_whitelist=frozenset(['GET']),
+                  raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class BootpayClient(object):
+    """
+    session(connection pool)과 access token 을 process 안에서 공유하는 bootpay client 입니다.
+    * token 은 만료 BOOTPAY_TOKEN_REFRESH_MARGIN 초 전까지 재사용하며, 만료 응답(401)을 받으면 한번 갱신 후 다시 요청합니다.
+    * JSON 이 아닌 응답은 APIException 으로 바꿔 올립니다. (연결 오류 등은 requests.RequestException)
+    * thread safe 합니다. (uwsgi thread, AsyncBootpayClient 의 thread pool)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._api = None
+        self._expires_at = 0
+
+    def _create_api(self):
+        options = get_bootpay_settings()
+        return BootpayApi(application_id=load_credential("application_id"),
+                          private_key=load_credential("private_key"),
+                          session=build_session(options['pool_size'], options['verify_retries']),
+                          timeout=options['timeout'], url=options['url'])
+
+    def get_api(self, refresh=False):
+        """
+        access token 이 있는 BootpayApi 를 반환합니다.
+        """
+        with self._lock:
+            if self._api is None:
+                self._api = self._create_api()
+            if refresh or self._api.token is None or time.time() >= self._expires_at:
+                self._refresh_token()
+            return self._api
+
+    def _refresh_token(self):
+        try:
+            result = self._api.get_access_token()
+        except (requests.RequestException, ValueError):
+            raise exceptions.APIException(detail='bootpay access token 확인바람')
+        if result.get('status') != 200:
+            self._api.token = None
+            raise exceptions.APIException(detail='bootpay access token 확인바람')
+
+        data = result.get('data', {})
+        lifetime = BOOTPAY_TOKEN_TTL
+        if data.get('expired_at') and data.get('server_time'):
+            # ms 단위 timestamp 입니다. 서버 시각과의 차이로 계산하여 시계 오차의 영향을 받지 않습니다.
+            lifetime = (data['expired_at'] - data['server_time']) / 1000
+        self._expires_at = time.time() + lifetime - BOOTPAY_TOKEN_REFRESH_MARGIN
+
+    def invalidate(self):
+        with self._lock:
+            self._expires_at = 0
+
+    def _call(self, method, *args, **kwargs):
+        try:
+            result = getattr(self.get_api(), method)(*args, **kwargs)
+            if result.get('status') == 401:
+                # 만료된 token 으로 거절된 요청이므로 token 을 갱신하여 한번 더 요청합니다.
+                result = getattr(self.get_api(refresh=True), method)(*args, **kwargs)
+        except ValueError:
+            # 재시도 후에도 gateway 오류(5xx) 등 JSON 이 아닌 응답을 받은 경우입니다. (raise_on_status=False)
+            raise exceptions.APIException(detail='bootpay 응답 확인바람')
+        return result
+
+    def verify(self, receipt_id):
+        return self._call('verify', receipt_id)
+
+    def cancel(self, receipt_id, price=None, name=None, reason=None):
+        return self._call('cancel', receipt_id, price=price, name=name, reason=reason)
+
+
+bootpay_client = BootpayClient()
+
+
+class AsyncBootpayClient(object):
+    """
+    asyncio 에서 사용하는 bootpay client 입니다. (payment.cron 자동 취소 등 여러 건을 동시에 요청할 때)
+    별도 http library 없이 bootpay_client(같은 connection pool, token)를 thread pool 에서 실행하며,
+    동시 요청 수는 max_workers(기본 connection pool 크기)로 제한됩니다.
+    """
+
+    def __init__(self, client=None, max_workers=None):
+        self.client = client or bootpay_client
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or get_bootpay_settings()['pool_size'])
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def verify(self, receipt_id):
+        return await self._run(self.client.verify, receipt_id)
+
+    async def cancel(self, receipt_id, price=None, name=None, reason=None):
+        return await self._run(self.client.cancel, receipt_id, price=price, name=name, reason=reason)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
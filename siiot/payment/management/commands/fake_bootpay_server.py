@@ -0,0 +1,169 @@
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import parse as urlparse
+
+from django.core.management.base import BaseCommand
+
+
+class FakeBootpayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def reply(self, status, body=None):
+        content = json.dumps(body if body is not None else {'status': status}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def reply_unavailable(self):
+        # gateway 의 일시적인 오류처럼 JSON 이 아닌 본문으로 응답합니다.
+        content = b'<html><body><h1>503 Service Temporarily Unavailable</h1></body></html>'
+        self.send_response(503)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def authorized(self):
+        expired_at = self.server.tokens.get(self.headers.get('Authorization'))
+        return expired_at is not None and expired_at > time.time()
+
+    def prepare(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length).decode('utf-8') if length else ''
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        return dict(urlparse.parse_qsl(body))
+
+    def do_POST(self):
+        data = self.prepare()
+        if self.server.should_fail():
+            return self.reply_unavailable()
+        now = time.time()
+        counter = self.server.counter
+
+        if self.path == '/request/token':
+            token = uuid.uuid4().hex
+            self.server.tokens[token] = now + self.server.token_ttl
+            counter['token'] += 1
+            return self.reply(200, {'status': 200, 'code': 0, 'data': {
+                'token': token,
+                'server_time': int(now * 1000),
+                'expired_at': int(self.server.tokens[token] * 1000),
+            }})
+
+        if self.path == '/cancel.json':
+            if not self.authorized():
+                return self.reply(401)
+            counter['cancel'] += 1
+            return self.reply(200, {'status': 200, 'code': 0, 'data': {
+                'receipt_id': data.get('receipt_id'),
+                'remain_price': 0,
+                'remain_tax_free': 0,
+                'cancelled_price': int(data.get('price') or 0),
+                'cancelled_tax_free': 0,
+                'revoked_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'status': 20,
+            }})
+        return self.reply(404)
+
+    def do_GET(self):
+        self.prepare()
+        if self.server.should_fail():
+            return self.reply_unavailable()
+
+        if self.path.startswith('/receipt/'):
+            if not self.authorized():
+                return self.reply(401)
+            receipt_id = self.path[len('/receipt/'):]
+            price = 0
+            if 'price-' in receipt_id:
+                price = int(receipt_id.split('price-')[-1].split('-')[0] or 0)
+            self.server.counter['verify'] += 1
+            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            return self.reply(200, {'status': 200, 'code': 0, 'data': {
+                'receipt_id': receipt_id,
+                'price': price,
+                'remain_price': price,
+                'tax_free': 0,
+                'remain_tax_free': 0,
+                'cancelled_price': 0,
+                'cancelled_tax_free': 0,
+                'requested_at': now,
+                'purchased_at': now,
+                'status': 1,
+            }})
+        return self.reply(404)
+
+    def log_message(self, format, *args):
+        if self.server.stdout is not None:
+            self.server.stdout.write('[fake bootpay] {} {} (token {token}, verify {verify}, cancel {cancel})'.format(
+                self.command, self.path, **self.server.counter))
+
+
+class FakeBootpayServer(ThreadingHTTPServer):
+    """
+    fake bootpay 서버입니다. payment.tests 에서는 port 0 으로 thread 에서 실행합니다.
+    * tokens : 발급한 token 과 만료 시각, 비우면 이후 요청은 401 을 받습니다.
+    * counter : 처리한 token 발급/확인/취소 요청 수 (401, 503 제외)
+    * pending_errors : 다음 요청부터 이 개수만큼 503 으로 응답합니다.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, delay=0, error_rate=0, token_ttl=60 * 30, stdout=None):
+        super(FakeBootpayServer, self).__init__(address, FakeBootpayHandler)
+        self.delay = delay
+        self.error_rate = error_rate
+        self.token_ttl = token_ttl
+        self.stdout = stdout
+        self.tokens = {}
+        self.counter = {'token': 0, 'verify': 0, 'cancel': 0}
+        self.pending_errors = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return 'http://{}:{}'.format(*self.server_address[:2])
+
+    def should_fail(self):
+        with self._lock:
+            if self.pending_errors > 0:
+                self.pending_errors -= 1
+                return True
+        return random.random() < self.error_rate
+
+
+class Command(BaseCommand):
+    """
+    로컬 개발/테스트용 가짜 bootpay rest api 서버입니다. 환경변수 SIIOT_BOOTPAY_URL 을 이 서버 주소로 설정하여 사용합니다.
+    ex) SIIOT_BOOTPAY_URL=http://localhost:8003
+        python manage.py fake_bootpay_server --port 8003 --delay 0.2 --error-rate 0.1 --token-ttl 60
+
+    * POST /request/token : --token-ttl 초 동안 유효한 token 을 발급합니다.
+    * GET /receipt/<receipt_id> : 결제 완료 응답, receipt id 에 'price-<n>' 이 있으면 그 금액으로 응답합니다.
+    * POST /cancel.json : 결제 취소 응답
+    * 만료되었거나 없는 token 은 401, --error-rate 확률로 JSON 이 아닌 503 (GET 만 client 에서 재시도합니다.)
+    """
+    help = 'bootpay rest api 를 흉내내는 로컬 http 서버를 실행합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8003)
+        parser.add_argument('--delay', type=float, default=0, help='응답 지연 (초)')
+        parser.add_argument('--error-rate', type=float, default=0, help='일시적인 503 응답 확률 (0~1)')
+        parser.add_argument('--token-ttl', type=int, default=60 * 30, help='token 유효 시간 (초)')
+
+    def handle(self, *args, **options):
+        server = FakeBootpayServer(('0.0.0.0', options['port']), delay=options['delay'],
+                                   error_rate=options['error_rate'], token_ttl=options['token_ttl'],
+                                   stdout=self.stdout)
+        self.stdout.write('fake bootpay server : http://0.0.0.0:{}'.format(options['port']))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
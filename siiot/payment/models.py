@@ -112,6 +112,19 @@ class Trade(models.Model):  # 카트, 상품 하나하나당 아이디 1개씩
     buyer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='trades_by_buyer')
 
 
+class ProductHold(models.Model):
+    """
+    결제 진행중인 상품의 선점(hold) 입니다. PaymentViewSet.create 에서 ProductStatus 를 잠그고 생성합니다.
+    상품당 하나만 존재할 수 있으며, expires_at 이 지난 hold 는 sweeper(payment.cron.release_expired_holds)가
+    purchasing 을 해제하고 삭제합니다.
+    """
+    product = models.OneToOneField(Product, related_name='hold', on_delete=models.CASCADE)
+    payment = models.ForeignKey(Payment, related_name='holds', on_delete=models.CASCADE)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.SET_NULL)
+    expires_at = models.DateTimeField(db_index=True, help_text='이 시각이 지나면 다른 유저가 구매할 수 있습니다.')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
 class TradeErrorLog(models.Model):
     """
     상품 결제 시 에러 로그 저장.
@@ -0,0 +1,10 @@
+from core.reference_data import ReferenceData
+from payment.models import Commission
+
+
+def _commission_rate():
+    # admin 에서 마지막으로 등록한 수수료를 사용합니다.
+    return Commission.objects.last().rate
+
+
+commission_rate_data = ReferenceData('commission_rate', _commission_rate, [Commission])
@@ -0,0 +1,171 @@
+from datetime import timedelta
+
+import requests
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import exceptions
+
+from payment.bootpay_client import bootpay_client
+from payment.models import Payment, PaymentErrorLog, ProductHold
+from products.models import ProductStatus
+
+
+class ReservationError(Exception):
+    """
+    구매할 수 없는 상품(판매됨, 구매중, 수정중, 숨김, 다른 결제가 잠금중)이 있어 선점하지 못한 경우입니다.
+    """
+    def __init__(self, product_ids):
+        super(ReservationError, self).__init__('cannot reserve products {}'.format(list(product_ids)))
+        self.product_ids = list(product_ids)
+
+
+class ProductReservationService(object):
+    """
+    결제할 상품을 선점(ProductStatus.purchasing + ProductHold)합니다.
+    기존에는 ProductStatus 를 잠그지 않고 조회한 뒤 결제를 시작하여 두 구매자가 동시에 같은 상품을 결제할 수 있었습니다.
+
+    * reserve : ProductStatus 를 select_for_update(skip_locked) 로 잠급니다. 다른 요청이 잠근 상품은 기다리지 않고
+      구매중으로 보아 실패하므로, 동시에 요청해도 한명만 선점합니다.
+    * 결제 승인중(confirm 이후)이 아닌 만료된 hold 는 다른 구매자가 바로 가져갈 수 있고, 나머지는 sweep 이 정리합니다.
+    * confirm 이후(결제승인전) hold 는 APPROVAL_HOLD_TTL 로 연장하며, 만료되면 sweep_unapproved 가 bootpay 에
+      결제 상태를 확인하여 해제합니다. (앱 종료 등으로 done 을 호출하지 않은 경우)
+    """
+    HOLD_TTL = timedelta(minutes=15)
+    APPROVAL_HOLD_TTL = timedelta(hours=1)
+    # 결제 승인 과정이 시작된 payment 의 hold 는 만료되어도 다른 구매자가 가져가거나 sweep 이 해제하지 않습니다.
+    # -1 : bootpay 에서는 결제되었지만 서버에서 완료 처리되지 않아 admin 확인이 필요한 payment (sweep_unapproved)
+    PROCESSING_PAYMENT_STATUS = (1, 2, 3, -1)
+    SWEEP_CHUNK_SIZE = 500
+
+    def reserve(self, payment, product_ids):
+        """
+        transaction 안에서 호출해야 합니다. 실패하면 ReservationError 를 발생시키며, 호출한 transaction 을 rollback 해야 합니다.
+        """
+        product_ids = set(product_ids)
+        now = timezone.now()
+        statuses = list(ProductStatus.objects.select_for_update(skip_locked=True).filter(product_id__in=product_ids))
+        unavailable = product_ids - set(product_status.product_id for product_status in statuses)
+        unavailable.update(product_status.product_id for product_status in statuses
+                           if product_status.sold or product_status.editing or product_status.hiding)
+
+        holds = ProductHold.objects.select_for_update().select_related('payment').filter(product_id__in=product_ids)
+        holds = dict((hold.product_id, hold) for hold in holds)
+        expired_hold_ids = []
+        for product_id, hold in holds.items():
+            if hold.expires_at > now or hold.payment.status in self.PROCESSING_PAYMENT_STATUS:
+                unavailable.add(product_id)
+            else:
+                expired_hold_ids.append(hold.id)
+        unavailable.update(product_status.product_id for product_status in statuses
+                           if product_status.purchasing and product_status.product_id not in holds)
+        if unavailable:
+            raise ReservationError(unavailable)
+
+        if expired_hold_ids:
+            ProductHold.objects.filter(id__in=expired_hold_ids).delete()
+        ProductStatus.objects.filter(id__in=[product_status.id for product_status in statuses]).update(purchasing=True)
+        ProductHold.objects.bulk_create([ProductHold(product_id=product_id, payment=payment, user_id=payment.user_id,
+                                                     expires_at=now + self.HOLD_TTL)
+                                         for product_id in product_ids])
+
+    def lock(self, payment):
+        """
+        payment 의 hold 를 잠그고, 모든 상품을 아직 선점하고 있는지 확인합니다. (결제 승인 전 confirm 에서 사용)
+        모두 선점하고 있으면 결제 승인을 기다리는 동안 hold 를 APPROVAL_HOLD_TTL 로 연장합니다.
+        :return: 선점하지 못한(hold 가 없거나 판매/수정/숨김 처리된) product id 목록
+        """
+        product_ids = set(payment.deal_set.values_list('trades__product_id', flat=True))
+        held = set(ProductHold.objects.select_for_update().filter(payment=payment).values_list('product_id', flat=True))
+        unavailable = set(ProductStatus.objects.filter(product_id__in=held)
+                          .filter(Q(sold=True) | Q(editing=True) | Q(hiding=True)).values_list('product_id', flat=True))
+        unavailable |= product_ids - held
+        if not unavailable:
+            ProductHold.objects.filter(payment=payment).update(expires_at=timezone.now() + self.APPROVAL_HOLD_TTL)
+        return unavailable
+
+    def release(self, payment):
+        """
+        결제 취소/실패시 payment 의 hold 를 삭제하고 판매되지 않은 상품의 purchasing 을 해제합니다.
+        """
+        with transaction.atomic():
+            product_ids = list(ProductHold.objects.select_for_update().filter(payment=payment)
+                               .values_list('product_id', flat=True))
+            self._release(product_ids)
+
+    def complete(self, payment):
+        """
+        결제 완료시 hold 를 삭제합니다. (상품 상태는 sold 로 바뀝니다.)
+        """
+        ProductHold.objects.filter(payment=payment).delete()
+
+    def sweep(self, now=None):
+        """
+        만료된 hold 를 SWEEP_CHUNK_SIZE 개씩 잠가(skip_locked) 해제합니다. 여러 process 에서 동시에 실행해도 됩니다.
+        :return: 해제한 hold 수
+        """
+        now = now or timezone.now()
+        released = 0
+        while True:
+            with transaction.atomic():
+                product_ids = list(ProductHold.objects.select_for_update(skip_locked=True)
+                                   .filter(expires_at__lt=now)
+                                   .exclude(payment__status__in=self.PROCESSING_PAYMENT_STATUS)
+                                   .order_by('expires_at').values_list('product_id', flat=True)[:self.SWEEP_CHUNK_SIZE])
+                self._release(product_ids)
+            released += len(product_ids)
+            if len(product_ids) < self.SWEEP_CHUNK_SIZE:
+                return released
+
+    def sweep_unapproved(self, now=None):
+        """
+        결제승인전(confirm 이후 done 을 호출하지 않은) payment 의 만료된 hold 를 bootpay 결제 상태에 따라 정리합니다.
+        * bootpay 에서 아직 승인중이면 hold 를 APPROVAL_HOLD_TTL 만큼 연장합니다.
+        * 결제되지 않았으면 payment 를 결제승인실패(-2)로 바꾸고 hold 를 해제합니다.
+        * 결제가 완료되었으면 서버에서는 완료 처리가 되지 않았으므로 PaymentErrorLog 를 남기고(admin 에서 환불/완료 처리)
+          payment 를 오류로 인한 결제실패(-1)로 바꿉니다. 다른 구매자가 결제하지 않도록 hold 는 유지하며,
+          admin 에서 환불 후 release 하거나 완료 처리합니다.
+        * bootpay 요청 중에는 lock 을 잡지 않으며, 확인 응답이 없으면 다음 실행에서 다시 확인합니다.
+        :return: 해제한 hold 수
+        """
+        now = now or timezone.now()
+        payments = Payment.objects.filter(status=2, holds__expires_at__lt=now).distinct()
+        released = 0
+        for payment in payments:
+            try:
+                result = bootpay_client.verify(payment.receipt_id)
+            except (requests.RequestException, exceptions.APIException):
+                continue
+            if result.get('status') != 200:
+                continue
+
+            bootpay_status = result['data'].get('status')
+            with transaction.atomic():
+                if bootpay_status in (2, 3):
+                    ProductHold.objects.filter(payment=payment).update(expires_at=now + self.APPROVAL_HOLD_TTL)
+                    continue
+
+                new_status = -1 if bootpay_status == 1 else -2
+                # 확인하는 동안 done 이 처리되었으면 건너뜁니다.
+                if not Payment.objects.filter(id=payment.id, status=2).update(status=new_status):
+                    continue
+                if bootpay_status == 1:
+                    PaymentErrorLog.objects.create(user_id=payment.user_id, temp_payment=payment,
+                                                   description='결제승인전 만료. 결제는 되었으니 부트페이 확인 필요',
+                                                   bootpay_receipt_id=payment.receipt_id)
+                    continue
+                product_ids = list(ProductHold.objects.select_for_update().filter(payment=payment)
+                                   .values_list('product_id', flat=True))
+                self._release(product_ids)
+            released += len(product_ids)
+        return released
+
+    @staticmethod
+    def _release(product_ids):
+        if not product_ids:
+            return
+        ProductHold.objects.filter(product_id__in=product_ids).delete()
+        ProductStatus.objects.filter(product_id__in=product_ids, sold=False).update(purchasing=False)
+
+
+product_reservation = ProductReservationService()
@@ -3,7 +3,7 @@ from rest_framework import serializers
 from accounts.models import User
 from mypage.models import DeliveryPolicy, Address
 from products.category.serializers import SecondCategorySerializer
-from products.models import Product
+from products.models import Product, ProdThumbnail, PRODUCT_THUMBNAIL_PLACEHOLDER_URL
 from products.serializers import ProdThumbnailSerializer
 from .models import Trade, Deal, Payment
 from payment.loader import load_credential
@@ -38,8 +38,9 @@ class ProductForTradeSerializer(serializers.ModelSerializer):
                   'thumbnails', 'size', 'second_category']
 
     def get_thumbnails(self, obj):
-        if not hasattr(obj, 'prodthumbnail'):
-            return {"thumbnail": "https://pepup-server-storages.s3.ap-northeast-2.amazonaws.com/static/img/prodthumbnail_default.png"}
+        # 썸네일이 아직 생성되지 않은 경우 placeholder
+        if not hasattr(obj, 'prodthumbnail') or obj.prodthumbnail.status != ProdThumbnail.READY:
+            return {"thumbnail": PRODUCT_THUMBNAIL_PLACEHOLDER_URL}
         thumbnails = obj.prodthumbnail
         return ProdThumbnailSerializer(thumbnails).data
 
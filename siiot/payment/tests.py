@@ -0,0 +1,221 @@
+import os
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework import exceptions
+
+from mypage.models import Address, DeliveryPolicy
+from payment.bootpay_client import BootpayClient
+from payment.management.commands.fake_bootpay_server import FakeBootpayServer
+from payment.models import Commission, Payment, ProductHold, Trade
+from payment.reservation import product_reservation, ReservationError
+from payment.serializers import PaymentSerializer
+from payment.views import PaymentViewSet
+from products.models import Product, ProductStatus
+from products.shopping_mall.models import ShoppingMall
+
+
+class CheckoutQueryCountTest(TestCase):
+    """
+    결제 시작(PaymentViewSet.create)의 trade 확인, 선점, deal 생성 query 개수가 카트 크기와 관계없이 같은지 확인합니다.
+    """
+    # trades, payment INSERT, 선점(status 잠금, hold 조회, purchasing UPDATE, hold INSERT),
+    # deal INSERT, deal id 조회, trade UPDATE, delivery INSERT, payment UPDATE
+    QUERY_COUNT = 11
+    MAX_CART_SIZE = 50
+    SELLER_COUNT = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.buyer = User.objects.create_user(phone='01000000000', nickname='buyer')
+        cls.address = Address.objects.create(user=cls.buyer, name='구매자', zipNo='12345', Addr='서울시 관악구',
+                                             phone='01000000000', detailAddr='302호')
+        Commission.objects.create(rate=0.1, info='test')
+        shopping_mall = ShoppingMall.objects.create(name='test mall')
+
+        sellers = []
+        for i in range(cls.SELLER_COUNT):
+            seller = User.objects.create_user(phone='0101000000{}'.format(i), nickname='seller{}'.format(i))
+            DeliveryPolicy.objects.create(user=seller)
+            sellers.append(seller)
+
+        cls.products = []
+        for i in range(cls.MAX_CART_SIZE):
+            product = Product.objects.create(seller=sellers[i % cls.SELLER_COUNT], shopping_mall=shopping_mall,
+                                             condition=Product.UNOPENED, name='product{}'.format(i),
+                                             price=10000 + i, temp_save=False, possible_upload=True)
+            ProductStatus.objects.create(product=product)
+            cls.products.append(product)
+
+    def prepare_view(self, products):
+        trade_ids = [Trade.objects.create(product=product, seller_id=product.seller_id, buyer=self.buyer).id
+                     for product in products]
+
+        view = PaymentViewSet()
+        view.user = self.buyer
+        view.data = {}
+        view.address_obj = self.address
+        view.trades_id = trade_ids
+        view.trades = view.get_queryset().filter(pk__in=trade_ids, buyer=self.buyer)
+
+        # client 가 보내는 결제 금액 (수수료 cache 도 여기서 만들어집니다.)
+        trades = list(view.get_queryset().filter(pk__in=trade_ids))
+        price = view.get_total_price([deal for deal, _ in view.build_deals(trades)])
+        view.serializer = PaymentSerializer(data={'trade': trade_ids, 'price': price,
+                                                  'address': self.address.address, 'application_id': 1})
+        view.serializer.is_valid(raise_exception=True)
+        return view
+
+    def test_query_count_does_not_grow_with_cart_size(self):
+        for size in range(1, self.MAX_CART_SIZE + 1):
+            with self.subTest(size=size), transaction.atomic():
+                view = self.prepare_view(self.products[:size])
+                with self.assertNumQueries(self.QUERY_COUNT):
+                    view.check_trades()
+                    view.create_payment()
+                    view.reserve_products()
+                    view.create_deals()
+                self.assertEqual(view.payment.deal_set.count(), min(size, self.SELLER_COUNT))
+                transaction.set_rollback(True)
+
+
+class BootpayClientTest(SimpleTestCase):
+    """
+    fake_bootpay_server 를 띄워 BootpayClient 의 token 재사용/갱신과 재시도를 확인합니다.
+    """
+    VERIFY_RETRIES = 3
+
+    @classmethod
+    def setUpClass(cls):
+        super(BootpayClientTest, cls).setUpClass()
+        cls.server = FakeBootpayServer(('127.0.0.1', 0))
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super(BootpayClientTest, cls).tearDownClass()
+
+    def setUp(self):
+        self.server.tokens.clear()
+        self.server.counter.update(token=0, verify=0, cancel=0)
+        self.server.pending_errors = 0
+
+        bootpay_settings = override_settings(BOOTPAY_SETTINGS={'URL': self.server.url,
+                                                               'VERIFY_RETRIES': self.VERIFY_RETRIES})
+        bootpay_settings.enable()
+        self.addCleanup(bootpay_settings.disable)
+        # load_credential 은 환경 변수를 먼저 확인합니다.
+        credentials = mock.patch.dict(os.environ, {'application_id': 'application_id', 'private_key': 'private_key'})
+        credentials.start()
+        self.addCleanup(credentials.stop)
+        self.bootpay = BootpayClient()
+
+    def test_token_is_reused(self):
+        for receipt_id in ['receipt-1', 'receipt-2', 'receipt-3']:
+            self.assertEqual(self.bootpay.verify(receipt_id)['status'], 200)
+        self.assertEqual(self.server.counter['token'], 1)
+        self.assertEqual(self.server.counter['verify'], 3)
+
+    def test_expired_token_is_refreshed_once(self):
+        self.bootpay.verify('receipt-1')
+        # 서버에서 token 이 만료된 경우 (401)
+        self.server.tokens.clear()
+
+        result = self.bootpay.cancel('receipt-2', name='buyer', reason='test')
+        self.assertEqual(result['status'], 200)
+        self.assertEqual(self.server.counter['token'], 2)
+        self.assertEqual(self.server.counter['cancel'], 1)
+
+    def test_verify_is_retried(self):
+        self.bootpay.get_api()
+        self.server.pending_errors = self.VERIFY_RETRIES - 1
+
+        result = self.bootpay.verify('receipt-price-1000')
+        self.assertEqual(result['status'], 200)
+        self.assertEqual(result['data']['price'], 1000)
+        self.assertEqual(self.server.pending_errors, 0)
+        self.assertEqual(self.server.counter['verify'], 1)
+
+    def test_cancel_is_not_retried(self):
+        self.bootpay.get_api()
+        self.server.pending_errors = 1
+
+        with self.assertRaises(exceptions.APIException):
+            self.bootpay.cancel('receipt-1', name='buyer', reason='test')
+        self.assertEqual(self.server.counter['cancel'], 0)
+
+    def test_non_json_response_after_retries(self):
+        self.bootpay.get_api()
+        # 최초 요청 + 재시도 모두 503 (JSON 이 아닌 본문)
+        self.server.pending_errors = self.VERIFY_RETRIES + 1
+
+        with self.assertRaises(exceptions.APIException):
+            self.bootpay.verify('receipt-1')
+        self.assertEqual(self.server.pending_errors, 0)
+        self.assertEqual(self.server.counter['verify'], 0)
+
+
+class ProductReservationRaceTest(TransactionTestCase):
+    """
+    하나의 상품을 THREAD_COUNT 개의 thread 에서 동시에 선점(product_reservation.reserve)하여 한명만 성공하는지 확인합니다.
+    각 thread 는 별도 db 연결로 barrier 에서 동시에 reserve 하므로 TestCase 의 transaction 안에서 실행하지 않습니다.
+    """
+    THREAD_COUNT = 50
+    BUYER_COUNT = 5
+
+    def setUp(self):
+        User = get_user_model()
+        seller = User.objects.create_user(phone='01000000000', nickname='seller')
+        DeliveryPolicy.objects.create(user=seller)
+        shopping_mall = ShoppingMall.objects.create(name='test mall')
+        self.product = Product.objects.create(seller=seller, shopping_mall=shopping_mall, condition=Product.UNOPENED,
+                                              name='product', price=10000, temp_save=False, possible_upload=True)
+        ProductStatus.objects.create(product=self.product)
+        buyers = [User.objects.create_user(phone='0101000000{}'.format(i), nickname='buyer{}'.format(i))
+                  for i in range(self.BUYER_COUNT)]
+        self.payments = [Payment.objects.create(user=buyers[i % self.BUYER_COUNT], name='reservation race test')
+                         for i in range(self.THREAD_COUNT)]
+
+    def test_only_one_buyer_reserves(self):
+        barrier = threading.Barrier(self.THREAD_COUNT)
+        lock = threading.Lock()
+        winners = []
+        errors = []
+
+        def buy(payment):
+            try:
+                barrier.wait()
+                try:
+                    with transaction.atomic():
+                        product_reservation.reserve(payment, [self.product.id])
+                        # 결제 시작(deal 생성 등) 동안 잠금을 잡고 있는 상황을 흉내냅니다.
+                        time.sleep(0.05)
+                except ReservationError:
+                    return
+                with lock:
+                    winners.append(payment.id)
+            except Exception as e:
+                with lock:
+                    errors.append(repr(e))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=buy, args=(payment,)) for payment in self.payments]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(winners), 1)
+        self.assertEqual(list(ProductHold.objects.filter(product=self.product).values_list('payment_id', flat=True)),
+                         winners)
+        self.assertTrue(ProductStatus.objects.get(product=self.product).purchasing)
@@ -7,7 +7,9 @@ from rest_framework.decorators import authentication_classes, action
 from rest_framework import status, viewsets
 from rest_framework import exceptions
 
-from django.db.models import F, Sum, Q
+from collections import OrderedDict
+
+from django.db.models import Case, When, Value, IntegerField
 from django.http import JsonResponse
 from django.shortcuts import render, get_object_or_404
 from django.db import transaction
@@ -15,12 +17,13 @@ from django.db import transaction
 from chat.models import ChatRoom
 from transaction.models import Delivery, Transaction
 from products.models import Product, ProductStatus
-from .Bootpay import BootpayApi
+from products.feed.signals import schedule_feed_sync
+from .bootpay_client import bootpay_client
 from notification.types import CheckSellConfirmNotice
 # model
-from .loader import load_credential
 from .models import Payment, Trade, Deal, TradeErrorLog, PaymentErrorLog, Wallet
-from payment.models import Commission
+from payment.reference import commission_rate_data
+from payment.reservation import product_reservation, ReservationError
 from chat.models import ChatRoom, ChatMessage
 
 # serializer
@@ -171,16 +174,6 @@ class PaymentViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
         self.data = None
         self.trades_id = None
 
-    @staticmethod
-    def get_access_token():
-        bootpay = BootpayApi(application_id=load_credential("application_id"),
-                             private_key=load_credential("private_key"))
-        result = bootpay.get_access_token()
-        if result['status'] is 200:
-            return bootpay
-        else:
-            raise exceptions.APIException(detail='bootpay access token 확인바람')
-
     def create(self, request, *args, **kwargs):
         """
         bootpay 결제 시작
@@ -217,12 +210,17 @@ class PaymentViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
         self.trades = self.get_queryset().filter(pk__in=self.trades_id, buyer=request.user)
 
         self.check_trades()
-        self.check_sold()
 
         # payment는 삭제하면 안됨
-        with transaction.atomic():
-            self.create_payment()
-            self.create_deals()  # deal 생성과 동시에 상품 상태를 purchasing 으로 바꿈
+        try:
+            with transaction.atomic():
+                self.create_payment()
+                self.reserve_products()  # 상품 상태를 purchasing 으로 바꾸고 hold 생성
+                self.create_deals()
+        except ReservationError as e:
+            TradeErrorLog.objects.create(user=self.user, product_ids=e.product_ids, status=1,
+                                         description="판매되었거나 구매중이거나 수정중인 제품이 있습니다.")
+            raise exceptions.NotAcceptable(detail='구매할 수 없는 상품이 있습니다.')
 
         serializer = PayformSerializer(self.payment, context={
             'addr': self.serializer.validated_data['address'],
@@ -244,36 +242,32 @@ class PaymentViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
         serializer = PaymentConfirmSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        payment = Payment.objects.get(pk=serializer.validated_data['order_id'])
         user = request.user
+        payment = get_object_or_404(Payment, pk=serializer.validated_data['order_id'], user=user)
 
-        if Product.objects.filter(trades__deal__payment=payment) \
-                .filter(Q(status__sold=True)|
-                        Q(status__purchasing=True)|
-                        Q(status__editing=True)|
-                        Q(status__hiding=True)).exists():
-
-            # 구매할 수 없는 상태의 제품이 존재하므로, user의 trades, deal, transaction, payment를 삭제해야함
-            product_ids = Product.objects.filter(trades__deal__payment=payment, sold=True).values_list('id', flat=True)
-
-            deals = payment.deal_set.all()
-
-            for deal in deals:
-                deal.trades.all().delete()
-                deal.delivery.delete()
-            deals.delete()
-            payment.delete()
-
-            TradeErrorLog.objects.create(user=user, product_ids=list(product_ids), status=2,
-                                         description="판매되었거나 구매중이거나 수정중인 제품이 있습니다.")
-            raise exceptions.NotAcceptable(detail='판매된 제품이 포함되어 있습니다.')
-
-        # payment : 결제 승인 전
-        payment.receipt_id = serializer.validated_data['receipt_id']
-        payment.status = 2
-        payment.save()
-
-        return Response(status=status.HTTP_200_OK)
+        with transaction.atomic():
+            # hold 를 잠가 APPROVAL_HOLD_TTL 로 연장합니다. 결제승인전 hold 는 만료되면 bootpay 결제 상태를 확인한 뒤 해제합니다.
+            product_ids = product_reservation.lock(payment)
+            if not product_ids:
+                # payment : 결제 승인 전
+                payment.receipt_id = serializer.validated_data['receipt_id']
+                payment.status = 2
+                payment.save()
+                return Response(status=status.HTTP_200_OK)
+
+        # 선점이 만료되어 다른 유저가 구매중이거나, 구매할 수 없는 상태의 제품이 존재하므로,
+        # user의 trades, deal, transaction, payment를 삭제해야함
+        product_reservation.release(payment)
+        deals = payment.deal_set.all()
+        for deal in deals:
+            deal.trades.all().delete()
+            deal.delivery.delete()
+        deals.delete()
+        payment.delete()
+
+        TradeErrorLog.objects.create(user=user, product_ids=list(product_ids), status=2,
+                                     description="판매되었거나 구매중이거나 수정중인 제품이 있습니다.")
+        raise exceptions.NotAcceptable(detail='판매된 제품이 포함되어 있습니다.')
 
     @transaction.atomic
     @action(methods=['post'], detail=False)
@@ -313,8 +307,7 @@ class PaymentViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
         payment.save()
         buyer = payment.user
 
-        bootpay = self.get_access_token()
-        result = bootpay.verify(receipt_id)
+        result = bootpay_client.verify(receipt_id)
         if result['status'] == 200:
             # 성공!
             if payment.price == result['data']['price']:
@@ -325,6 +318,8 @@ class PaymentViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
                     # 관련 상품 sold처리
                     product_status = ProductStatus.objects.filter(product__trades__deal__payment=payment)
                     product_status.update(sold=True, purchasing=False, sold_status=1)
+                    product_reservation.complete(payment)
+                    schedule_feed_sync(product_status.values_list('product_id', flat=True))
 
                     # 하위 trade 2번처리 : 결제완료
                     trades = Trade.objects.filter(deal__payment=payment)
@@ -360,7 +355,7 @@ class PaymentViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
             payment.save()
 
             # bootpay 취소 요청
-            result = bootpay.cancel(receipt_id, name='siiot', reason='시옷 서버 결제승인 실패로 인한 결제취소')
+            result = bootpay_client.cancel(receipt_id, name='siiot', reason='시옷 서버 결제승인 실패로 인한 결제취소')
             serializer = PaymentCancelSerialzier(payment, data=result['data'])
 
             if serializer.is_valid():
@@ -376,6 +371,7 @@ class PaymentViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
                 # payment : 결제 취소 완료
                 payment.status = 20
                 payment.save()
+                product_reservation.release(payment)
 
                 for deal in payment.deal_set.all():
                     Transaction.objects.create(deal=deal, status=-2, canceled_at=datetime.now())
@@ -402,9 +398,9 @@ class PaymentViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
 
         :param request: order_id(payment id와 동일)
         """
-        payment = Payment.objects.get(pk=request.data.get('order_id'))
+        payment = get_object_or_404(Payment, pk=request.data.get('order_id'), user=request.user)
 
-        ProductStatus.objects.filter(product__trade__deal__payment=payment).update(purchasing=False)
+        product_reservation.release(payment)
         return Response(status=status.HTTP_200_OK)  # hmm..
 
     @action(methods=['post'], detail=False)
@@ -417,9 +413,9 @@ class PaymentViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
 
         :param request: order_id(payment id와 동일)
         """
-        payment = Payment.objects.get(pk=request.data.get('order_id'))
+        payment = get_object_or_404(Payment, pk=request.data.get('order_id'), user=request.user)
 
-        ProductStatus.objects.filter(product__trade__deal__payment=payment).update(purchasing=False)
+        product_reservation.release(payment)
         return Response(status=status.HTTP_200_OK)  # hmm..
 
     def create_payment(self):
@@ -427,56 +423,52 @@ class PaymentViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
 
     def check_trades(self):
         """
-        request trades 가 유효한지 확인합니다.
+        request trades 가 유효한지(모두 유저의 trade 인지) 확인합니다.
+        * self.trades 를 여기서 한번 조회하고, 이후 선점, deal 생성에서 조회 결과를 재사용합니다.
         """
-        if self.trades.exclude(buyer=self.user).exists():
-            product_ids = Product.objects.filter(trades__in=self.trades).values_list('pk', flat=True)
+        if not self.trades or len(self.trades) != len(set(self.trades_id)):
+            product_ids = [trade.product_id for trade in self.trades]
             TradeErrorLog.objects.create(user=self.user, product_ids=product_ids, status=1,
                                          description="잘못된 trades id 로 요청하였습니다.")
             raise exceptions.NotAcceptable(detail='잘못된 정보로 요청하였습니다.')
 
-    def check_total_price(self):
+    def check_total_price(self, deals):
         """
         client 의 price 와 실제 data 상의 price 가 맞는지 check 합니다.
         * 결제 중 seller 가 상품의 가격을 수정하는 경우 에러가 발생합니다.
         """
-        product_price_sum = self.payment.deal_set.aggregate(total_sum=Sum('total'))['total_sum']
-        delivery_charge_sum = self.payment.deal_set.aggregate(delivery_sum=Sum('seller__delivery_policy__general'))['delivery_sum']
-        total = product_price_sum + delivery_charge_sum
-        if total != int(self.serializer.validated_data.get('price')):
-            product_ids = Product.objects.filter(trades__in=self.trades).values_list('pk', flat=True)
+        if self.get_total_price(deals) != int(self.serializer.validated_data.get('price')):
+            product_ids = [trade.product_id for trade in self.trades]
             TradeErrorLog.objects.create(user=self.user, product_ids=product_ids, status=1,
                                          description="상품의 가격이 맞지 않습니다. 결제 중 셀러가 가격을 수정하였거나, 서버 확인이 필요합니다.")
             raise exceptions.NotAcceptable(detail='가격을 확인해주시길 바랍니다.')
 
-    def check_sold(self):
+    @staticmethod
+    def get_total_price(deals):
         """
-        구매 가능한 상품들인지 확인합니다.
-        :return:
+        deal 의 결제금액 합계 + 셀러 기본 배송비 합계 입니다. (기존 aggregate 두번과 같은 값)
         """
-        sold_products_trades = self.trades.filter(Q(product__status__sold=True)|
-                                                  Q(product__status__purchasing=True)|
-                                                  Q(product__status__editing=True)|
-                                                  Q(product__status__hiding=True))
+        return sum(deal.total for deal in deals) + sum(deal.seller.delivery_policy.general for deal in deals)
 
-        if sold_products_trades.exists():
-            product_ids = Product.objects.filter(trades__in=self.trades).values_list('pk', flat=True)
-            # sold_products_trades.delete()  # 만약 결제된 상품이면, 카트(trades)에서 삭제해야함.
-            TradeErrorLog.objects.create(user=self.user, product_ids=list(product_ids), status=1,
-                                         description="판매되었거나 구매중이거나 수정중인 제품이 있습니다.")
-            raise exceptions.NotAcceptable(detail='구매할 수 없는 상품이 있습니다.')
+    def reserve_products(self):
+        """
+        구매 가능한 상품들인지 확인하고 선점합니다. (payment.reservation)
+        * 다른 요청이 결제를 시작중인 상품은 기다리지 않고 구매할 수 없는 상품으로 처리합니다.
+        :raise ReservationError: 판매되었거나 구매중이거나 수정중인 상품이 있는 경우
+        """
+        product_ids = set(trade.product_id for trade in self.trades)
+        product_reservation.reserve(self.payment, product_ids)
 
-    def get_deal_total_and_delivery_charge(self, seller, trades):
+    def get_deal_total_and_delivery_charge(self, seller, trades, commission_rate):
         """
         [DEPRECATED] 셀러별로 묶인 trades 에서 총 금액, 정산금액, 배송비를 계산합니다.
         [UPDATED] 한번에 한개의 상품을 구매하는 것으로 변경
+        :param trades: 한 셀러의 trade list (product select_related)
         """
-        commission_rate = Commission.objects.last().rate  # admin에서 처리
-
-        total_charge = trades.aggregate(total_charge=Sum(F('product__price')))['total_charge']
+        total_charge = sum(trade.product.price for trade in trades)
         if self.data.get('mountain', None):  # client 에서 도서산간 On 했을 때.
             delivery_charge = seller.delivery_policy.mountain
-        elif trades.first().product.free_delivery:
+        elif trades[0].product.free_delivery:
             delivery_charge = 0
         else:
             delivery_charge = seller.delivery_policy.general  # 배송비 할인 없음.
@@ -488,49 +480,60 @@ class PaymentViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
         remain = int(remain[0])
         return total, remain, delivery_charge
 
+    def build_deals(self, trades):
+        """
+        trades 를 셀러별로 묶어 저장하지 않은 deal 목록을 만듭니다. (query 없음, 수수료는 process 에 cache)
+        :return: [(deal, trades)]
+        """
+        trades_by_seller = OrderedDict()
+        for trade in trades:
+            trades_by_seller.setdefault(trade.seller_id, []).append(trade)
+
+        commission_rate = commission_rate_data.data()
+        deals = []
+        for seller_trades in trades_by_seller.values():
+            seller = seller_trades[0].seller
+            total, remain, delivery_charge = self.get_deal_total_and_delivery_charge(seller, seller_trades,
+                                                                                     commission_rate)
+            deals.append((Deal(buyer=self.user, seller=seller, total=total, remain=remain,
+                               delivery_charge=delivery_charge, payment=self.payment), seller_trades))
+        return deals
+
     def create_deals(self):
         """
         trades 를 셀러별로 묶어 deal 을 생성합니다.
+        * trades 를 한번 조회하여 셀러별로 묶고, deal, delivery 는 bulk_create, trade 는 한번의 UPDATE 로 연결합니다.
         """
-        bulk_list_delivery = []
-        for seller_id in self.trades.values_list('seller', flat=True).distinct():  # 서로 다른 셀러들 결제시 한 셀러씩.
+        trades = sorted(self.trades, key=lambda trade: trade.pk)
+        deals_with_trades = self.build_deals(trades)
+        deals = [deal for deal, _ in deals_with_trades]
 
-            trades_groupby_seller = self.trades.filter(seller_id=seller_id)  # 셀러 별로 묶기.
-            seller = trades_groupby_seller.first().seller  # 셀러 인스턴스 가져오기.
-            total, remain, delivery_charge = self.get_deal_total_and_delivery_charge(seller, trades_groupby_seller)
+        # check total sum for seller editing product price during purchasing
+        self.check_total_price(deals)
 
-            deal = Deal.objects.create(
-                buyer=self.user,
-                seller=seller,
-                total=total,
-                remain=remain,
-                delivery_charge=delivery_charge,
-                payment=self.payment
-            )
+        Deal.objects.bulk_create(deals)
+        # bulk_create 로 pk 를 받을 수 없는 DB(mysql) 를 위해 payment 의 deal 을 다시 조회합니다. (payment 당 셀러별 1개)
+        deal_ids = dict(Deal.objects.filter(payment=self.payment).values_list('seller_id', 'id'))
 
-            bulk_list_delivery.append(Delivery(
-                address=self.address_obj,
-                memo=self.serializer.validated_data['memo'],
-                mountain=self.serializer.validated_data['mountain'],
-                state=Delivery._BEFORE_INPUT,
-                deal=deal  # 유저가 결제시(한 셀러 샵에서 여러개 상품 구매시 하나의 delivery생성), 배송 정보 기입.
-            ))
+        Trade.objects.filter(pk__in=[trade.pk for trade in trades]).update(
+            deal_id=Case(*[When(seller_id=seller_id, then=Value(deal_id)) for seller_id, deal_id in deal_ids.items()],
+                         output_field=IntegerField()))
 
-            trades_groupby_seller.update(deal=deal)  # deal 생성 후 trades instance update
+        Delivery.objects.bulk_create([Delivery(
+            address=self.address_obj,
+            memo=self.serializer.validated_data['memo'],
+            mountain=self.serializer.validated_data['mountain'],
+            state=Delivery._BEFORE_INPUT,
+            deal_id=deal_ids[deal.seller_id]  # 유저가 결제시(한 셀러 샵에서 여러개 상품 구매시 하나의 delivery생성), 배송 정보 기입.
+        ) for deal in deals])
 
-        # check total sum for seller editing product price during purchasing
-        self.check_total_price()
         self.payment.price = self.serializer.validated_data['price']
-
-        if self.trades.count() > 1:
-            self.payment.name = self.trades.first().product.name + ' 외 ' + str(self.trades.count() - 1) + '건'
+        if len(trades) > 1:
+            self.payment.name = trades[0].product.name + ' 외 ' + str(len(trades) - 1) + '건'
         else:
-            self.payment.name = self.trades.first().product.name
-
+            self.payment.name = trades[0].product.name
         self.payment.save()
 
-        Delivery.objects.bulk_create(bulk_list_delivery)
-
     @property
     def save_address(self):
         """
@@ -0,0 +1 @@
+default_app_config = 'products.category.apps.CategoryConfig'
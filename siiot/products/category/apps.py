@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CategoryConfig(AppConfig):
+    name = 'products.category'
+
+    def ready(self):
+        # 기준 데이터 cache 의 invalidate signal 연결
+        import products.category.reference  # noqa
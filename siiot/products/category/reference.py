@@ -0,0 +1,68 @@
+from django.http import Http404
+
+from core.reference_data import ReferenceData
+from mypage.serializers import BankListSerializer
+from products.banner.models import MainBanner
+from products.banner.serializers import BannerSerializer
+from products.category.models import FirstCategory, SecondCategory, Size, Color, Bank, PopularTempKeyword
+from products.category.serializers import FirstCategorySerializer, SecondCategorySerializer, SizeSerializer, \
+    ColorSerializer
+from products.serializers import PopularTempKeywordSerializer
+from transaction.models import DeliveryCode
+from transaction.serializers import DeliveryCodeListSerializer
+
+
+def _first_category():
+    queryset = FirstCategory.objects.filter(is_active=True, gender=FirstCategory.WOMAN)
+    return FirstCategorySerializer(queryset, many=True).data
+
+
+def _second_category(first_category_id):
+    if not FirstCategory.objects.filter(pk=first_category_id).exists():
+        raise Http404
+    queryset = SecondCategory.objects.filter(is_active=True, first_category_id=first_category_id)
+    return SecondCategorySerializer(queryset, many=True).data
+
+
+def _size(second_category_id):
+    try:
+        first_category_id = SecondCategory.objects.get(pk=second_category_id).first_category_id
+    except SecondCategory.DoesNotExist:
+        raise Http404
+    queryset = Size.objects.filter(category_id=first_category_id)
+    return SizeSerializer(queryset, many=True).data
+
+
+def _color():
+    queryset = Color.objects.filter(is_active=True).order_by('order')
+    return ColorSerializer(queryset, many=True).data
+
+
+def _bank():
+    queryset = Bank.objects.filter(is_active=True)
+    return BankListSerializer(queryset, many=True).data
+
+
+def _delivery_code():
+    queryset = DeliveryCode.objects.all().order_by('order')
+    return DeliveryCodeListSerializer(queryset, many=True).data
+
+
+def _banner():
+    queryset = MainBanner.objects.filter(is_active=True).order_by('order')
+    return BannerSerializer(queryset, many=True).data
+
+
+def _popular_keyword():
+    queryset = PopularTempKeyword.objects.filter(is_active=True)[:3]
+    return PopularTempKeywordSerializer(queryset, many=True).data
+
+
+first_category_data = ReferenceData('first_category', _first_category, [FirstCategory, SecondCategory])
+second_category_data = ReferenceData('second_category', _second_category, [FirstCategory, SecondCategory])
+size_data = ReferenceData('size', _size, [Size, SecondCategory])
+color_data = ReferenceData('color', _color, [Color])
+bank_data = ReferenceData('bank', _bank, [Bank])
+delivery_code_data = ReferenceData('delivery_code', _delivery_code, [DeliveryCode])
+banner_data = ReferenceData('banner', _banner, [MainBanner])
+popular_keyword_data = ReferenceData('popular_keyword', _popular_keyword, [PopularTempKeyword])
@@ -0,0 +1,10 @@
+from products.view_counter import product_view_buffer
+
+
+def flush_product_views():
+    """
+    redis 에 모아둔 상품 조회수 증가분을 ProductViews 에 저장합니다. (products.view_counter)
+    """
+    flushed = product_view_buffer.flush()
+    if flushed:
+        print("FLUSH PRODUCT VIEWS : {}".format(flushed))
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class FeedConfig(AppConfig):
+    name = 'products.feed'
+
+    def ready(self):
+        import products.feed.signals  # noqa
@@ -0,0 +1,12 @@
+from products.feed.models import ProductFeedEntry
+
+
+def sync_crawled_feed_entries(chunk_size=500):
+    """
+    크롤링 DB(bengal) 는 외부에서 갱신되므로 signal 로 감지할 수 없습니다.
+    crawl_product_id 가 있는 feed row 를 주기적으로 다시 계산하여 원가, 할인율, 썸네일을 맞춰줍니다.
+    """
+    product_ids = list(ProductFeedEntry.objects.filter(crawl_product_id__isnull=False)
+                       .order_by('product_id').values_list('product_id', flat=True))
+    for start in range(0, len(product_ids), chunk_size):
+        ProductFeedEntry.objects.sync(product_ids[start:start + chunk_size])
@@ -0,0 +1,159 @@
+from django.conf import settings
+from django.db import models
+
+from crawler.utils import CrawlDataLoader
+from products.category.models import FirstCategory, SecondCategory, Color
+from products.feed.signals import feed_synced
+from products.models import Product, ProdThumbnail
+from products.shopping_mall.models import ShoppingMall
+
+
+def get_discount_rate(origin_price, price):
+    """
+    ProductMainSerializer 와 동일한 방식으로 할인율을 계산합니다. 할인이 아닌 경우 None 입니다.
+    """
+    if not origin_price or not price:
+        return None
+    if not origin_price - price > 0:
+        return None
+    return round(abs(origin_price - price) / origin_price, 2) * 100
+
+
+def get_thumbnail_image_url(product, crawl_data):
+    """
+    썸네일 우선순위 : 크롤링 썸네일 > ProdThumbnail > 첫번째 상품 이미지
+    """
+    thumbnail_image_url = crawl_data.thumbnail_image_url(product.crawl_product_id)
+    if thumbnail_image_url:
+        return thumbnail_image_url
+
+    if hasattr(product, 'prodthumbnail') and product.prodthumbnail.status == ProdThumbnail.READY:
+        return product.prodthumbnail.image_url
+
+    images = product.images.all()
+    if images:
+        return images[0].image_url
+    return None
+
+
+class ProductFeedEntryManager(models.Manager):
+
+    def sync(self, product_ids):
+        """
+        product_ids 에 해당하는 feed row 를 다시 계산합니다.
+        노출 가능한 상품은 생성/업데이트하고, 노출 불가능해진 상품(삭제, 임시저장 등)의 row 는 삭제합니다.
+        """
+        product_ids = set(product_ids)
+        if not product_ids:
+            return
+
+        products = Product.objects.filter(id__in=product_ids) \
+            .select_related('status', 'prodthumbnail', 'category') \
+            .prefetch_related('images')
+        listable_products = [product for product in products if ProductFeedEntry.is_listable(product)]
+        crawl_data = CrawlDataLoader([product.crawl_product_id for product in listable_products])
+
+        existing = {entry.product_id: entry for entry in self.filter(product_id__in=product_ids)}
+        create_list = []
+        update_list = []
+        for product in listable_products:
+            entry = existing.pop(product.id, None)
+            if entry is None:
+                entry = ProductFeedEntry(product=product)
+                create_list.append(entry)
+            else:
+                update_list.append(entry)
+            entry.fill(product, crawl_data)
+
+        if create_list:
+            self.bulk_create(create_list)
+        if update_list:
+            self.bulk_update(update_list, ProductFeedEntry.SYNC_FIELDS)
+        if existing:
+            self.filter(id__in=[entry.id for entry in existing.values()]).delete()
+
+        feed_synced.send(sender=self.model, product_ids=product_ids)
+
+    def rebuild(self, chunk_size=500):
+        """
+        전체 feed 를 chunk 단위로 다시 만듭니다. (최초 backfill 또는 데이터 보정용)
+        """
+        product_ids = list(Product.objects.filter(is_active=True, temp_save=False)
+                           .order_by('id').values_list('id', flat=True))
+        for start in range(0, len(product_ids), chunk_size):
+            self.sync(product_ids[start:start + chunk_size])
+        # 더이상 노출되지 않는 상품의 row 정리
+        self.exclude(product__is_active=True, product__temp_save=False).delete()
+
+
+class ProductFeedEntry(models.Model):
+    """
+    main, 검색, 찜 목록에서 사용하는 상품 feed read model 입니다.
+    Product, ProductStatus, ProdThumbnail, ShoppingMall, CrawlProduct 정보를 상품당 한 row 로 저장하여
+    join 및 crawler DB 조회 없이 한 테이블에서 조회할 수 있도록 합니다.
+    * Product, ProductStatus, ProdThumbnail 저장/삭제시 signal 로 갱신됩니다.
+    * queryset.update() 로 상태를 바꾸는 경우 signal 이 발생하지 않으므로 schedule_feed_sync 를 호출해야 합니다.
+    """
+    SYNC_FIELDS = ['seller', 'name', 'price', 'origin_price', 'discount_rate', 'thumbnail_image_url',
+                   'crawl_product_id', 'condition', 'receipt_certify', 'shopping_mall', 'first_category',
+                   'category', 'color', 'sold', 'hiding', 'created_at']
+
+    product = models.OneToOneField(Product, related_name='feed_entry', on_delete=models.CASCADE)
+    seller = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='feed_entries', on_delete=models.CASCADE)
+
+    name = models.CharField(max_length=100, null=True, blank=True)
+    price = models.IntegerField(null=True, blank=True)
+    origin_price = models.IntegerField(null=True, blank=True, help_text="크롤링된 원가입니다.")
+    discount_rate = models.FloatField(null=True, blank=True)
+    thumbnail_image_url = models.CharField(max_length=500, null=True, blank=True)
+    crawl_product_id = models.IntegerField(null=True, blank=True)
+    condition = models.IntegerField(choices=Product.CONDITION)
+    receipt_certify = models.BooleanField(default=False, help_text="구매내역 첨부 여부")
+
+    shopping_mall = models.ForeignKey(ShoppingMall, related_name='feed_entries', on_delete=models.CASCADE)
+    first_category = models.ForeignKey(FirstCategory, null=True, blank=True, on_delete=models.SET_NULL)
+    category = models.ForeignKey(SecondCategory, null=True, blank=True, on_delete=models.SET_NULL)
+    color = models.ForeignKey(Color, null=True, blank=True, on_delete=models.SET_NULL)
+
+    sold = models.BooleanField(default=False)
+    hiding = models.BooleanField(default=False)
+
+    created_at = models.DateTimeField(help_text="상품의 created_at 입니다. feed 정렬 기준입니다.")
+    synced_at = models.DateTimeField(auto_now=True)
+
+    objects = ProductFeedEntryManager()
+
+    class Meta:
+        verbose_name = '상품 feed'
+        verbose_name_plural = '상품 feed'
+        indexes = [
+            models.Index(fields=['hiding', '-created_at']),
+            models.Index(fields=['hiding', 'first_category', 'color', '-created_at']),
+            models.Index(fields=['hiding', 'sold', 'shopping_mall', '-created_at']),
+            models.Index(fields=['hiding', 'sold', 'category', '-created_at']),
+        ]
+
+    @staticmethod
+    def is_listable(product):
+        return product.is_active and not product.temp_save and hasattr(product, 'status')
+
+    def fill(self, product, crawl_data):
+        status = product.status
+        origin_price = crawl_data.int_price(product.crawl_product_id)
+
+        self.seller_id = product.seller_id
+        self.name = product.name
+        self.price = product.price
+        self.origin_price = origin_price
+        self.discount_rate = get_discount_rate(origin_price, product.price)
+        self.thumbnail_image_url = get_thumbnail_image_url(product, crawl_data)
+        self.crawl_product_id = product.crawl_product_id
+        self.condition = product.condition
+        self.receipt_certify = bool(product.receipt_id)
+        self.shopping_mall_id = product.shopping_mall_id
+        self.first_category_id = product.category.first_category_id if product.category else None
+        self.category_id = product.category_id
+        self.color_id = product.color_id
+        self.sold = status.sold
+        self.hiding = status.hiding
+        self.created_at = product.created_at
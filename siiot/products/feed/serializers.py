@@ -0,0 +1,54 @@
+from rest_framework import serializers
+
+from products.feed.models import ProductFeedEntry
+from products.likes import LikedProductSerializerMixin
+from products.shopping_mall.serializers import ShoppingMallSerializer
+
+
+class ProductFeedEntrySerializer(LikedProductSerializerMixin, serializers.ModelSerializer):
+    """
+    ProductFeedEntry 를 ProductMainSerializer 와 동일한 형태로 내려주는 serializer 입니다.
+    크롤링 데이터는 feed row 에 미리 계산되어 있으므로 crawler DB 를 조회하지 않습니다.
+    is_liked 는 유저별 찜 목록 cache 로 페이지 전체를 한번에 확인합니다.
+    """
+    id = serializers.IntegerField(source='product_id')
+    name = serializers.SerializerMethodField()
+    price = serializers.SerializerMethodField()
+    is_owner = serializers.SerializerMethodField()
+    is_liked = serializers.SerializerMethodField()
+    shopping_mall = ShoppingMallSerializer()
+
+    class Meta:
+        model = ProductFeedEntry
+        fields = ['id',
+                  'name',
+                  'thumbnail_image_url',
+                  'price',
+                  'sold',
+                  'is_owner',
+                  'is_liked',
+                  'discount_rate',
+                  'shopping_mall',
+                  'origin_price',
+                  'condition',
+                  'receipt_certify'
+                  ]
+
+    def get_name(self, obj):
+        if obj.name:
+            return obj.name
+        return '이름 없는 상품'
+
+    def get_price(self, obj):
+        if obj.price:
+            return obj.price
+        return 0
+
+    def get_is_owner(self, obj):
+        user = self.context['request'].user
+        if obj.seller_id == user.id:
+            return True
+        return False
+
+    def get_is_liked(self, obj):
+        return self.is_liked_product(obj.product_id)
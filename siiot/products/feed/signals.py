@@ -0,0 +1,53 @@
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver, Signal
+
+from products.models import Product, ProductStatus, ProdThumbnail, ProductImages
+
+_pending = threading.local()
+
+# ProductFeedEntryManager.sync 가 끝난 뒤 발생합니다. (검색 색인 등 feed row 를 기준으로 하는 데이터 갱신용)
+feed_synced = Signal(providing_args=['product_ids'])
+
+
+def _flush():
+    from products.feed.models import ProductFeedEntry
+
+    product_ids = getattr(_pending, 'product_ids', None)
+    _pending.product_ids = None
+    if product_ids:
+        ProductFeedEntry.objects.sync(product_ids)
+
+
+def schedule_feed_sync(product_ids):
+    """
+    transaction 이 commit 된 뒤 feed row 를 갱신합니다.
+    한 transaction 안에서 여러번 호출되어도 product id 를 모아 처음 실행되는 _flush 에서 한번에 sync 하고,
+    나머지 _flush 는 비어있는 상태로 바로 끝납니다. (rollback 으로 남은 id 는 다음 sync 에 포함되며, 다시 계산해도 무방합니다.)
+    """
+    product_ids = set(product_ids)
+    if not product_ids:
+        return
+    pending = getattr(_pending, 'product_ids', None)
+    if pending is None:
+        _pending.product_ids = pending = set()
+    pending.update(product_ids)
+    transaction.on_commit(_flush)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def product_changed(sender, instance, **kwargs):
+    schedule_feed_sync([instance.id])
+
+
+@receiver(post_save, sender=ProductStatus)
+@receiver(post_save, sender=ProdThumbnail)
+@receiver(post_save, sender=ProductImages)
+@receiver(post_delete, sender=ProductStatus)
+@receiver(post_delete, sender=ProdThumbnail)
+@receiver(post_delete, sender=ProductImages)
+def product_related_changed(sender, instance, **kwargs):
+    schedule_feed_sync([instance.product_id])
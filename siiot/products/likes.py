@@ -0,0 +1,185 @@
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction, IntegrityError
+from django.db.models import F, Count, Q
+from django.utils import timezone
+
+from notification.types import ProductLikeNotice
+from products.models import Product, ProductLike, ProductLikeCount
+
+
+def update_like_counts(deltas):
+    """
+    찜 개수를 증감합니다. 같은 증감분끼리 묶어서 UPDATE count = count + n 으로 처리합니다.
+    :param deltas: {product_id: 증감분}
+    """
+    deltas = dict((product_id, delta) for product_id, delta in deltas.items() if delta)
+    if not deltas:
+        return
+    ProductLikeCount.objects.bulk_create([ProductLikeCount(product_id=product_id) for product_id in deltas.keys()],
+                                         ignore_conflicts=True)
+
+    grouped = defaultdict(list)
+    for product_id, delta in deltas.items():
+        grouped[delta].append(product_id)
+    now = timezone.now()
+    for delta, product_ids in grouped.items():
+        ProductLikeCount.objects.filter(product_id__in=product_ids).update(count=F('count') + delta, updated_at=now)
+
+
+def recount_like_counts(product_ids=None, chunk_size=1000):
+    """
+    ProductLike 로부터 찜 개수를 다시 계산합니다. (최초 생성, 보정용)
+    """
+    queryset = Product.objects.all()
+    if product_ids is not None:
+        queryset = queryset.filter(id__in=product_ids)
+    queryset = queryset.annotate(liked_count=Count('liked', filter=Q(liked__is_liked=True))) \
+        .values_list('id', 'liked_count').order_by('id')
+
+    rows = list(queryset)
+    for i in range(0, len(rows), chunk_size):
+        chunk = dict(rows[i:i + chunk_size])
+        with transaction.atomic():
+            ProductLikeCount.objects.bulk_create([ProductLikeCount(product_id=product_id) for product_id in chunk],
+                                                 ignore_conflicts=True)
+            counters = list(ProductLikeCount.objects.filter(product_id__in=chunk.keys()))
+            for counter in counters:
+                counter.count = chunk[counter.product_id]
+            ProductLikeCount.objects.bulk_update(counters, ['count', 'updated_at'])
+    return len(rows)
+
+
+def get_like_count(product):
+    if hasattr(product, 'like_counter'):
+        return max(product.like_counter.count, 0)
+    return 0
+
+
+class LikedProductCache(object):
+    """
+    유저별 찜한 product id set 을 cache 합니다.
+    list serializer 에서 상품마다 ProductLike 를 조회하지 않고 set 으로 is_liked 를 확인하기 위해 사용합니다.
+    * 찜/찜 해제시 commit 이후 invalidate 하며, 다음 조회시 다시 만듭니다.
+    """
+    CACHE_KEY = 'liked_products:{}'
+    TTL = 60 * 60 * 24
+
+    def get(self, user_id):
+        key = self.CACHE_KEY.format(user_id)
+        product_ids = cache.get(key)
+        if product_ids is None:
+            product_ids = frozenset(ProductLike.objects.filter(user_id=user_id, is_liked=True)
+                                    .values_list('product_id', flat=True))
+            cache.set(key, product_ids, self.TTL)
+        return product_ids
+
+    def invalidate(self, user_id):
+        transaction.on_commit(lambda: cache.delete(self.CACHE_KEY.format(user_id)))
+
+
+liked_product_cache = LikedProductCache()
+
+
+class ProductLikeService(object):
+    """
+    찜/찜 해제를 처리합니다. ProductViewSet 의 like, bulk_like, delete_like 에서 사용합니다.
+    * 이미 있는 row 는 select_for_update 로 잠근 뒤 조건부 UPDATE 하고, 없는 row 는 (user, product) unique key 로
+      중복을 막아 INSERT 합니다. 동시에 눌러도 찜 개수가 두번 증감하지 않습니다.
+    * 처음 찜한 경우(row 생성)에만 commit 이후 판매자에게 ProductLikeNotice 를 보냅니다.
+    """
+
+    def toggle(self, user, product_id):
+        """
+        :return: 변경 후 찜 여부
+        """
+        with transaction.atomic():
+            like = ProductLike.objects.select_for_update().filter(user=user, product_id=product_id).first()
+            if like is None:
+                if self._create(user, [product_id]):
+                    self._changed(user, {product_id: 1}, [product_id])
+                    return True
+                # 동시에 다른 요청이 먼저 만든 경우
+                like = ProductLike.objects.select_for_update().get(user=user, product_id=product_id)
+
+            is_liked = not like.is_liked
+            ProductLike.objects.filter(id=like.id, is_liked=like.is_liked).update(is_liked=is_liked)
+            self._changed(user, {product_id: 1 if is_liked else -1}, [])
+        return is_liked
+
+    def set_likes(self, user, product_ids, is_liked):
+        """
+        product_ids 를 모두 찜(is_liked=True) 또는 찜 해제 합니다. 이미 같은 상태인 상품은 변경하지 않습니다.
+        :return: 상태가 바뀐 product id 목록
+        """
+        product_ids = set(int(product_id) for product_id in product_ids)
+        with transaction.atomic():
+            existing = {}
+            for like_id, product_id, liked in ProductLike.objects.select_for_update() \
+                    .filter(user=user, product_id__in=product_ids).values_list('id', 'product_id', 'is_liked'):
+                existing[product_id] = (like_id, liked)
+
+            changed = [product_id for product_id, (_, liked) in existing.items() if liked != is_liked]
+            if changed:
+                ProductLike.objects.filter(id__in=[existing[product_id][0] for product_id in changed]) \
+                    .update(is_liked=is_liked)
+
+            created = []
+            if is_liked:
+                missing = Product.objects.filter(id__in=product_ids - set(existing.keys()), is_active=True) \
+                    .values_list('id', flat=True)
+                created = self._create(user, missing)
+
+            delta = 1 if is_liked else -1
+            self._changed(user, dict((product_id, delta) for product_id in changed + created), created)
+        return changed + created
+
+    @staticmethod
+    def _create(user, product_ids):
+        created = []
+        for product_id in product_ids:
+            try:
+                with transaction.atomic():
+                    ProductLike.objects.create(user=user, product_id=product_id, is_liked=True)
+            except IntegrityError:
+                continue
+            created.append(product_id)
+        return created
+
+    def _changed(self, user, deltas, created):
+        update_like_counts(deltas)
+        liked_product_cache.invalidate(user.id)
+        if created:
+            transaction.on_commit(lambda: self._notify(user.id, created))
+
+    @staticmethod
+    def _notify(user_id, product_ids):
+        for product in Product.objects.filter(id__in=product_ids).select_related('seller'):
+            ProductLikeNotice(product=product, list_user=[product.seller], _from=user_id).send()
+
+
+product_like_service = ProductLikeService()
+
+
+class LikedProductSerializerMixin(object):
+    """
+    is_liked 를 표시하는 serializer 에서 사용하는 mixin 입니다.
+    요청한 유저의 찜 목록을 context 에 한번만 불러와 페이지 전체에서 사용합니다.
+    """
+    liked_product_context_key = 'liked_product_ids'
+
+    @property
+    def liked_product_ids(self):
+        product_ids = self.context.get(self.liked_product_context_key, None)
+        if product_ids is None:
+            request = self.context.get('request', None)
+            if request is None or request.user.is_anonymous:
+                product_ids = frozenset()
+            else:
+                product_ids = liked_product_cache.get(request.user.id)
+            self.context[self.liked_product_context_key] = product_ids
+        return product_ids
+
+    def is_liked_product(self, product_id):
+        return product_id in self.liked_product_ids
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from products.likes import recount_like_counts
+from products.models import ProductLike
+
+
+class Command(BaseCommand):
+    """
+    (user, product) 가 중복된 ProductLike 를 하나만 남기고 지운 뒤 해당 상품의 ProductLikeCount 를 다시 계산합니다.
+    ProductLike 의 unique_together 를 DB 에 반영하기 전에 실행합니다. (중복 row 가 있으면 index 생성이 실패합니다.)
+    * 찜한(is_liked=True) row 가 있으면 그 중 최근 row 를, 없으면 최근 row 를 남깁니다.
+    ex) python manage.py dedupe_product_likes --chunk-size 500
+    """
+    help = '중복된 상품 찜(ProductLike)을 정리하고 찜 개수를 다시 계산합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        pairs = list(ProductLike.objects.values_list('user_id', 'product_id').annotate(count=Count('id'))
+                     .filter(count__gt=1).order_by())
+        chunk_size = options['chunk_size']
+        deleted = 0
+        product_ids = set()
+        for i in range(0, len(pairs), chunk_size):
+            chunk = set((user_id, product_id) for user_id, product_id, _ in pairs[i:i + chunk_size])
+            rows = ProductLike.objects.filter(user_id__in=set(user_id for user_id, _ in chunk),
+                                              product_id__in=set(product_id for _, product_id in chunk)) \
+                .order_by('-is_liked', '-id').values_list('id', 'user_id', 'product_id')
+
+            kept = set()
+            duplicate_ids = []
+            for like_id, user_id, product_id in rows:
+                if (user_id, product_id) not in chunk:
+                    continue
+                if (user_id, product_id) in kept:
+                    duplicate_ids.append(like_id)
+                else:
+                    kept.add((user_id, product_id))
+                    product_ids.add(product_id)
+
+            with transaction.atomic():
+                deleted += ProductLike.objects.filter(id__in=duplicate_ids).delete()[0]
+
+        if product_ids:
+            recount_like_counts(product_ids=product_ids)
+        self.stdout.write(self.style.SUCCESS('{} duplicated likes deleted, {} products recounted'
+                                             .format(deleted, len(product_ids))))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from products.likes import recount_like_counts
+
+
+class Command(BaseCommand):
+    """
+    ProductLike 로부터 ProductLikeCount 를 다시 계산합니다. 배포 직후 최초 생성 및 보정시 사용합니다.
+    ex) python manage.py recount_product_likes
+    """
+    help = '상품 찜 개수(ProductLikeCount)를 다시 계산합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = recount_like_counts(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS('{} products recounted'.format(count)))
@@ -1,14 +1,11 @@
 from django.conf import settings
-from django.db import models
-from io import BytesIO
-import requests
+from django.db import models, transaction
 from core.fields import S3ImageKeyField
 from products.category.models import MixCategory, Size, Color, SecondCategory
 from products.shopping_mall.models import ShoppingMall
 from products.supplymentary.models import SizeCaptureImage, PurchasedTime, PurchasedReceipt
 from imagekit.models import ProcessedImageField
 from imagekit.processors import ResizeToFill
-from django.core.files.uploadedfile import InMemoryUploadedFile
 
 
 def img_directory_path_profile(instance, filename):
@@ -52,6 +49,18 @@ class Product(models.Model):
     # crawl product id
     crawl_product_id = models.IntegerField(null=True, blank=True)
 
+    # crawl status : 상품 등록시 crawling 은 celery task 로 처리되며, client 는 이 값을 polling 합니다.
+    CRAWL_PENDING = 0
+    CRAWL_DONE = 1
+    CRAWL_FAILED = 2
+    CRAWL_STATUS = (
+        (CRAWL_PENDING, '크롤링 중'),
+        (CRAWL_DONE, '크롤링 완료'),
+        (CRAWL_FAILED, '크롤링 실패'),
+    )
+    crawl_status = models.IntegerField(choices=CRAWL_STATUS, default=CRAWL_DONE,
+                                       help_text="crawling task 진행 상태입니다. 실패시 임시 데이터를 보여줍니다.")
+
     # user input data
     name = models.CharField(max_length=100, null=True, blank=True, verbose_name='상품명',
                             help_text="쇼핑몰 상품명과 다르게 저장하기 위해 사용")
@@ -79,7 +88,7 @@ class Product(models.Model):
     refresh_date = models.DateTimeField(null=True, blank=True,
                                         help_text="끌어올리기 기능을 구현하기 위해 사용합니다. 하루에 1번 제한 등을 위해 참고합니다.")
 
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, help_text="main feed cursor 정렬 기준입니다.")
     updated_at = models.DateTimeField(auto_now=True)
 
     is_active = models.BooleanField(default=True, help_text="상품 삭제시 False")
@@ -163,7 +172,25 @@ def thumb_directory_path(instance, filename):
     return 'user/{}/products/thumbnail_{}'.format(instance.product.seller.id, filename)
 
 
+PRODUCT_THUMBNAIL_PLACEHOLDER_URL = \
+    'https://pepup-server-storages.s3.ap-northeast-2.amazonaws.com/static/img/prodthumbnail_default.png'
+
+
 class ProdThumbnail(models.Model):
+    """
+    상품 썸네일입니다. 생성시 PENDING 으로 저장되고, commit 이후 products.tasks.generate_thumbnail task 에서
+    첫번째 상품 이미지로 size(350, 180) x format(JPEG, WebP) 썸네일을 만듭니다.
+    만들어지기 전까지 image_url 은 placeholder 를 반환합니다.
+    """
+    PENDING = 0
+    READY = 1
+    FAILED = 2
+    STATUS = (
+        (PENDING, '생성 대기'),
+        (READY, '생성 완료'),
+        (FAILED, '생성 실패'),
+    )
+
     product = models.OneToOneField(Product, on_delete=models.CASCADE)
     # image_key = S3ImageKeyField() # client key 저장 후 save 시 image 저장
     thumbnail = ProcessedImageField(
@@ -172,30 +199,35 @@ class ProdThumbnail(models.Model):
         format='JPEG',  # 최종 저장 포맷
         options={'quality': 90},
         null=True, blank=True)
+    thumbnail_small = models.ImageField(upload_to=thumb_directory_path, null=True, blank=True, help_text="180x180 JPEG")
+    thumbnail_webp = models.ImageField(upload_to=thumb_directory_path, null=True, blank=True, help_text="350x350 WebP")
+    thumbnail_small_webp = models.ImageField(upload_to=thumb_directory_path, null=True, blank=True,
+                                             help_text="180x180 WebP")
+
+    status = models.IntegerField(choices=STATUS, default=PENDING)
+    source_image_key = models.CharField(max_length=50, null=True, blank=True,
+                                        help_text="썸네일을 만든 상품 이미지 key 입니다. 같은 이미지면 다시 만들지 않습니다.")
 
     @property
     def image_url(self):
-        return self.thumbnail.url
+        if self.status == self.READY and self.thumbnail:
+            return self.thumbnail.url
+        return PRODUCT_THUMBNAIL_PLACEHOLDER_URL
 
     def save(self, *args, **kwargs):
+        created = self._state.adding
         super(ProdThumbnail, self).save(*args, **kwargs)
-        self._save_thumbnail()
+        if created:
+            self.request_generation()
 
-    def _save_thumbnail(self):
-        from PIL import Image
-        resp = requests.get(self.product.images.first().image_url)
-        image = Image.open(BytesIO(resp.content))
-        image.seek(0)
-        crop_io = BytesIO()
-        # image.convert("RGB")
-        image.save(crop_io, format='png')
-        crop_file = InMemoryUploadedFile(crop_io, None, self._get_file_name(), 'image/jpeg', len(crop_io.getvalue()), None)
-        self.thumbnail.save(self._get_file_name(), crop_file, save=False)
-        # To avoid recursive save, call super.save
-        super(ProdThumbnail, self).save()
+    def request_generation(self):
+        """
+        commit 이후 썸네일 생성 task 를 실행합니다. (요청 transaction 안에서 이미지 다운로드/인코딩/업로드를 하지 않습니다.)
+        """
+        from products.tasks import generate_thumbnail
 
-    def _get_file_name(self):
-        return '{}.jpg'.format(self.product.images.first().image_key)
+        thumbnail_id = self.id
+        transaction.on_commit(lambda: generate_thumbnail.delay(thumbnail_id))
 
 
 class ProductUploadRequest(models.Model):
@@ -270,3 +302,18 @@ class ProductLike(models.Model):
     is_liked = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True, null=True)
 
+    class Meta:
+        # 찜 toggle 은 (user, product) 당 한 row 를 조건부 UPDATE 하므로 중복 row 가 생기지 않도록 합니다.
+        # DB 에 반영하기 전에 중복 row 를 정리합니다. (python manage.py dedupe_product_likes)
+        unique_together = ['user', 'product']
+
+
+class ProductLikeCount(models.Model):
+    """
+    상품의 찜 개수(is_liked=True 인 ProductLike 수) 입니다. 찜/찜 해제시 products.likes 에서 F() 로 증감합니다.
+    Product 를 save 할 때 덮어쓰지 않도록 ProductViews 처럼 별도 model 로 분리하였습니다.
+    """
+    product = models.OneToOneField(Product, related_name='like_counter', on_delete=models.CASCADE)
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
@@ -121,7 +121,8 @@ class ProductReplySerializer(serializers.ModelSerializer):
         return not obj.answers.exists()
 
     def get_answers(self, obj):
-        if obj.answers.exists():
-            answers = obj.answers.first()
-            return ProductAnswerRetrieveSerializer(answers).data
+        # 상품 상세(ProductRetrieveSerializer)에서는 answers 가 prefetch 되어 있으므로 list 로 처리합니다.
+        answers = obj.answers.all()
+        if answers:
+            return ProductAnswerRetrieveSerializer(answers[0]).data
         return None
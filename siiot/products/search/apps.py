@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class SearchConfig(AppConfig):
+    name = 'products.search'
+
+    def ready(self):
+        import products.search.signals  # noqa
@@ -0,0 +1,103 @@
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from products.feed.models import ProductFeedEntry
+from products.search.models import ProductSearchToken
+from products.search.tokenizer import tokenize, query_tokens
+
+
+class ProductSearchEngine(object):
+    """
+    ProductSearchToken 을 사용하는 상품 검색입니다. 외부 검색 서비스 없이 DB table 만 사용합니다.
+    name__icontains (LIKE '%keyword%', full scan) 대신 token index 로 후보를 찾고,
+    field 가중치 합으로 순위를 매깁니다.
+    """
+
+    def index(self, product_ids):
+        """
+        product_ids 에 해당하는 feed row 의 token 을 다시 만듭니다. feed row 가 없는 상품은 cascade 로 이미 정리됩니다.
+        """
+        entries = ProductFeedEntry.objects.filter(product_id__in=product_ids) \
+            .select_related('shopping_mall', 'category')
+        self.index_entries(entries)
+
+    def index_entries(self, entries):
+        entries = list(entries)
+        if not entries:
+            return
+
+        token_list = []
+        for entry in entries:
+            token_list.extend(self.get_tokens(entry))
+
+        with transaction.atomic():
+            ProductSearchToken.objects.filter(entry__in=entries).delete()
+            # normalize 로 맞추지 못한 collation 차이(ß, ss 등)로 중복된 token 은 무시합니다.
+            ProductSearchToken.objects.bulk_create(token_list, batch_size=1000, ignore_conflicts=True)
+
+    @staticmethod
+    def get_tokens(entry):
+        field_texts = (
+            (ProductSearchToken.NAME, entry.name),
+            (ProductSearchToken.SHOPPING_MALL, entry.shopping_mall.name if entry.shopping_mall else None),
+            (ProductSearchToken.CATEGORY, entry.category.name if entry.category else None),
+        )
+        for field, text in field_texts:
+            weight = ProductSearchToken.WEIGHTS[field]
+            for token in tokenize(text):
+                yield ProductSearchToken(entry=entry, token=token, field=field, weight=weight)
+
+    def rebuild(self, chunk_size=500):
+        """
+        전체 index 를 chunk 단위로 다시 만듭니다.
+        """
+        self.index_queryset(ProductFeedEntry.objects.all(), chunk_size=chunk_size)
+
+    def index_queryset(self, queryset, chunk_size=500):
+        """
+        feed row queryset 을 chunk 단위로 색인합니다. (쇼핑몰명, 카테고리명 변경시 등)
+        """
+        entry_ids = list(queryset.order_by('id').values_list('id', flat=True))
+        for start in range(0, len(entry_ids), chunk_size):
+            entries = ProductFeedEntry.objects.filter(id__in=entry_ids[start:start + chunk_size]) \
+                .select_related('shopping_mall', 'category')
+            self.index_entries(entries)
+
+    def search(self, keyword, **entry_filters):
+        """
+        keyword 로 검색한 결과를 순위순으로 반환합니다.
+        모든 query token 을 포함하는 상품만 반환하며 (한 글자 검색은 startswith), 가중치 합 > 최신순으로 정렬합니다.
+        :param entry_filters: feed row 조건 (ex: sold=False, hiding=False)
+        :return: {'entry': , 'entry__product_id': , 'matched': , 'score': } 의 queryset. pagination 에 그대로 사용할 수 있습니다.
+        """
+        tokens, is_prefix = query_tokens(keyword)
+        if not tokens:
+            return ProductSearchToken.objects.none()
+
+        queryset = ProductSearchToken.objects.all()
+        if is_prefix:
+            queryset = queryset.filter(token__startswith=tokens[0])
+            required = 1
+        else:
+            queryset = queryset.filter(token__in=tokens)
+            required = len(tokens)
+
+        if entry_filters:
+            queryset = queryset.filter(**{'entry__{}'.format(key): value for key, value in entry_filters.items()})
+
+        return queryset.values('entry', 'entry__product_id') \
+            .annotate(matched=Count('token', distinct=True), score=Sum('weight')) \
+            .filter(matched__gte=required) \
+            .order_by('-score', '-entry')
+
+    @staticmethod
+    def get_entries(page):
+        """
+        search() 결과 중 한 페이지를 ProductFeedEntry 로 바꿔 순서대로 반환합니다.
+        """
+        entry_ids = [row['entry'] for row in page]
+        entries = ProductFeedEntry.objects.select_related('shopping_mall').in_bulk(entry_ids)
+        return [entries[entry_id] for entry_id in entry_ids if entry_id in entries]
+
+
+search_engine = ProductSearchEngine()
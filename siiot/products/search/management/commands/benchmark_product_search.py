@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from products.feed.models import ProductFeedEntry
+from products.search.engine import search_engine
+
+
+class Command(BaseCommand):
+    """
+    기존 name__icontains 검색과 n-gram index 검색의 속도를 비교합니다.
+    ex) python manage.py benchmark_product_search 니트 원피스 자라 --repeat 20
+    """
+    help = 'name__icontains 검색과 n-gram index 검색의 응답 시간을 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('keywords', nargs='+')
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--page-size', type=int, default=20)
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        page_size = options['page_size']
+
+        self.stdout.write('{:<16}{:>14}{:>14}{:>10}{:>10}'.format(
+            'keyword', 'icontains(ms)', 'index(ms)', 'count', 'queries'))
+        for keyword in options['keywords']:
+            icontains_ms, icontains_count, _ = self.measure(repeat, lambda: self.icontains(keyword, page_size))
+            index_ms, index_count, queries = self.measure(repeat, lambda: self.index(keyword, page_size))
+            self.stdout.write('{:<16}{:>14.2f}{:>14.2f}{:>10}{:>10}'.format(
+                keyword, icontains_ms, index_ms, '{}/{}'.format(icontains_count, index_count), queries))
+
+    @staticmethod
+    def measure(repeat, func):
+        result = None
+        queries = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as context:
+                result = func()
+            queries = len(context.captured_queries)
+        elapsed = (time.perf_counter() - start) * 1000 / repeat
+        return elapsed, result, queries
+
+    @staticmethod
+    def icontains(keyword, page_size):
+        # 기존 SearchViewSet.product 방식 : count + 첫 페이지
+        queryset = ProductFeedEntry.objects.filter(name__icontains=keyword, sold=False, hiding=False) \
+            .order_by('-created_at')
+        count = queryset.count()
+        list(queryset[:page_size])
+        return count
+
+    @staticmethod
+    def index(keyword, page_size):
+        queryset = search_engine.search(keyword, sold=False, hiding=False)
+        count = queryset.count()
+        search_engine.get_entries(queryset[:page_size])
+        return count
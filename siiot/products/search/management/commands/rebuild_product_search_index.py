@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from products.search.engine import search_engine
+
+
+class Command(BaseCommand):
+    help = '상품 검색 index(ProductSearchToken) 를 전체 다시 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        search_engine.rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS('product search index rebuilt'))
@@ -0,0 +1,36 @@
+from django.db import models
+
+from products.feed.models import ProductFeedEntry
+
+
+class ProductSearchToken(models.Model):
+    """
+    상품 검색용 n-gram inverted index 입니다.
+    ProductFeedEntry 한 row 당 상품명, 쇼핑몰명, 카테고리명의 2-gram/3-gram token 을 저장합니다.
+    feed row 가 삭제되면 cascade 로 함께 삭제됩니다.
+    """
+    NAME = 1
+    SHOPPING_MALL = 2
+    CATEGORY = 3
+    FIELDS = (
+        (NAME, '상품명'),
+        (SHOPPING_MALL, '쇼핑몰명'),
+        (CATEGORY, '카테고리명'),
+    )
+    # 검색 순위 계산시 사용하는 field 별 가중치
+    WEIGHTS = {
+        NAME: 3,
+        SHOPPING_MALL: 2,
+        CATEGORY: 1,
+    }
+
+    entry = models.ForeignKey(ProductFeedEntry, related_name='search_tokens', on_delete=models.CASCADE)
+    token = models.CharField(max_length=3)
+    field = models.IntegerField(choices=FIELDS)
+    weight = models.IntegerField()
+
+    class Meta:
+        unique_together = ['entry', 'token', 'field']
+        indexes = [
+            models.Index(fields=['token', 'entry']),
+        ]
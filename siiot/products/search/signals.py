@@ -0,0 +1,25 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from products.category.models import SecondCategory
+from products.feed.models import ProductFeedEntry
+from products.feed.signals import feed_synced
+from products.search.engine import search_engine
+from products.shopping_mall.models import ShoppingMall
+
+
+@receiver(feed_synced, sender=ProductFeedEntry)
+def feed_entries_synced(sender, product_ids, **kwargs):
+    search_engine.index(product_ids)
+
+
+@receiver(post_save, sender=ShoppingMall)
+def shopping_mall_saved(sender, instance, created, **kwargs):
+    if not created:
+        search_engine.index_queryset(ProductFeedEntry.objects.filter(shopping_mall=instance))
+
+
+@receiver(post_save, sender=SecondCategory)
+def category_saved(sender, instance, created, **kwargs):
+    if not created:
+        search_engine.index_queryset(ProductFeedEntry.objects.filter(category=instance))
@@ -0,0 +1,48 @@
+import unicodedata
+
+END_MARK = '_'
+
+
+def normalize(text):
+    """
+    검색용 문자열 정규화입니다.
+    * NFKC : iOS 등에서 자모가 분리된(NFD) 한글이 들어오는 경우 완성형으로 합칩니다.
+    * 소문자 변환, 공백 및 특수문자 제거 : '후드 티' 와 '후드티' 를 같게 봅니다.
+    * 악센트 제거 : MySQL collation(_ci)은 'cafe' 와 'café' 를 같은 값으로 비교하므로 token 도 같게 만듭니다.
+      (NFD 로 분리한 결합 문자만 제거한 뒤 NFC 로 다시 합치므로 한글은 그대로입니다.)
+    """
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKC', text).lower()
+    text = ''.join(char for char in unicodedata.normalize('NFD', text) if unicodedata.category(char) != 'Mn')
+    return ''.join(char for char in unicodedata.normalize('NFC', text) if char.isalnum())
+
+
+def ngrams(text, n):
+    return [text[i:i + n] for i in range(len(text) - n + 1)]
+
+
+def tokenize(text):
+    """
+    색인할 token 목록입니다. 2-gram, 3-gram 을 사용합니다.
+    2-gram 은 끝에 END_MARK 를 붙여 마지막 글자도 한 글자 검색(startswith)으로 찾을 수 있게 합니다.
+    """
+    text = normalize(text)
+    if not text:
+        return set()
+    return set(ngrams(text + END_MARK, 2)) | set(ngrams(text, 3))
+
+
+def query_tokens(keyword):
+    """
+    검색어를 token 으로 나눕니다.
+    :return: (tokens, is_prefix) 한 글자 검색이면 is_prefix=True 이고 2-gram 의 startswith 로 찾습니다.
+    """
+    keyword = normalize(keyword)
+    if not keyword:
+        return [], False
+    if len(keyword) == 1:
+        return [keyword], True
+    if len(keyword) == 2:
+        return [keyword], False
+    return sorted(set(ngrams(keyword, 3))), False
@@ -1,10 +1,12 @@
 from rest_framework import serializers, exceptions
 from core.utils import get_age_fun, test_thumbnail_image_url
 from crawler.models import CrawlProduct, CrawlDetailImage
+from crawler.serializers import CrawlDataSerializerMixin, CrawlDataListSerializer
 from mypage.serializers import SimpleUserInfoSerializer, DeliveryPolicyInfoSerializer
 from products.category.models import PopularTempKeyword
 from products.category.serializers import ColorSerializer, FirstCategorySerializer, SecondCategorySerializer, \
     SizeSerializer
+from products.likes import LikedProductSerializerMixin, get_like_count
 from products.models import Product, ProductImages, ProductLike, ProdThumbnail
 from products.reply.serializers import ProductReplySerializer
 from products.shopping_mall.serializers import ShoppingMallSerializer
@@ -59,7 +61,7 @@ class TempCrawlDataSerializer(serializers.ModelSerializer):
         return None
 
 
-class ProductMainSerializer(serializers.ModelSerializer):
+class ProductMainSerializer(CrawlDataSerializerMixin, serializers.ModelSerializer):
     """
     상품 메인페이지 및 찜한 상품 조회에 사용하는 serializer 입니다.
     [UPDATED] 20.08.06 : 할인율, 상품상태 등
@@ -91,6 +93,7 @@ class ProductMainSerializer(serializers.ModelSerializer):
                   'condition',
                   'receipt_certify'
                   ]
+        list_serializer_class = CrawlDataListSerializer
 
     @staticmethod
     def get_receipt_certify(obj):
@@ -104,13 +107,7 @@ class ProductMainSerializer(serializers.ModelSerializer):
         return ShoppingMallSerializer(shopping_mall).data
 
     def get_origin_price(self, obj):
-        if not obj.crawl_product_id:
-            return None
-        if CrawlProduct.objects.filter(id=obj.crawl_product_id).exists():
-            origin_price = CrawlProduct.objects.filter(id=obj.crawl_product_id).last().int_price
-        else:
-            return None
-        return origin_price
+        return self.crawl_data.int_price(obj.crawl_product_id)
 
     def get_price(self, obj):
         if obj.price:
@@ -118,11 +115,8 @@ class ProductMainSerializer(serializers.ModelSerializer):
         return 0
 
     def get_discount_rate(self, obj):
-        if not obj.crawl_product_id:
-            return None
-        if CrawlProduct.objects.filter(id=obj.crawl_product_id).exists():
-            origin_price = CrawlProduct.objects.filter(id=obj.crawl_product_id).last().int_price
-        else:
+        origin_price = self.crawl_data.int_price(obj.crawl_product_id)
+        if not origin_price:
             return None
         price = obj.price
         rate = round(abs(origin_price - price) / origin_price, 2) * 100
@@ -138,13 +132,11 @@ class ProductMainSerializer(serializers.ModelSerializer):
     def get_sold(self, obj):
         return obj.status.sold
 
-    @staticmethod
-    def get_thumbnail_image_url(obj):
+    def get_thumbnail_image_url(self, obj):
         # TODO : filter Crawled image ratio
-        if obj.crawl_product_id:
-            c_product = CrawlProduct.objects.filter(id=obj.crawl_product_id)
-            if c_product.exists():
-                return CrawlProduct.objects.filter(id=obj.crawl_product_id).first().thumbnail_image_url
+        thumbnail_image_url = self.crawl_data.thumbnail_image_url(obj.crawl_product_id)
+        if thumbnail_image_url:
+            return thumbnail_image_url
 
         if hasattr(obj, 'prodthumbnail'):
             return obj.prodthumbnail.image_url
@@ -158,9 +150,13 @@ class ProductMainSerializer(serializers.ModelSerializer):
         return False
 
 
-class ProductRetrieveSerializer(serializers.ModelSerializer):
+class ProductRetrieveSerializer(LikedProductSerializerMixin, CrawlDataSerializerMixin, serializers.ModelSerializer):
     """
     상품 상세페이지 조회에 사용하는 serializer 입니다.
+    ProductViewSet.get_queryset 의 retrieve queryset(select_related, prefetch_related)과 함께
+    사용해야 정해진 개수의 query 로 만들어집니다. 크롤링 데이터(가격, 썸네일, 상세 이미지)는 CrawlDataLoader 로
+    crawler DB 에 한번씩만 조회합니다.
+    * like_count 는 ProductLikeCount, is_liked 는 유저별 찜 목록 cache(products.likes) 를 사용합니다.
     """
     thumbnail_image_url = serializers.SerializerMethodField()
     # crawl_data = serializers.SerializerMethodField()
@@ -235,11 +231,13 @@ class ProductRetrieveSerializer(serializers.ModelSerializer):
                   # 'related_products'
                   ]
 
-    @staticmethod
-    def get_thumbnail_image_url(obj):
+    def get_thumbnail_image_url(self, obj):
         if not obj.crawl_product_id:
-            return obj.images.first().image_url
-        return CrawlProduct.objects.get(id=obj.crawl_product_id).thumbnail_image_url
+            images = obj.images.all()
+            if images:
+                return images[0].image_url
+            return None
+        return self.crawl_data.thumbnail_image_url(obj.crawl_product_id)
 
     @staticmethod
     def get_valid_url(obj):
@@ -266,15 +264,10 @@ class ProductRetrieveSerializer(serializers.ModelSerializer):
 
     @staticmethod
     def get_like_count(obj):
-        if obj.liked.exists():
-            return obj.liked.all().count()
-        return 0
+        return get_like_count(obj)
 
-    @staticmethod
-    def get_int_price(obj):
-        if obj.crawl_product_id:
-            return CrawlProduct.objects.get(id=obj.crawl_product_id).int_price
-        return None
+    def get_int_price(self, obj):
+        return self.crawl_data.int_price(obj.crawl_product_id)
 
     # @staticmethod
     # def get_crawl_data(obj):
@@ -285,14 +278,7 @@ class ProductRetrieveSerializer(serializers.ModelSerializer):
     #     return serializer.data
 
     def get_is_liked(self, obj):
-        user = self.context['request'].user
-        if user.is_anonymous:
-            return False
-        liked = ProductLike.objects.filter(product=obj, user=user)
-        if liked.exists():
-            liked = liked.last()
-            return liked.is_liked
-        return False
+        return self.is_liked_product(obj.id)
 
     @staticmethod
     def get_is_receipt(obj):
@@ -300,12 +286,10 @@ class ProductRetrieveSerializer(serializers.ModelSerializer):
             return True
         return False
 
-    @staticmethod
-    def get_discount_rate(obj):
+    def get_discount_rate(self, obj):
         if obj.crawl_product_id:
-            if CrawlProduct.objects.filter(id=obj.crawl_product_id).exists():
-                crawl_price = CrawlProduct.objects.filter(id=obj.crawl_product_id).last().int_price
-            else:
+            crawl_price = self.crawl_data.int_price(obj.crawl_product_id)
+            if not crawl_price:
                 return None
             price = obj.price
             if not price:
@@ -317,26 +301,22 @@ class ProductRetrieveSerializer(serializers.ModelSerializer):
 
     @staticmethod
     def get_images(obj):
-        if not obj.images.exists():
-            return []
         images = obj.images.all()
+        if not images:
+            return []
         return ProductImagesRetrieveSerializer(images, many=True).data
 
-    @staticmethod
-    def get_crawled_images(obj):
+    def get_crawled_images(self, obj):
         if not obj.crawl_product_id:
             return []
-        c_product = CrawlProduct.objects.get(id=obj.crawl_product_id)
-        d_images = CrawlDetailImage.objects.filter(product=c_product)
+        d_images = self.crawl_data.detail_images(obj.crawl_product_id)
 
-        if d_images.exclude(detail_image_crop='').exists():
-            crop_image_id = d_images.exclude(detail_image_crop='').values_list('pk', flat=True)
-            # to unify return formats. obj to queryset
-            crop_image = CrawlDetailImage.objects.filter(id__in=crop_image_id)
-            return CrawlProductCropImageRetrieveSerializer(crop_image, many=True).data
+        crop_images = [d_image for d_image in d_images if d_image.detail_image_crop]
+        if crop_images:
+            return CrawlProductCropImageRetrieveSerializer(crop_images, many=True).data
 
         # logic 필요
-        d_image_center_id = int(round(d_images.count() / 2))
+        d_image_center_id = int(round(len(d_images) / 2))
         if d_image_center_id < 4:
             detail_images = d_images
         else:
@@ -392,9 +372,9 @@ class ProductRetrieveSerializer(serializers.ModelSerializer):
 
     @staticmethod
     def get_replies(obj):
-        if obj.questions.exists():
-            question = obj.questions.first()
-            return ProductReplySerializer(question).data
+        questions = obj.questions.all()
+        if questions:
+            return ProductReplySerializer(questions[0]).data
         return None
 
     @staticmethod
@@ -450,16 +430,16 @@ class ProductRetrieveSerializer(serializers.ModelSerializer):
     #     return RelatedProductSerializer(related_products, many=True).data
 
 
-class RelatedProductSerializer(serializers.ModelSerializer):
+class RelatedProductSerializer(CrawlDataSerializerMixin, serializers.ModelSerializer):
     thumbnail_image_url = serializers.SerializerMethodField()
     size = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
         fields = ['id', 'thumbnail_image_url', 'size', 'price', 'name']
+        list_serializer_class = CrawlDataListSerializer
 
-    @staticmethod
-    def get_thumbnail_image_url(obj):
+    def get_thumbnail_image_url(self, obj):
         if not obj.crawl_product_id:
             if hasattr(obj, 'prodthumbnail'):
                 return obj.prodthumbnail.image_url
@@ -468,7 +448,7 @@ class RelatedProductSerializer(serializers.ModelSerializer):
                 return obj.images.first().image_url
             except:
                 return test_thumbnail_image_url
-        return CrawlProduct.objects.get(id=obj.crawl_product_id).thumbnail_image_url
+        return self.crawl_data.thumbnail_image_url(obj.crawl_product_id)
 
     @staticmethod
     def get_size(obj):
@@ -487,6 +467,7 @@ class ProductUploadDetailInfoSerializer(serializers.ModelSerializer):
         model = Product
         fields = ['id',
                   'crawl_data',
+                  'crawl_status',
                   'receipt_image_url',
                   ]
 
@@ -616,7 +597,7 @@ class ReceiptSaveSerializer(serializers.ModelSerializer):
 class ProdThumbnailSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProdThumbnail
-        fields = ['thumbnail', ]
+        fields = ['thumbnail', 'thumbnail_small', 'thumbnail_webp', 'thumbnail_small_webp', 'status']
 
 
 class ProductImageSaveSerializer(serializers.ModelSerializer):
@@ -0,0 +1 @@
+default_app_config = 'products.shopping_mall.apps.ShoppingMallConfig'
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class ShoppingMallConfig(AppConfig):
+    name = 'products.shopping_mall'
+
+    def ready(self):
+        import products.shopping_mall.signals  # noqa
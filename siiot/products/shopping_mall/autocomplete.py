@@ -0,0 +1,169 @@
+import threading
+import time
+import unicodedata
+import uuid
+from bisect import bisect_left
+
+from django.core.cache import caches
+from django.db import transaction
+
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+HANGUL_BEGIN = ord('가')
+HANGUL_END = ord('힣')
+JUNGSEONG_JONGSEONG_COUNT = 21 * 28
+
+PLACEHOLDER_KEYWORD = '선택'
+
+
+def normalize(text):
+    """
+    NFC 로 자모가 분리된 한글을 합치고, 소문자 변환 및 공백을 제거합니다.
+    * NFKC 는 'ㄱ' 같은 호환 자모를 조합형 자모로 바꾸므로 초성 검색을 위해 NFC 를 사용합니다.
+    """
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFC', text).lower()
+    return ''.join(text.split())
+
+
+def to_choseong(text):
+    """
+    한글 음절을 초성으로 바꿉니다. ex) '무신사' -> 'ㅁㅅㅅ' (한글이 아닌 글자는 그대로 둡니다.)
+    """
+    result = []
+    for char in text:
+        code = ord(char)
+        if HANGUL_BEGIN <= code <= HANGUL_END:
+            result.append(CHOSEONG[(code - HANGUL_BEGIN) // JUNGSEONG_JONGSEONG_COUNT])
+        else:
+            result.append(char)
+    return ''.join(result)
+
+
+def is_choseong_query(text):
+    return all(char in CHOSEONG for char in text)
+
+
+def suffixes(text):
+    """
+    :return: (suffix, 이름의 시작 여부) 목록
+    """
+    return [(text[i:], i == 0) for i in range(len(text))]
+
+
+class ShoppingMallAutocomplete(object):
+    """
+    활성화된 쇼핑몰 이름의 in-process autocomplete index 입니다.
+    이름(및 초성)의 모든 suffix 를 정렬해두고 bisect 로 prefix 를 찾기 때문에 기존 icontains 와 같은 부분 일치를
+    DB 조회 없이 처리합니다. serializer 결과도 미리 만들어 두어 요청마다 serialize 하지 않습니다.
+
+    * 쇼핑몰 저장/삭제시 (admin 포함) invalidate() 로 cache 의 version 을 바꾸고,
+      각 worker 는 요청시 version 이 달라졌으면 index 를 다시 만듭니다.
+    * cache backend 가 worker 간에 공유되지 않는 경우를 위해 MAX_AGE 가 지나도 다시 만듭니다.
+    """
+    VERSION_CACHE_KEY = 'shopping_mall_autocomplete_version'
+    CACHE_ALIAS = 'reference'
+    MAX_AGE = 60 * 5
+    LIMIT = 30
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._built_at = 0
+        self._items = []
+        self._ordered_items = []
+        self._placeholder_items = []
+        self._name_index = []
+        self._choseong_index = []
+
+    def invalidate(self):
+        # commit 후에 version 을 바꿔야 다른 worker 가 commit 전 데이터로 index 를 만들지 않습니다.
+        transaction.on_commit(self._bump_version)
+
+    def _bump_version(self):
+        caches[self.CACHE_ALIAS].set(self.VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        self._built_at = 0
+
+    def _current_version(self):
+        cache = caches[self.CACHE_ALIAS]
+        version = cache.get(self.VERSION_CACHE_KEY)
+        if version is None:
+            version = uuid.uuid4().hex
+            if not cache.add(self.VERSION_CACHE_KEY, version, None):
+                version = cache.get(self.VERSION_CACHE_KEY)
+        return version
+
+    def _ensure_fresh(self):
+        version = self._current_version()
+        if version == self._version and time.time() - self._built_at < self.MAX_AGE:
+            return
+        with self._lock:
+            if version == self._version and time.time() - self._built_at < self.MAX_AGE:
+                return
+            self._build(version)
+
+    def _build(self, version):
+        from products.shopping_mall.models import ShoppingMall
+        from products.shopping_mall.serializers import ShoppingMallSerializer
+
+        malls = list(ShoppingMall.objects.filter(is_active=True).order_by('id'))
+        items = ShoppingMallSerializer(malls, many=True).data
+
+        placeholder_items = []
+        name_index = []
+        choseong_index = []
+        for position, mall in enumerate(malls):
+            if PLACEHOLDER_KEYWORD in mall.name:
+                placeholder_items.append(items[position])
+                continue
+            name = normalize(mall.name)
+            for suffix, is_start in suffixes(name):
+                name_index.append((suffix, position, is_start))
+            for suffix, is_start in suffixes(to_choseong(name)):
+                choseong_index.append((suffix, position, is_start))
+        name_index.sort()
+        choseong_index.sort()
+
+        # order_by('order') 와 동일하게 order 가 없는 쇼핑몰이 먼저 옵니다.
+        ordered_positions = sorted(range(len(malls)),
+                                   key=lambda i: (malls[i].order is not None, malls[i].order or 0))
+
+        self._items = items
+        self._ordered_items = [items[i] for i in ordered_positions]
+        self._placeholder_items = placeholder_items
+        self._name_index = name_index
+        self._choseong_index = choseong_index
+        self._version = version
+        self._built_at = time.time()
+
+    def all(self):
+        """
+        전체 쇼핑몰 (order 순) 입니다.
+        """
+        self._ensure_fresh()
+        return list(self._ordered_items)
+
+    def search(self, keyword, limit=LIMIT):
+        """
+        '선택' 쇼핑몰을 항상 먼저 보여주고, keyword 를 포함하는 쇼핑몰을 id 순으로 limit 개 까지 반환합니다.
+        keyword 가 초성으로만 이루어진 경우 초성 index 로 찾습니다. ex) 'ㅁㅅ' -> 무신사
+        이름이 keyword 로 시작하는 쇼핑몰이 먼저 옵니다.
+        """
+        self._ensure_fresh()
+        keyword = normalize(keyword)
+        if not keyword:
+            return self.all()
+
+        index = self._choseong_index if is_choseong_query(keyword) else self._name_index
+        matched = {}
+        for i in range(bisect_left(index, (keyword,)), len(index)):
+            suffix, position, is_start = index[i]
+            if not suffix.startswith(keyword):
+                break
+            matched[position] = matched.get(position, False) or is_start
+
+        positions = sorted(matched.keys(), key=lambda position: (not matched[position], position))[:limit]
+        return self._placeholder_items + [self._items[position] for position in positions]
+
+
+shopping_mall_autocomplete = ShoppingMallAutocomplete()
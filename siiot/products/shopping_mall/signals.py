@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from products.shopping_mall.autocomplete import shopping_mall_autocomplete
+from products.shopping_mall.models import ShoppingMall
+
+
+@receiver(post_save, sender=ShoppingMall)
+@receiver(post_delete, sender=ShoppingMall)
+def shopping_mall_changed(sender, instance, **kwargs):
+    # admin 에서 쇼핑몰 추가/수정/삭제시 모든 worker 의 autocomplete index 를 다시 만들도록 합니다.
+    shopping_mall_autocomplete.invalidate()
@@ -1,12 +1,18 @@
 import random
+import time
 import uuid
 import json
 
 import requests
 from celery import shared_task
 from django.conf import settings
+from django.db import transaction
 
-from products.models import Product
+from crawler.lookup import CrawlLookup, crawl_lookup
+from products.models import Product, ProdThumbnail
+from products.slack import slack_message
+from products.thumbnail import render_thumbnails
+from products.utils import crawl_request, crawl_server_error_message, CrawlServerError
 
 
 @shared_task
@@ -20,3 +26,125 @@ def size_capture(product_id):
     if not created:
         answer_image.image_url = image_url
         answer_image.save()
+
+
+CRAWL_MAX_RETRIES = 5
+CRAWL_RETRY_BACKOFF = 5  # seconds. 5, 10, 20, 40, 80 + jitter
+CRAWL_DELAY_ALERT_SECONDS = 5
+
+
+def crawl_retry_countdown(retries):
+    return CRAWL_RETRY_BACKOFF * (2 ** retries) + random.randint(0, CRAWL_RETRY_BACKOFF)
+
+
+def start_crawl(product):
+    """
+    상품 등록시 crawling 을 시작합니다. (api, staff 업로드에서 사용)
+    * 이미 detail image 까지 크롤링된 url 이면 바로 저장합니다.
+    * 최근에 크롤링이 실패한 url 이면 cool-down 동안 다시 요청하지 않고 실패로 저장합니다.
+    * 그 외에는 commit 이후 crawl_product task 를 실행합니다.
+    """
+    lookup_status, crawl_product_id = crawl_lookup.get(product.product_url)
+    if lookup_status == CrawlLookup.HIT:
+        product.crawl_product_id = crawl_product_id
+        product.crawl_status = Product.CRAWL_DONE
+        product.save(update_fields=['crawl_product_id', 'crawl_status'])
+        return
+
+    if lookup_status == CrawlLookup.FAILED:
+        product.crawl_product_id = None
+        product.crawl_status = Product.CRAWL_FAILED
+        product.save(update_fields=['crawl_product_id', 'crawl_status'])
+        return
+
+    product.crawl_product_id = None
+    product.crawl_status = Product.CRAWL_PENDING
+    product.save(update_fields=['crawl_product_id', 'crawl_status'])
+    product_id = product.id
+    transaction.on_commit(lambda: crawl_product.delay(product_id))
+
+
+@shared_task(bind=True, max_retries=CRAWL_MAX_RETRIES, acks_late=True)
+def crawl_product(self, product_id):
+    """
+    크롤링 서버에 요청하여 상품의 crawl_product_id, crawl_status 를 저장합니다.
+    크롤링 서버 오류시 backoff 로 재시도하며, 재시도 후에도 실패하면 CRAWL_FAILED 로 저장하고 slack 알림을 보냅니다.
+    * 이미 크롤링이 끝난 상품이면 아무것도 하지 않습니다. (중복 실행 대비)
+    """
+    product = Product.objects.filter(id=product_id).first()
+    if product is None or product.crawl_status != Product.CRAWL_PENDING:
+        return
+
+    # 정규화한 url 은 cache key 에만 사용하고, 크롤링 서버에는 유저가 입력한 url 을 그대로 보냅니다.
+    product_url = product.product_url
+    start = time.time()
+    server_error = False
+    try:
+        success, crawl_product_id = crawl_request(product_url)
+    except CrawlServerError as e:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=crawl_retry_countdown(self.request.retries))
+        crawl_server_error_message(product_url)
+        success, crawl_product_id = False, None
+        server_error = True
+    end = time.time() - start
+
+    if end > CRAWL_DELAY_ALERT_SECONDS:  # 5초 이상 걸린 경우 slack noti
+        slack_message("[최소정보 크롤링 5초이상 지연] \n 걸린시간 {}s, 요청 url: {}".
+                      format(end, product_url), 'crawl_error_upload')
+    elif not crawl_product_id:
+        slack_message("[최소정보 크롤링 실패ㅠ] \n 걸린시간 {}s, 요청 url: {}".
+                      format(end, product_url), 'crawl_error_upload')
+
+    # 201 은 기본 정보만 저장된 상태(detail image 는 이후 크롤링)이므로 cache 하지 않고, 다음 등록시 crawl_lookup.get 에서
+    # detail image 가 있는지 확인한 뒤 cache 합니다. 크롤링 서버 장애는 url 의 문제가 아니므로 실패로 cache 하지 않습니다.
+    if not success and not server_error:
+        crawl_lookup.record_failure(product_url)
+
+    # product crawl id save
+    product.crawl_product_id = crawl_product_id if success else None
+    product.crawl_status = Product.CRAWL_DONE if success else Product.CRAWL_FAILED
+    product.save(update_fields=['crawl_product_id', 'crawl_status'])
+
+
+THUMBNAIL_MAX_RETRIES = 3
+THUMBNAIL_RETRY_BACKOFF = 10  # seconds
+THUMBNAIL_DOWNLOAD_TIMEOUT = (3, 20)
+
+
+@shared_task(bind=True, max_retries=THUMBNAIL_MAX_RETRIES, acks_late=True)
+def generate_thumbnail(self, thumbnail_id):
+    """
+    ProdThumbnail 의 썸네일(350/180, JPEG/WebP)을 만드는 task 입니다.
+    'thumbnail' queue 로 route 되며, 이 queue 의 worker concurrency 로 동시 처리 수를 제한합니다.
+    * 첫번째 상품 이미지 key 가 source_image_key 와 같고 이미 READY 이면 다시 만들지 않습니다. (재시도/중복 실행 대비)
+    * 다운로드 실패시 backoff 로 재시도하고, 재시도 후에도 실패하면 FAILED 로 저장합니다. (placeholder 유지)
+    """
+    thumbnail = ProdThumbnail.objects.filter(id=thumbnail_id).select_related('product', 'product__seller').first()
+    if thumbnail is None:
+        return
+
+    source_image = thumbnail.product.images.first()
+    if source_image is None:
+        return
+
+    image_key = str(source_image.image_key)
+    if thumbnail.status == ProdThumbnail.READY and thumbnail.source_image_key == image_key:
+        return
+
+    try:
+        response = requests.get(source_image.image_url, timeout=THUMBNAIL_DOWNLOAD_TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=THUMBNAIL_RETRY_BACKOFF * (2 ** self.request.retries))
+        thumbnail.status = ProdThumbnail.FAILED
+        thumbnail.save(update_fields=['status'])
+        return
+
+    for field_name, content in render_thumbnails(response.content, image_key):
+        getattr(thumbnail, field_name).save(content.name, content, save=False)
+
+    thumbnail.source_image_key = image_key
+    thumbnail.status = ProdThumbnail.READY
+    thumbnail.save()
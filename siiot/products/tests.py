@@ -0,0 +1,117 @@
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from crawler.models import CrawlProduct, CrawlDetailImage
+from mypage.models import DeliveryPolicy
+from payment.models import Deal
+from products.category.models import FirstCategory, SecondCategory
+from products.models import Product, ProductStatus, ProductImages
+from products.reply.models import ProductQuestion, ProductAnswer
+from products.shopping_mall.models import ShoppingMall
+from products.views import ProductViewSet
+from reviews.models import Review
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'reference': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'reference'},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ProductRetrieveQueryCountTest(TestCase):
+    """
+    상품 상세 api(GET api/v1/product/{id}/) 의 query 개수를 확인합니다.
+    ProductRetrieveSerializer 에 lazy 조회가 다시 생기면 개수가 달라집니다.
+    * 조회수/최근 본 상품이 저장되지 않도록 판매자(또는 비로그인)로 요청합니다.
+    """
+    databases = {'default', 'bengal'}
+
+    # product, images, questions, answers, first_category child, seller 평점(2), 찜 목록 cache miss
+    DEFAULT_QUERY_COUNT = 8
+    # crawl product, detail images
+    BENGAL_QUERY_COUNT = 2
+
+    @classmethod
+    def setUpClass(cls):
+        # crawler model 은 managed=False 이므로 테스트 DB 에 table 을 직접 만듭니다.
+        # (DDL 은 transaction 을 commit 하므로 TestCase 의 transaction 이 시작되기 전에 실행합니다.)
+        with connections['bengal'].schema_editor() as schema_editor:
+            schema_editor.create_model(CrawlProduct)
+            schema_editor.create_model(CrawlDetailImage)
+        super(ProductRetrieveQueryCountTest, cls).setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super(ProductRetrieveQueryCountTest, cls).tearDownClass()
+        with connections['bengal'].schema_editor() as schema_editor:
+            schema_editor.delete_model(CrawlDetailImage)
+            schema_editor.delete_model(CrawlProduct)
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.seller = User.objects.create_user(phone='01000000000', nickname='seller')
+        buyer = User.objects.create_user(phone='01000000001', nickname='buyer')
+        DeliveryPolicy.objects.create(user=cls.seller)
+        Review.objects.create(buyer=buyer, seller=cls.seller, satisfaction=4.5,
+                              deal=Deal.objects.create(seller=cls.seller, buyer=buyer, total=10000, remain=10000,
+                                                       delivery_charge=0))
+
+        first_category = FirstCategory.objects.create(name='상의')
+        category = SecondCategory.objects.create(name='티셔츠', first_category=first_category)
+        shopping_mall = ShoppingMall.objects.create(name='test mall')
+
+        crawl_product = CrawlProduct.objects.using('bengal').create(
+            shopping_mall=shopping_mall.id, thumbnail_url='', thumbnail_image='thumbnail.jpg', size_image='',
+            product_url='http://test.com/product/1', price='50,000원', is_valid=1)
+        for i in range(3):
+            CrawlDetailImage.objects.using('bengal').create(product=crawl_product, detail_url='',
+                                                            detail_image='detail{}.jpg'.format(i))
+
+        cls.crawled_product = cls.create_product(shopping_mall, category, buyer, crawl_product_id=crawl_product.id)
+        cls.product = cls.create_product(shopping_mall, category, buyer)
+
+    @classmethod
+    def create_product(cls, shopping_mall, category, questioner, crawl_product_id=None):
+        product = Product.objects.create(seller=cls.seller, shopping_mall=shopping_mall, category=category,
+                                         condition=Product.UNOPENED, name='product', price=30000,
+                                         product_url='http://test.com/product/1', crawl_product_id=crawl_product_id,
+                                         temp_save=False, possible_upload=True)
+        ProductStatus.objects.create(product=product)
+        for _ in range(2):
+            ProductImages.objects.create(product=product, image_key=uuid.uuid4())
+        question = ProductQuestion.objects.create(product=product, user=questioner, text='사이즈 문의')
+        ProductAnswer.objects.create(question=question, user=cls.seller, text='답변')
+        return product
+
+    def setUp(self):
+        cache.clear()
+        self.view = ProductViewSet.as_view({'get': 'retrieve'})
+        self.factory = APIRequestFactory()
+
+    def retrieve(self, product, user=None):
+        request = self.factory.get('/api/v1/product/{}/'.format(product.id))
+        if user is not None:
+            force_authenticate(request, user=user)
+        response = self.view(request, pk=product.id)
+        response.render()
+        return response
+
+    def test_crawled_product(self):
+        with self.assertNumQueries(self.DEFAULT_QUERY_COUNT), \
+                self.assertNumQueries(self.BENGAL_QUERY_COUNT, using='bengal'):
+            response = self.retrieve(self.crawled_product, user=self.seller)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['crawled_images']), 3)
+
+    def test_anonymous_without_crawl_data(self):
+        # 비로그인은 찜 목록을 조회하지 않고, 크롤링 데이터가 없으면 crawler DB 를 조회하지 않습니다.
+        with self.assertNumQueries(self.DEFAULT_QUERY_COUNT - 1), self.assertNumQueries(0, using='bengal'):
+            response = self.retrieve(self.product)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['crawled_images'], [])
@@ -0,0 +1,47 @@
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# ProdThumbnail field : (size, format, save options)
+THUMBNAIL_VARIANTS = (
+    ('thumbnail', 350, 'JPEG', {'quality': 90}),
+    ('thumbnail_small', 180, 'JPEG', {'quality': 85}),
+    ('thumbnail_webp', 350, 'WEBP', {'quality': 80}),
+    ('thumbnail_small_webp', 180, 'WEBP', {'quality': 80}),
+)
+EXTENSIONS = {
+    'JPEG': 'jpg',
+    'WEBP': 'webp',
+}
+
+
+def open_source_image(content):
+    """
+    원본 이미지를 열어 EXIF 회전을 적용하고 RGB 로 바꿉니다. (PNG 투명 배경 등은 흰색으로 채웁니다.)
+    """
+    image = Image.open(BytesIO(content))
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        return background
+    return image.convert('RGB')
+
+
+def render_thumbnails(content, image_key):
+    """
+    원본 이미지 content(bytes) 로 모든 썸네일 variant 를 만듭니다.
+    파일명은 image_key 로 정해지므로 task 가 재시도 되어도 같은 파일을 덮어씁니다.
+    :return: [(field name, ContentFile)]
+    """
+    source = open_source_image(content)
+    results = []
+    for field_name, size, image_format, options in THUMBNAIL_VARIANTS:
+        image = ImageOps.fit(source, (size, size), Image.LANCZOS)
+        buffer = BytesIO()
+        image.save(buffer, format=image_format, **options)
+        file_name = '{}_{}.{}'.format(image_key, size, EXTENSIONS[image_format])
+        results.append((field_name, ContentFile(buffer.getvalue(), name=file_name)))
+    return results
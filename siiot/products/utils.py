@@ -7,15 +7,30 @@ from products.loader import load_credential
 from products.slack import slack_message
 
 
+CRAWL_REQUEST_TIMEOUT = (3, 30)  # (connect, read) seconds
+
+
+class CrawlServerError(Exception):
+    """
+    크롤링 서버 오류 (5xx, timeout, 연결 실패) 입니다. celery task 에서 재시도합니다.
+    """
+    pass
+
+
 def crawl_request(product_url):
-    # TODO: 크롤링 실패했을 경우 어떻게 처리할건지?
-    # 1) 필수 데이터(name 등)를 먼저 주고, server 에서 detail image 크롤링 시도 + slack alert +
-    # CrawlProduct 에서 성공,실패 field 저장 필요. 이를 참고하여 실패면 재요청 코드
+    """
+    크롤링 서버에 크롤링을 요청합니다. products.tasks.crawl_product task 에서 호출합니다.
+    :return: (성공 여부, crawl product id)
+    :raise CrawlServerError: 크롤링 서버 오류. 재시도 후에도 실패하면 task 에서 slack 알림을 보냅니다.
+    """
     crawler_server = load_credential('CRAWLER_SERVER')
     body = {
         'product_url': product_url
     }
-    response = requests.post(crawler_server, data=body)
+    try:
+        response = requests.post(crawler_server, data=body, timeout=CRAWL_REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        raise CrawlServerError(str(e))
 
     # crawling 성공 (기본 정보는 저장됨. detail image 부분은 crawling server에서 처리
     if response.status_code == 201:
@@ -25,11 +40,14 @@ def crawl_request(product_url):
     if response.status_code == 204:
         return False, None
 
-    # crawling 서버 오류 (슬랙 알림 필요)
+    # crawling 서버 오류 (재시도)
+    raise CrawlServerError('status code {}'.format(response.status_code))
+
+
+def crawl_server_error_message(product_url):
     slack_message("[크롤링 서버 에러] 크롤링 서버 에러가 발생하였습니다.\n[{}] 서버를 확인 해 주세요. \n| url: {}".
                   format(datetime.datetime.now().strftime('%y/%m/%d %H:%M'), product_url),
                   'crawling_server_error')
-    return False, None
 
 
 def check_product_url(product_url):
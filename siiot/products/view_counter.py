@@ -0,0 +1,77 @@
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from products.models import ProductViews
+from user_activity.models import RecentlyViewedProduct
+
+
+class ProductViewBuffer(object):
+    """
+    상품 조회수를 redis 에 모아두었다가 cron(products.cron.flush_product_views)에서 한번에 저장하는 buffer 입니다.
+    ProductViewSet.retrieve 마다 ProductViews 를 get_or_create + count + 1 save 하던 방식은
+    동시 요청시 증가분이 유실되고, 가장 많이 호출되는 api 에서 row lock 을 잡았습니다.
+
+    * 조회수 : 같은 유저가 DEDUP_SECONDS 안에 다시 조회하면 count 하지 않습니다. (새로고침 방지)
+      증가분은 redis hash 에 HINCRBY 하므로 uwsgi worker 가 종료되어도 유실되지 않습니다.
+    * 최근 본 상품 : 바로 목록(MainViewSet.recently_viewed)에 보여야 하므로 요청 중에 저장합니다. (유저 단위 row 한개)
+    """
+    DEDUP_CACHE_KEY = 'product_view:{}:{}'
+    DEDUP_SECONDS = 60 * 30
+    PENDING_COUNTS_KEY = 'product_view:pending_counts'
+
+    def record(self, product_id, user_id):
+        if cache.add(self.DEDUP_CACHE_KEY.format(product_id, user_id), 1, self.DEDUP_SECONDS):
+            get_redis_connection('default').hincrby(self.PENDING_COUNTS_KEY, product_id, 1)
+        self._touch_recently_viewed(product_id, user_id)
+
+    @staticmethod
+    def _touch_recently_viewed(product_id, user_id):
+        updated = RecentlyViewedProduct.objects.filter(user_id=user_id, product_id=product_id) \
+            .update(updated_at=timezone.now())
+        if not updated:
+            # 다른 요청이 먼저 만든 경우 (user, product) unique 로 무시합니다.
+            RecentlyViewedProduct.objects.bulk_create([RecentlyViewedProduct(user_id=user_id, product_id=product_id)],
+                                                      ignore_conflicts=True)
+
+    def _drain(self):
+        """
+        쌓인 증가분을 가져오면서 지웁니다. (MULTI 로 실행하므로 cron 이 겹쳐도 같은 증가분을 두번 가져오지 않습니다.)
+        """
+        pipe = get_redis_connection('default').pipeline(transaction=True)
+        pipe.hgetall(self.PENDING_COUNTS_KEY)
+        pipe.delete(self.PENDING_COUNTS_KEY)
+        pending, _ = pipe.execute()
+        return dict((int(product_id), int(count)) for product_id, count in pending.items())
+
+    def flush(self):
+        """
+        :return: 조회수를 저장한 상품 수
+        """
+        counts = self._drain()
+        if counts:
+            with transaction.atomic():
+                self._flush_counts(counts)
+        return len(counts)
+
+    @staticmethod
+    def _flush_counts(counts):
+        # row 가 없는 상품은 count=0 으로 먼저 만든 뒤 (다른 process 가 먼저 만든 경우 무시) 모든 상품을 UPDATE 합니다.
+        existing = set(ProductViews.objects.filter(product_id__in=counts.keys()).values_list('product_id', flat=True))
+        ProductViews.objects.bulk_create(
+            [ProductViews(product_id=product_id, count=0) for product_id in counts.keys() if product_id not in existing],
+            ignore_conflicts=True)
+
+        # 같은 증가분끼리 묶어서 UPDATE count = count + n
+        increments = defaultdict(list)
+        for product_id, count in counts.items():
+            increments[count].append(product_id)
+        for count, product_ids in increments.items():
+            ProductViews.objects.filter(product_id__in=product_ids).update(count=F('count') + count)
+
+
+product_view_buffer = ProductViewBuffer()
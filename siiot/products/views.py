@@ -1,8 +1,7 @@
-import time
 import uuid
 
 from django.db import transaction
-from django.db.models import Case, When, IntegerField, Count
+from django.db.models import Case, When, IntegerField, Count, Prefetch
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
@@ -10,35 +9,41 @@ from django.utils import timezone
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import action
-from rest_framework import viewsets, mixins
+from rest_framework import viewsets, mixins, serializers
 from rest_framework.permissions import IsAuthenticated, AllowAny
 
 # Create your views here.
 from core.permissions import ProductViewPermission
-from crawler.models import CrawlProduct
-from products.banner.models import MainBanner
-from products.banner.serializers import BannerSerializer
-from products.category.models import FirstCategory, SecondCategory, Size, Color, PopularTempKeyword
+from products.category.models import FirstCategory, SecondCategory, Size, Color
+from products.category.reference import first_category_data, second_category_data, size_data, color_data, \
+    banner_data, popular_keyword_data
 from products.category.serializers import FirstCategorySerializer, SecondCategorySerializer, SizeSerializer, \
     ColorSerializer, CategorySearchSerializer
-from products.models import Product, ProductImages, ProductViews, \
+from products.feed.models import ProductFeedEntry
+from products.feed.serializers import ProductFeedEntrySerializer
+from products.search.engine import search_engine
+from products.likes import product_like_service
+from products.models import Product, ProductImages, \
     ProductLike, ProdThumbnail, ProductStatus
 # ProductLike
+from products.reply.models import ProductQuestion, ProductAnswer
 from products.reply.serializers import ProductRepliesSerializer
 from products.serializers import ProductFirstSaveSerializer, ReceiptSaveSerializer, ProductSaveSerializer, \
     ProductImageSaveSerializer, ProductUploadDetailInfoSerializer, ProductTempUploadDetailInfoSerializer, \
     ProductRetrieveSerializer, ProductMainSerializer, LikeSerializer, \
-    RecentlySearchedKeywordSerializer, SearchDefaultSerializer, PopularTempKeywordSerializer
+    RecentlySearchedKeywordSerializer, SearchDefaultSerializer
+from products.shopping_mall.autocomplete import shopping_mall_autocomplete
 from products.shopping_mall.models import ShoppingMall
 from products.shopping_mall.serializers import ShoppingMallSerializer, ShoppingMallSearchSerializer
 from products.slack import slack_message
 from products.supplymentary.serializers import ShoppingMallDemandSerializer
-from products.utils import crawl_request, check_product_url
-from core.pagination import SiiotPagination
-from user_activity.models import RecentlyViewedProduct, RecentlySearchedKeyword
-from notification.types import *
+from products.tasks import start_crawl
+from products.utils import check_product_url
+from products.view_counter import product_view_buffer
+from core.pagination import SiiotPagination, SiiotFeedCursorPagination, paginate
+from user_activity.models import RecentlySearchedKeyword
 
-from notification.models import NotificationUserLog
+from notification.models import NotificationUnreadCount
 
 
 class ProductViewSet(mixins.CreateModelMixin,
@@ -75,11 +80,31 @@ class ProductViewSet(mixins.CreateModelMixin,
             return ProductRepliesSerializer
         elif self.action in ['like']:
             return LikeSerializer
-        elif self.action in ['filter', 'likes']:
+        elif self.action == 'likes':
+            return ProductFeedEntrySerializer
+        elif self.action == 'filter':
             return ProductMainSerializer
         else:
             return super(ProductViewSet, self).get_serializer_class()
 
+    def get_queryset(self):
+        queryset = super(ProductViewSet, self).get_queryset()
+        if self.action == 'retrieve':
+            queryset = self.get_retrieve_queryset(queryset)
+        return queryset
+
+    def get_retrieve_queryset(self, queryset):
+        """
+        상품 상세페이지(ProductRetrieveSerializer)에서 사용하는 관계를 한번에 조회합니다.
+        상품 수와 관계없이 prefetch 개수만큼만 query 가 실행됩니다. (crawler DB 조회는 serializer 의 CrawlDataLoader 에서)
+        """
+        questions = ProductQuestion.objects.select_related('user', 'user__profile').order_by('pk') \
+            .prefetch_related(Prefetch('answers', queryset=ProductAnswer.objects.select_related('user').order_by('pk')))
+        return queryset.select_related('status', 'shopping_mall', 'category__first_category', 'size__category',
+                                       'like_counter') \
+            .prefetch_related(Prefetch('images', queryset=ProductImages.objects.order_by('pk')),
+                              Prefetch('questions', queryset=questions))
+
     @action(methods=['post'], detail=False, permission_classes=[AllowAny, ])
     def check_url(self, request, *args, **kwargs):
 
@@ -102,7 +127,8 @@ class ProductViewSet(mixins.CreateModelMixin,
         """
         상품 업로드 시 가장먼저 저장되는 정보(상태, 쇼핑몰, 링크)까지 저장하는 api 입니다.
         처음 호출하기 때문에 create를 활용하여 설정하였습니다.
-        * 이 api 가 호출되는 시점에 crawling server에 요청을 보냅니다.
+        * 이 api 가 호출되는 시점에 crawling task 를 실행합니다. 응답의 crawl_status 가 0(크롤링 중)이면
+          GET api/v1/product/{id}/crawl_status/ 로 결과를 확인합니다.
         * 특히 새로 등록할 때 호출되기 때문에 이전에 임시저장했던 상품은 삭제합니다.
         api : POST api/v1/product/
 
@@ -111,6 +137,7 @@ class ProductViewSet(mixins.CreateModelMixin,
         :return {"id",
                  "receipt_image_url(optional), <- 구매내역 첨부 후 상세정보 입력할 때만 (상태가 미개봉 상품일 때) data 존재
                  "crawl_data: {'thumbnail_image_url': ~~, "product_name":~~, "int_price":~~ }",
+                 "crawl_status": 0(크롤링 중), 1(완료), 2(실패)
                  }
         """
         user = request.user
@@ -141,34 +168,8 @@ class ProductViewSet(mixins.CreateModelMixin,
             product.receipt = receipt
             product.save()
 
-        # crawl request
-        product_url = data.get('product_url')
-        if CrawlProduct.objects.filter(product_url=product_url).exists() and \
-                CrawlProduct.objects.filter(product_url=product_url).last().detail_images.exists():
-            crawl_product_id = CrawlProduct.objects.filter(product_url=product_url).last().id
-        else:
-            start = time.time()
-            sucess, id = crawl_request(product_url)
-            end = time.time() - start
-            if end > 5: # 5초 이상 걸린 경우 slack noti
-                slack_message("[최소정보 크롤링 5초이상 지연] \n 걸린시간 {}s, 요청 url: {}".
-                              format(end, product_url), 'crawl_error_upload')
-            elif not id:
-                slack_message("[최소정보 크롤링 실패ㅠ] \n 걸린시간 {}s, 요청 url: {}".
-                              format(end, product_url), 'crawl_error_upload')
-            else:
-                slack_message("[최소정보 크롤링 성공] \n 걸린시간 {}s, 요청 url: {}".
-                              format(end, product_url), 'crawl_error_upload')
-            if sucess:
-                crawl_product_id = id
-            else:
-                # crawling 실패했을 경우 또는 서버 에러
-                crawl_product_id = None
-            print(time.time()-start)
-        # product crawl id save
-        product.crawl_product_id = crawl_product_id
-        product.product_url = product_url
-        product.save()
+        # crawl request : 크롤링은 celery task 로 처리하고, client 는 crawl_status api 로 결과를 확인합니다.
+        start_crawl(product)
 
         # 미개봉 상품인 경우, 해당 api 호출 후 구매내역 첨부하는 페이지로..
         # 그 외인 경우 해당 api 호출 후 상세정보 입력 페이지로
@@ -341,6 +342,18 @@ class ProductViewSet(mixins.CreateModelMixin,
 
         return Response(status=status.HTTP_206_PARTIAL_CONTENT)
 
+    @action(methods=['get'], detail=True)
+    def crawl_status(self, request, *args, **kwargs):
+        """
+        상품 등록시 실행한 crawling task 의 결과를 조회하는 api 입니다. crawl_status 가 0 이면 다시 요청합니다.
+        api : GET api/v1/product/{id}/crawl_status/
+
+        :return ProductUploadDetailInfoSerializer 와 동일
+        """
+        product = get_object_or_404(Product, pk=kwargs['pk'], seller=request.user)
+        serializer = ProductUploadDetailInfoSerializer(product)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
     @action(methods=['get'], detail=False)
     def temp_data(self, request, *args, **kwargs):
         """
@@ -392,14 +405,13 @@ class ProductViewSet(mixins.CreateModelMixin,
 
         user = request.user
 
-        # 판매자인 경우 count 하지 않음.
-        if user.is_authenticated and user != product.seller:
-            views, _ = ProductViews.objects.get_or_create(product=product)
-            views.count = views.count + 1
-            views.save()
-            RecentlyViewedProduct.objects.update_or_create(user=user, product=product)
+        # 판매자인 경우 count 하지 않음. 조회수는 redis 에 모아 cron 에서 저장하고, 최근 본 상품은 바로 저장합니다.
+        if user.is_authenticated and user.id != product.seller_id:
+            product_view_buffer.record(product.id, user.id)
 
-        return super(ProductViewSet, self).retrieve(request, *args, **kwargs)
+        # get_object 를 다시 호출하지 않도록 super().retrieve 대신 바로 serialize 합니다.
+        serializer = self.get_serializer(product)
+        return Response(serializer.data)
 
     @action(methods=['get'], detail=True)
     def replies(self, request, *args, **kwargs):
@@ -429,6 +441,8 @@ class ProductViewSet(mixins.CreateModelMixin,
         api: POST api/v1/product/{id}/like/
         * id: product_id
 
+        * 처음 찜한 경우에만 판매자에게 알림을 보냅니다.
+
         :return:
         404 : 해당 id를 가진 상품이 존재하지 않을 경우
         206 : 찜 버튼 호출 성공 및 status 변경
@@ -438,16 +452,29 @@ class ProductViewSet(mixins.CreateModelMixin,
             product = self.get_object()
         except self.get_object().DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
-        like, tf = ProductLike.objects.get_or_create(user=user, product=product)
-        ProductLikeNotice(product=product, list_user=[product.seller], _from=user.id).send()
-        if not tf:
-            if like.is_liked:
-                like.is_liked = False
-            else:
-                like.is_liked = True
-            like.save()
+        product_like_service.toggle(user, product.id)
         return Response(status=status.HTTP_206_PARTIAL_CONTENT)
 
+    @action(methods=['post'], detail=False, permission_classes=[IsAuthenticated, ])
+    def bulk_like(self, request, *args, **kwargs):
+        """
+        여러 상품을 한번에 찜 또는 찜 해제 하는 API 입니다. 이미 같은 상태인 상품은 변경하지 않으므로 여러번 호출해도 같습니다.
+        api : POST api/v1/product/bulk_like/
+
+        data : "product_id(list of int)", "is_liked(bool, default true)"
+
+        :return: {"product_id": 상태가 바뀐 product id 목록}
+        400 : product_id 가 없거나 올바르지 않은 경우
+        """
+        user = request.user
+        product_list = request.data.get('product_id', None)
+        try:
+            is_liked = serializers.BooleanField().to_internal_value(request.data.get('is_liked', True))
+            changed = product_like_service.set_likes(user, product_list, is_liked)
+        except (TypeError, ValueError, serializers.ValidationError):
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        return Response({'product_id': sorted(changed)}, status=status.HTTP_200_OK)
+
     @action(methods=['get'], detail=False, permission_classes=[IsAuthenticated, ])
     def likes(self, request, *args, **kwargs):
         """
@@ -457,8 +484,10 @@ class ProductViewSet(mixins.CreateModelMixin,
         :return:
        """
         user = request.user
-        queryset = Product.objects.filter(liked__user=user, liked__is_liked=True ,is_active=True, status__hiding=False) \
-            .order_by('-liked__created_at')
+        queryset = ProductFeedEntry.objects.filter(product__liked__user=user, product__liked__is_liked=True,
+                                                   hiding=False) \
+            .select_related('shopping_mall') \
+            .order_by('-product__liked__created_at')
 
         serializer = self.get_serializer(queryset, many=True, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -482,7 +511,7 @@ class ProductViewSet(mixins.CreateModelMixin,
         if not qs.exists():
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
-        qs.update(is_liked=False)
+        product_like_service.set_likes(user, product_list, False)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -541,22 +570,14 @@ class ShoppingMallViewSet(viewsets.GenericViewSet, mixins.ListModelMixin):
         """
         shopping mall 검색을 할 때 각 글자에 해당하는 쇼핑몰을 조회하는 api 입니다.
         api: GET api/v1/shopping_mall/searching/?search_query=[]
+        초성 검색을 지원합니다. ex) ?search_query=ㅁㅅ
+        DB 를 조회하지 않고 in-process autocomplete index 를 사용합니다. (쇼핑몰 저장시 다시 만들어집니다.)
         """
         keyword = request.query_params.get('search_query', None)
         if keyword:
-            other_add_shop_obj = self.get_queryset().filter(name__icontains='선택')
-            other_add_shop_obj_ids = other_add_shop_obj.values_list('pk', flat=True)
-            value = self.get_queryset() \
-                        .filter(name__icontains=keyword) \
-                        .exclude(id__in=other_add_shop_obj_ids) \
-                        .order_by('id')[:30]
-            queryset = list(other_add_shop_obj) + list(value)
-            serializer = self.get_serializer(queryset, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return Response(shopping_mall_autocomplete.search(keyword), status=status.HTTP_200_OK)
         else:
-            queryset = self.get_queryset().order_by('order')
-            serializer = self.get_serializer(queryset, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return Response(shopping_mall_autocomplete.all(), status=status.HTTP_200_OK)
 
     @action(methods=['post'], detail=False)
     def demand(self, request, *args, **kwargs):
@@ -609,9 +630,7 @@ class ProductCategoryViewSet(viewsets.GenericViewSet):
 
         :return serialzier 참고
         """
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return first_category_data.response(request)
 
     @action(methods=['get'], detail=True)
     def second_category(self, request, *args, **kwargs):
@@ -621,14 +640,11 @@ class ProductCategoryViewSet(viewsets.GenericViewSet):
         *id 는 first category
         :return serialzier 참고
         """
-        fc_pk = kwargs['pk']
         try:
-            first_category = FirstCategory.objects.get(pk=fc_pk)
-        except FirstCategory.DoesNotExist:
+            fc_pk = int(kwargs['pk'])
+        except ValueError:
             raise Http404
-        queryset = self.get_queryset().filter(first_category=first_category)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return second_category_data.response(request, fc_pk)
 
     @action(methods=['get'], detail=True)
     def size(self, request, *args, **kwargs):
@@ -638,14 +654,11 @@ class ProductCategoryViewSet(viewsets.GenericViewSet):
         *id 는 first category
         :return serialzier 참고
         """
-        sc_pk = kwargs['pk']
         try:
-            first_category = SecondCategory.objects.get(pk=sc_pk).first_category
-        except SecondCategory.DoesNotExist:
+            sc_pk = int(kwargs['pk'])
+        except ValueError:
             raise Http404
-        queryset = self.get_queryset().filter(category=first_category)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return size_data.response(request, sc_pk)
 
     @action(methods=['get'], detail=False)
     def color(self, request, *args, **kwargs):
@@ -654,9 +667,7 @@ class ProductCategoryViewSet(viewsets.GenericViewSet):
         api: GET api/v1/category/color/
         :return serialzier 참고
         """
-        queryset = self.get_queryset().order_by('order')
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return color_data.response(request)
 
 
 class S3ImageUploadViewSet(viewsets.GenericViewSet):
@@ -707,21 +718,20 @@ class S3ImageUploadViewSet(viewsets.GenericViewSet):
 
 class SearchViewSet(viewsets.GenericViewSet, mixins.ListModelMixin):
     permission_classes = [AllowAny, ]
-    serializer_class = ProductMainSerializer
+    serializer_class = ProductFeedEntrySerializer
 
     @action(methods=['get'], detail=False, serializer_class=SearchDefaultSerializer)
     def default(self, request, *args, **kwargs):
         user = request.user
-        popular_keyword_qs = PopularTempKeyword.objects.filter(is_active=True)[:3]
-        p_serializer = PopularTempKeywordSerializer(popular_keyword_qs, many=True)
+        popular_keyword = popular_keyword_data.data()
 
         if user.is_anonymous:
-            return Response({'popular_keyword': p_serializer.data, 'searched_keyword': []})
+            return Response({'popular_keyword': popular_keyword, 'searched_keyword': []})
 
         searched_keyword_qs = user.recently_searched_keywords.order_by('-updated_at')
         s_serializer = RecentlySearchedKeywordSerializer(searched_keyword_qs, many=True)
 
-        return Response({'popular_keyword': p_serializer.data, 'searched_keyword': s_serializer.data})
+        return Response({'popular_keyword': popular_keyword, 'searched_keyword': s_serializer.data})
 
     @action(methods=['get'], detail=False)
     def product(self, request, *args, **kwargs):
@@ -731,17 +741,16 @@ class SearchViewSet(viewsets.GenericViewSet, mixins.ListModelMixin):
         if len(keyword) < 1:
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
-        products = Product.objects.filter(name__icontains=keyword, is_active=True, temp_save=False) \
-            .filter(status__sold=False, status__hiding=False) \
-            .order_by('-created_at')
+        # n-gram index 검색 : 상품명, 쇼핑몰명, 카테고리명 가중치 순
+        searched = search_engine.search(keyword, sold=False, hiding=False)
 
         # save recently searched keyword
         if user.is_authenticated:
             RecentlySearchedKeyword.objects.update_or_create(user=user, keyword=keyword)
 
         paginator = SiiotPagination()
-        page = paginator.paginate_queryset(products, request)
-        serializer = self.get_serializer(page, many=True)
+        page = paginator.paginate_queryset(searched, request)
+        serializer = self.get_serializer(search_engine.get_entries(page), many=True)
         return paginator.get_paginated_response(serializer.data)
 
     @action(methods=['get'], detail=True)
@@ -750,9 +759,7 @@ class SearchViewSet(viewsets.GenericViewSet, mixins.ListModelMixin):
 
         shopping_mall = get_object_or_404(ShoppingMall, pk=kwargs['pk'])
 
-        products = Product.objects.filter(shopping_mall=shopping_mall, is_active=True, temp_save=False) \
-            .filter(status__sold=False, status__hiding=False) \
-            .order_by('-created_at')
+        products = self.get_feed_queryset().filter(shopping_mall=shopping_mall)
 
         # save recently searched keyword
         if user.is_authenticated:
@@ -772,9 +779,7 @@ class SearchViewSet(viewsets.GenericViewSet, mixins.ListModelMixin):
 
         category = get_object_or_404(SecondCategory, pk=kwargs['pk'])
 
-        products = Product.objects.filter(category=category, is_active=True, temp_save=False) \
-            .filter(status__sold=False, status__hiding=False) \
-            .order_by('-created_at')
+        products = self.get_feed_queryset().filter(category=category)
 
         # save recently searched keyword
         if user.is_authenticated:
@@ -785,6 +790,15 @@ class SearchViewSet(viewsets.GenericViewSet, mixins.ListModelMixin):
         serializer = self.get_serializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
 
+    @staticmethod
+    def get_feed_queryset():
+        """
+        검색 결과로 노출되는 상품입니다. (판매중, 숨김X) ProductFeedEntry 에서 join 없이 조회합니다.
+        """
+        return ProductFeedEntry.objects.filter(sold=False, hiding=False) \
+            .select_related('shopping_mall') \
+            .order_by('-created_at')
+
     # @action(methods=['get'], detail=False)
     def list(self, request, *args, **kwargs):
         """
@@ -817,20 +831,16 @@ class SearchViewSet(viewsets.GenericViewSet, mixins.ListModelMixin):
         return serializer.data
 
     def search_by_product(self):
-        searched_product = Product.objects.filter(name__icontains=self.keyword) \
-            .filter(is_active=True) \
-            .filter(status__sold=False, status__hiding=False)
+        searched_product = search_engine.search(self.keyword, sold=False, hiding=False)
         return searched_product.count()
 
 
+@paginate(page_size=20, ordering=('-created_at', '-id'), pagination_class=SiiotFeedCursorPagination)
 class MainViewSet(viewsets.GenericViewSet, mixins.ListModelMixin):
-    queryset = Product.objects \
-        .filter(is_active=True, temp_save=False) \
-        .filter(status__hiding=False) \
-        .select_related('seller', 'color', 'size', 'category', 'purchased_time') \
-        .select_related('prodthumbnail', 'views') \
-        .prefetch_related('images')
-    serializer_class = ProductMainSerializer
+    queryset = ProductFeedEntry.objects \
+        .filter(hiding=False) \
+        .select_related('shopping_mall')
+    serializer_class = ProductFeedEntrySerializer
     permission_classes = [AllowAny, ]
 
     @action(methods=['get'], detail=False)
@@ -840,7 +850,10 @@ class MainViewSet(viewsets.GenericViewSet, mixins.ListModelMixin):
         # popular_queryset = qs.filter(views__isnull=False).order_by('-views__count')[:10]
 
         if hasattr(user, 'recently_viewed_products') and user.recently_viewed_products.all().count() > 3:
-            recently_viewed_queryset = user.recently_viewed_products.all().order_by('-created_at')[:5]
+            product_ids = list(user.recently_viewed_products.all().order_by('-updated_at')
+                               .values_list('product_id', flat=True)[:5])
+            entries = self.get_queryset().in_bulk(product_ids, field_name='product_id')
+            recently_viewed_queryset = [entries[product_id] for product_id in product_ids if product_id in entries]
 
             serializer = self.get_serializer(recently_viewed_queryset, many=True)
 
@@ -850,32 +863,53 @@ class MainViewSet(viewsets.GenericViewSet, mixins.ListModelMixin):
 
     def list(self, request, *args, **kwargs):
         qs = self.get_queryset()
-        new_crawled_qs = qs.filter(crawl_product_id__isnull=False).order_by('-created_at')[:10]
+        return self.get_feed_response(qs, request)
+
+    def is_feed_mode(self, request):
+        return bool(request.query_params.get('feed', None)) or \
+            self.paginator.cursor_query_param in request.query_params
+
+    def get_feed_response(self, queryset, request):
+        """
+        main, filter 에서 사용하는 feed 입니다. 최근 크롤링된 상품 10개를 먼저 보여주고, 나머지는 최신순으로 보여줍니다.
+        * ?feed=1 (이후 페이지는 cursor-next header 의 ?cursor=) : cursor pagination 으로 page 만큼만 조회합니다.
+        * 그 외 : 기존 page number pagination. pinned 여부를 annotate 하여 DB 에서 정렬 후 page 만큼만 가져옵니다.
+        """
+        new_crawled_qs = queryset.filter(crawl_product_id__isnull=False).order_by('-created_at')[:10]
+
+        if self.is_feed_mode(request):
+            page = self.paginator.paginate_feed(new_crawled_qs, queryset, request, view=self)
+            products_serializer = self.get_serializer(page, many=True)
+            return self.paginator.get_paginated_response(products_serializer.data)
 
         # evaluate queryset to queryset slice
         new_crawled_qs_ids = list(new_crawled_qs.values_list('pk', flat=True))
 
-        other_qs = qs.exclude(id__in=new_crawled_qs_ids).order_by('-created_at')
-
         # to queryset chaining with each ordering
-        custom_qs = list(new_crawled_qs) + list(other_qs)
+        custom_qs = queryset.annotate(pinned=Case(When(id__in=new_crawled_qs_ids, then=1),
+                                                  default=0, output_field=IntegerField())) \
+            .order_by('-pinned', '-created_at')
 
         paginator = SiiotPagination()
         page = paginator.paginate_queryset(queryset=custom_qs, request=request)
-        products_serializer = self.get_serializer(page, many=True, context={'request': request})
+        products_serializer = self.get_serializer(page, many=True)
         return paginator.get_paginated_response(products_serializer.data)
 
     @action(methods=['get'], detail=False)
     def banner(self, request, *args, **kwargs):
-        qs = MainBanner.objects.filter(is_active=True).order_by('order')
-        serializer = BannerSerializer(qs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return banner_data.response(request)
 
     @action(methods=['get'], detail=False)
     def noti(self, request, *args, **kwargs):
+        """
+        읽지 않은 알림이 있는지(빨간 점) 확인하는 api 입니다. 앱에서 polling 하므로 알림 table 대신
+        유저별 읽지 않은 알림 수(NotificationUnreadCount) row 만 조회합니다.
+        api: GET api/v1/main/noti/
+
+        :return: {"code": 1(읽지 않은 알림 있음) / 0}
+        """
         user = request.user
-        qs = NotificationUserLog.objects.filter(notification__target=user)
-        if qs.filter(read_at__isnull=True).exists():
+        if user.is_authenticated and NotificationUnreadCount.objects.get_count(user.id) > 0:
             return Response({"code": 1}, status=status.HTTP_200_OK)
         return Response({"code": 0}, status=status.HTTP_200_OK)
 
@@ -886,28 +920,13 @@ class MainViewSet(viewsets.GenericViewSet, mixins.ListModelMixin):
         api: GET /api/v1/main/filter/?search_category=1&search_color=3
         main, likes, filter 의 return 포맷이 동일합니다.
         """
-        queryset = self.get_queryset().filter(temp_save=False, is_active=True)
+        queryset = self.get_queryset()
         category = request.query_params.get('search_category', None)
         color = request.query_params.get('search_color', None)
         if category:
             category_id = int(category)
-            queryset = queryset.filter(category__first_category_id=category_id)
+            queryset = queryset.filter(first_category_id=category_id)
         if color:
             color_id = int(color)
             queryset = queryset.filter(color_id=color_id)
-        queryset = queryset.order_by('-created_at')
-
-        new_crawled_qs = queryset.filter(crawl_product_id__isnull=False).order_by('-created_at')[:10]
-
-        # evaluate queryset to queryset slice
-        new_crawled_qs_ids = list(new_crawled_qs.values_list('pk', flat=True))
-
-        other_qs = queryset.exclude(id__in=new_crawled_qs_ids).order_by('-created_at')
-
-        # to queryset chaining with each ordering
-        custom_qs = list(new_crawled_qs) + list(other_qs)
-
-        paginator = SiiotPagination()
-        page = paginator.paginate_queryset(queryset=custom_qs, request=request)
-        products_serializer = self.get_serializer(page, many=True)
-        return paginator.get_paginated_response(products_serializer.data)
+        return self.get_feed_response(queryset, request)
@@ -0,0 +1,6 @@
+from __future__ import absolute_import, unicode_literals
+
+# django 시작시 celery app 을 load 하여 shared_task 가 이 app 을 사용하도록 합니다.
+from .celery import app as celery_app
+
+__all__ = ('celery_app',)
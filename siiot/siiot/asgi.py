@@ -9,8 +9,11 @@ https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from channels.routing import get_default_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'siiot.settings')
+django.setup()
 
-application = get_asgi_application()
+# ASGI_APPLICATION(siiot.routing.application) : websocket 채팅 (daphne 로 실행합니다.)
+application = get_default_application()
@@ -1,10 +1,9 @@
 from __future__ import absolute_import, unicode_literals
 import os
 from celery import Celery
-from django.conf import settings
 
 # set the default Django settings module for the 'celery' program. / set environment
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'siiot.settings.devel')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'siiot.settings')
 
 app = Celery('siiot', )
 
@@ -18,8 +17,6 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Load task modules from all registered Django app configs.
 app.autodiscover_tasks()
 
-app.conf.broker_url = settings.CELERY_BROKER_URL
-
 
 @app.task(bind=True)
 def debug_task(self):
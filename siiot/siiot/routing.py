@@ -0,0 +1,9 @@
+from channels.routing import ProtocolTypeRouter, URLRouter
+
+from chat.middleware import TokenAuthMiddleware
+from chat.routing import websocket_urlpatterns
+
+# http 는 channels 가 django view 로 연결합니다. (운영 http 는 uwsgi, websocket 은 daphne 가 처리합니다.)
+application = ProtocolTypeRouter({
+    'websocket': TokenAuthMiddleware(URLRouter(websocket_urlpatterns)),
+})
@@ -92,6 +92,8 @@ SECONDS_APPS = [
     'products.supplymentary',
     'products.reply',
     'products.banner',
+    'products.feed',
+    'products.search',
     'products',
     'crawler',
     'payment',
@@ -136,7 +138,10 @@ THIRD_APPS = [
 
     'crispy_forms',
 
-    'push_notifications'
+    'push_notifications',
+
+    # websocket 채팅
+    'channels',
 ]
 
 INSTALLED_APPS += SECONDS_APPS + THIRD_APPS
@@ -228,6 +233,28 @@ DATABASE_ROUTERS = [
     'siiot.router.SiiotDataRouter'
 ]
 
+# cache
+# * default : 유저/상품 단위로 key 가 많아지는 값(조회수 중복 방지, 좋아요 목록, 크롤링 결과 등)은 redis 에 저장합니다.
+# * reference : 기준 데이터, 쇼핑몰 autocomplete 의 version key(timeout=None)는 default 의 key 수와 관계없이
+#   지워지지 않도록 별도 file based cache 에 둡니다. (같은 서버의 uwsgi worker 들이 공유합니다.)
+CACHES = {
+    'default': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': os.environ.get('SIIOT_CACHE_URL', 'redis://0.0.0.0:6379/1'),
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+        },
+    },
+    'reference': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('SIIOT_CACHE_LOCATION', '/var/tmp/siiot_cache'),
+        'OPTIONS': {
+            # version key 는 기준 데이터 종류 수만큼만 생기므로 cull 되지 않습니다.
+            'MAX_ENTRIES': 1000,
+        },
+    },
+}
+
 SITE_ID = 1
 
 # drf 토큰인증처
@@ -280,6 +307,8 @@ CKEDITOR_CONFIGS = {
 ########## FCM DJANGO CONFIGURATION
 PUSH_NOTIFICATIONS_SETTINGS = {
         "FCM_API_KEY": load_credential("FCM_API_KEY"),
+        # 로컬 테스트시 fake_fcm_server 주소로 설정합니다. (notification.fcm)
+        "FCM_POST_URL": os.environ.get('SIIOT_FCM_POST_URL', 'https://fcm.googleapis.com/fcm/send'),
         "GCM_API_KEY": "[your api key]",
         "APNS_CERTIFICATE": "/path/to/your/certificate.pem",
         "APNS_TOPIC": "com.example.push_test",
@@ -290,19 +319,42 @@ PUSH_NOTIFICATIONS_SETTINGS = {
 }
 ########## FCM DJANGO CONFIGURATION
 
+########## BOOTPAY CONFIGURATION
+# application_id, private_key 는 payment.loader 로 불러옵니다. (payment.bootpay_client)
+BOOTPAY_SETTINGS = {
+    # 로컬 테스트시 fake_bootpay_server 주소로 설정합니다. ex) http://localhost:8003
+    "URL": os.environ.get('SIIOT_BOOTPAY_URL'),
+    "CONNECT_TIMEOUT": 3,
+    "READ_TIMEOUT": 10,
+    "POOL_SIZE": 10,
+    "VERIFY_RETRIES": 3,
+}
+########## BOOTPAY CONFIGURATION
+
 APPEND_SLASH = False
 
 # toolbar
 INTERNAL_IPS = ('127.0.0.1',)
 
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels_redis.core.RedisChannelLayer',
-        'CONFIG': {
-            "hosts": ['redis://0.0.0.0:6379'],
+# channels : websocket 채팅 (chat.consumers)
+ASGI_APPLICATION = 'siiot.routing.application'
+
+# 로컬 개발/부하 테스트시 SIIOT_CHANNEL_LAYER=memory 로 redis 없이 실행합니다. (단일 process 에서만 동작합니다.)
+if os.environ.get('SIIOT_CHANNEL_LAYER') == 'memory':
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
         },
-    },
-}
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                "hosts": ['redis://0.0.0.0:6379'],
+            },
+        },
+    }
 
 # Celery
 CELERY_BROKER_URL = 'redis://0.0.0.0:6379'
@@ -311,6 +363,10 @@ CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TAST_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Asia/Seoul'
+# 썸네일 생성은 별도 queue 에서 concurrency 를 제한하여 처리합니다. (supervisor-app.conf 참고)
+CELERY_TASK_ROUTES = {
+    'products.tasks.generate_thumbnail': {'queue': 'thumbnail'},
+}
 
 
 MESSAGES_TO_LOAD = 15
\ No newline at end of file
@@ -53,7 +53,10 @@ CORS_ORIGIN_WHITELIST = (
 CRONTAB_DJANGO_SETTINGS_MODULE = 'siiot.settings.dev'
 CRONJOBS = [
     ('*/1 * * * *', 'payment.cron.check_approval_after_payment', '>> approval_after_payment.log'),
-    ('*/1 * * * *', 'transaction.cron.check_confirm_after_deliver', '>> confirm_after_deliver.log')
+    ('*/1 * * * *', 'transaction.cron.check_confirm_after_deliver', '>> confirm_after_deliver.log'),
+    ('*/1 * * * *', 'payment.cron.release_expired_holds', '>> release_expired_holds.log'),
+    ('*/30 * * * *', 'products.feed.cron.sync_crawled_feed_entries', '>> sync_crawled_feed_entries.log'),
+    ('*/1 * * * *', 'products.cron.flush_product_views', '>> flush_product_views.log')
 ]
 
 # # logging
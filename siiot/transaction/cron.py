@@ -1,22 +1,46 @@
-from datetime import datetime
-from transaction.models import Transaction
+from datetime import datetime, timedelta
 
+from django.db import transaction
 
-def time_diff_in_s(start, end):
-    duration_in_s = (end - start).seconds
-    return duration_in_s
+from core.utils import get_wallet_scheduled_date
+from payment.models import Wallet
+from transaction.models import Transaction, Delivery
 
+# 운송장 번호 입력 이후 자동 구매확정까지의 기간
+AUTO_CONFIRM_AFTER = timedelta(days=5)
 
-def check_confirm_after_deliver():
-    queryset = Transaction.objects.filter(status=3)
-    for transaction_obj in queryset.iterator():
-        deliver_start_time = transaction_obj.deal.delivery.number_created_time
-        if time_diff_in_s(deliver_start_time, datetime.now()) > (86400 * 5):
-            print("AUTO TRANSACTION CONFIRM: %d".format(transaction_obj.id))
 
-            deal = transaction_obj.deal
+def check_confirm_after_deliver(chunk_size=500):
+    """
+    운송장 번호를 입력한 지 AUTO_CONFIRM_AFTER 가 지난 배송중(status=3) 거래를 자동 구매확정 하고 정산(Wallet)을 생성합니다.
+    * delivery.number_created_time index 로 기한이 지난 배송만 조회합니다.
+    * chunk_size 개씩 transaction 을 select_for_update(skip_locked) 로 잠가 처리하므로 cron 이 겹쳐 실행되어도
+      한 거래를 두번 확정하지 않습니다. (delivery 는 subquery 로 조회하여 잠그지 않습니다.)
+    * Wallet 은 Transaction.save -> _create_wallet 대신 chunk 마다 bulk_create 합니다.
+    """
+    now = datetime.now()
+    delivered_deal_ids = Delivery.objects.filter(number_created_time__lt=now - AUTO_CONFIRM_AFTER).values('deal_id')
+    confirmed = 0
+    while True:
+        with transaction.atomic():
+            transaction_ids = list(Transaction.objects.select_for_update(skip_locked=True)
+                                   .filter(status=3, deal_id__in=delivered_deal_ids)
+                                   .order_by('id').values_list('id', flat=True)[:chunk_size])
+            if not transaction_ids:
+                break
 
-            transaction_obj = deal.transaction
-            transaction_obj.confirm_transaction = True
-            transaction_obj.status = 5
-            transaction_obj.save()
\ No newline at end of file
+            scheduled_date = get_wallet_scheduled_date()
+            Wallet.objects.bulk_create([
+                Wallet(deal_id=deal_id, seller_id=seller_id, amount=remain, scheduled_date=scheduled_date)
+                for deal_id, seller_id, remain in Transaction.objects.filter(id__in=transaction_ids)
+                .values_list('deal_id', 'deal__seller_id', 'deal__remain')
+            ], ignore_conflicts=True)
+            Transaction.objects.filter(id__in=transaction_ids) \
+                .update(status=5, confirm_transaction=True, updated_at=now)
+
+        confirmed += len(transaction_ids)
+        if len(transaction_ids) < chunk_size:
+            break
+
+    if confirmed:
+        print("AUTO TRANSACTION CONFIRM : {}".format(confirmed))
@@ -49,6 +49,12 @@ class Transaction(models.Model):
 
     confirm_transaction = models.NullBooleanField(help_text='구매확정 필드입니다. True 로 변환 시 Wallet을 생성합니다.')
 
+    class Meta:
+        indexes = [
+            # 자동거래취소 (payment.auto_cancel) : status=1, due_date < now
+            models.Index(fields=['status', 'due_date']),
+        ]
+
     @property
     def checker(self):
         """
@@ -190,6 +196,10 @@ class Delivery(models.Model):
     class Meta:
         verbose_name = '배송(운송장번호) 관리'
         verbose_name_plural = '배송(운송장번호) 관리'
+        indexes = [
+            # 자동 구매확정 (transaction.cron) : number_created_time < now - 5일
+            models.Index(fields=['number_created_time']),
+        ]
 
 
 class DeliveryMemo(models.Model):
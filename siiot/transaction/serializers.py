@@ -3,7 +3,7 @@ import datetime
 from rest_framework import serializers
 
 from core.utils import test_thumbnail_image_url
-from crawler.models import CrawlProduct
+from crawler.serializers import CrawlDataSerializerMixin, CrawlDataListSerializer
 from mypage.models import Address
 from mypage.serializers import SimpleUserInfoSerializer
 from payment.models import Deal
@@ -11,13 +11,14 @@ from products.models import Product
 from transaction.models import Transaction, Delivery, DeliveryCode
 
 
-class SimpleTransactionProductInfoSerializer(serializers.ModelSerializer):
+class SimpleTransactionProductInfoSerializer(CrawlDataSerializerMixin, serializers.ModelSerializer):
     thumbnail_image_url = serializers.SerializerMethodField()
     created_at = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
         fields = ['thumbnail_image_url', 'price', 'name', 'created_at']
+        list_serializer_class = CrawlDataListSerializer
 
     def get_thumbnail_image_url(self, obj):
         product = obj
@@ -29,7 +30,7 @@ class SimpleTransactionProductInfoSerializer(serializers.ModelSerializer):
                 return product.images.first().image_url
             except:
                 return test_thumbnail_image_url
-        return CrawlProduct.objects.get(id=product.crawl_product_id).thumbnail_image_url
+        return self.crawl_data.thumbnail_image_url(product.crawl_product_id)
 
     def get_created_at(self, obj):
         reformed_created_at = datetime.datetime.strftime(obj.created_at, '%y.%m.%d')
@@ -9,11 +9,11 @@ from rest_framework import exceptions
 
 from reviews.models import Review
 from transaction.models import Transaction, DeliveryCode
-from payment.Bootpay import BootpayApi
-from payment.loader import load_credential
+from payment.bootpay_client import bootpay_client
 from payment.models import Deal
 from payment.serializers import PaymentCancelSerialzier
 from transaction.serializers import DeliveryWriteSerializer, DeliveryCodeListSerializer
+from products.category.reference import delivery_code_data
 from notification.types import *
 
 
@@ -38,17 +38,6 @@ class TransactionViewSet(viewsets.GenericViewSet):
         self.cancel_reason = ''
         self.transaction = None
 
-    @staticmethod
-    def get_access_token():
-        bootpay = BootpayApi(application_id=load_credential("application_id"),
-                             private_key=load_credential("private_key"))
-        result = bootpay.get_access_token()
-        if result['status'] is 200:
-            return bootpay
-        else:
-            raise exceptions.APIException(detail='bootpay access token 확인바람')
-
-
     @transaction.atomic
     @action(methods=['put'], detail=True)
     def cancel(self, request, *args, **kwargs):
@@ -170,8 +159,7 @@ class TransactionViewSet(viewsets.GenericViewSet):
         return Response({'detail': 'canceled'}, status=status.HTTP_200_OK)
 
     def _payment_cancel_status(self):
-        bootpay = self.get_access_token()
-        result = bootpay.cancel(self.receipt_id, name=self.cancel_requester, reason=self.cancel_reason)
+        result = bootpay_client.cancel(self.receipt_id, name=self.cancel_requester, reason=self.cancel_reason)
         serializer = PaymentCancelSerialzier(self.payment, data=result['data'])
 
         if serializer.is_valid():
@@ -309,4 +297,4 @@ class DeliveryCodeListViewSet(viewsets.GenericViewSet, mixins.ListModelMixin):
         택배사 코드 list api
         api : GET api/v1/delivery_code
         """
-        return super(DeliveryCodeListViewSet, self).list(request, *args, **kwargs)
+        return delivery_code_data.response(request)
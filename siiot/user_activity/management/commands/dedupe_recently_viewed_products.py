@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from user_activity.models import RecentlyViewedProduct
+
+
+class Command(BaseCommand):
+    """
+    (user, product) 가 중복된 RecentlyViewedProduct 중 가장 최근에 본(updated_at) row 하나만 남기고 지웁니다.
+    RecentlyViewedProduct 의 unique_together 를 DB 에 반영하기 전에 실행합니다. (중복 row 가 있으면 index 생성이 실패합니다.)
+    ex) python manage.py dedupe_recently_viewed_products --chunk-size 500
+    """
+    help = '중복된 최근 본 상품(RecentlyViewedProduct)을 정리합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        pairs = list(RecentlyViewedProduct.objects.values_list('user_id', 'product_id').annotate(count=Count('id'))
+                     .filter(count__gt=1).order_by())
+        chunk_size = options['chunk_size']
+        deleted = 0
+        for i in range(0, len(pairs), chunk_size):
+            chunk = set((user_id, product_id) for user_id, product_id, _ in pairs[i:i + chunk_size])
+            rows = RecentlyViewedProduct.objects.filter(user_id__in=set(user_id for user_id, _ in chunk),
+                                                        product_id__in=set(product_id for _, product_id in chunk)) \
+                .order_by('-updated_at', '-id').values_list('id', 'user_id', 'product_id')
+
+            kept = set()
+            duplicate_ids = []
+            for viewed_id, user_id, product_id in rows:
+                if (user_id, product_id) not in chunk:
+                    continue
+                if (user_id, product_id) in kept:
+                    duplicate_ids.append(viewed_id)
+                else:
+                    kept.add((user_id, product_id))
+
+            with transaction.atomic():
+                deleted += RecentlyViewedProduct.objects.filter(id__in=duplicate_ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS('{} duplicated recently viewed products deleted'.format(deleted)))
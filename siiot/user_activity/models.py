@@ -10,6 +10,10 @@ class RecentlyViewedProduct(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # DB 에 반영하기 전에 중복 row 를 정리합니다. (python manage.py dedupe_recently_viewed_products)
+        unique_together = ['user', 'product']
+
 
 class RecentlySearchedKeyword(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='recently_searched_keywords')